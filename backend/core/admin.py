@@ -1,7 +1,28 @@
 from django.contrib import admin
+from . import search
 from .models import Organization, Project, Task, TaskComment
 
 
+ADMIN_SEARCH_LIMIT = 1000
+
+
+class IndexedSearchMixin:
+    """
+    Answer the admin search box from the full-text index instead of LIKE scans.
+
+    Searches matching ``ADMIN_SEARCH_LIMIT`` rows or more fall back to the
+    default ``search_fields`` scan, so no result is silently left out.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        hits = search.search(search_term, ADMIN_SEARCH_LIMIT, kind=search.KINDS[self.model])
+        if len(hits) >= ADMIN_SEARCH_LIMIT:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=[hit.object_id for hit in hits]), False
+
+
 @admin.register(Organization)
 class OrganizationAdmin(admin.ModelAdmin):
     list_display = ['name', 'slug', 'contact_email', 'created_at']
@@ -9,15 +30,16 @@ class OrganizationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
-    list_display = ['name', 'organization', 'status', 'due_date', 'created_at']
+class ProjectAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ['name', 'organization', 'status', 'task_count', 'done_task_count', 'due_date', 'created_at']
     list_filter = ['status', 'organization', 'created_at']
     search_fields = ['name', 'description']
     raw_id_fields = ['organization']
+    readonly_fields = Project.COUNTER_FIELDS
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'project', 'status', 'assignee_email', 'due_date', 'created_at']
     list_filter = ['status', 'project', 'created_at']
     search_fields = ['title', 'description', 'assignee_email']
@@ -25,7 +47,7 @@ class TaskAdmin(admin.ModelAdmin):
 
 
 @admin.register(TaskComment)
-class TaskCommentAdmin(admin.ModelAdmin):
+class TaskCommentAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['task', 'author_email', 'created_at']
     list_filter = ['created_at']
     search_fields = ['content', 'author_email']
@@ -6,14 +6,20 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
-        # Load sample data on startup (only in development)
+        # Register cache invalidation receivers
+        from . import signals  # noqa: F401
+
+        # Queue loading sample data on startup (only in development); run_jobs loads it
         import os
         from django.conf import settings
         if settings.DEBUG and os.environ.get('LOAD_SAMPLE_DATA', 'False').lower() == 'true':
-            from django.core.management import call_command
+            from . import jobs
             try:
-                # Only load if no organizations exist
-                if not self.get_model('Organization').objects.exists():
-                    call_command('load_sample_data', verbosity=0)
+                # Only queue if no organizations exist and no load is pending
+                pending = self.get_model('Job').objects.filter(
+                    kind='load_sample_data', status__in=['QUEUED', 'RUNNING']
+                )
+                if not self.get_model('Organization').objects.exists() and not pending.exists():
+                    jobs.enqueue('load_sample_data')
             except Exception:
                 pass  # Ignore errors during startup
@@ -0,0 +1,178 @@
+"""
+Hot/cold archival of finished projects.
+
+A project is finished once it is COMPLETED, all of its tasks are DONE and
+nothing in it has changed for ``ARCHIVE_AFTER_DAYS``. Archiving moves its
+tasks and their comments, with their ids and timestamps, into
+``ArchivedTask`` / ``ArchivedTaskComment`` in one transaction per project.
+The hot tables and their ``(project, status)`` indexes then hold only live
+work. The project row stays where it is with ``archived_at`` set. Project
+lists skip it unless ``includeArchived`` is passed, and its task totals
+stay frozen. Archived projects are read-only until ``restore_project``
+moves them back.
+
+Rows are moved with ``INSERT ... SELECT`` and plain ``DELETE`` statements,
+so no delete receivers run: moving a row is not deleting it. Archived tasks
+and comments do leave tombstones, so ``changesSince`` clients drop them;
+restoring removes the tombstones and touches the rows so clients get them
+back.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from . import response_cache, search
+from .models import ArchivedTask, ArchivedTaskComment, Project, SearchEntry, Task, TaskComment, Tombstone
+
+
+def archive_after():
+    return timedelta(days=getattr(settings, 'ARCHIVE_AFTER_DAYS', 90))
+
+
+def archivable_projects(now=None):
+    """Finished projects whose tasks are still in the hot tables"""
+    cutoff = (now or timezone.now()) - archive_after()
+    return Project.objects.filter(
+        status='COMPLETED',
+        archived_at__isnull=True,
+        todo_task_count=0,
+        in_progress_task_count=0,
+        updated_at__lt=cutoff,
+    ).exclude(
+        Exists(Task.objects.filter(project=OuterRef('pk'), updated_at__gte=cutoff))
+    ).exclude(
+        Exists(TaskComment.objects.filter(task__project=OuterRef('pk'), updated_at__gte=cutoff))
+    )
+
+
+def _columns(model):
+    return ', '.join(connection.ops.quote_name(field.column) for field in model._meta.concrete_fields)
+
+
+def _copy(source, target, where, params):
+    """Copy the ``source`` rows matching ``where`` into ``target``; returns how many"""
+    source_table = connection.ops.quote_name(source._meta.db_table)
+    target_table = connection.ops.quote_name(target._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {target_table} ({_columns(target)}) '
+            f'SELECT {_columns(target)} FROM {source_table} WHERE {where}',
+            params
+        )
+        return cursor.rowcount
+
+
+def _delete(source, where, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {connection.ops.quote_name(source._meta.db_table)} WHERE {where}', params)
+
+
+def _leave_tombstones(kind, source, where, params, now):
+    """Tell ``changesSince`` clients the ``source`` rows matching ``where`` are gone"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {connection.ops.quote_name(Tombstone._meta.db_table)} '
+            f'(organization_id, kind, object_id, deleted_at) '
+            f'SELECT organization_id, %s, id, %s FROM {connection.ops.quote_name(source._meta.db_table)} '
+            f'WHERE {where}',
+            [kind, connection.ops.adapt_datetimefield_value(now), *params]
+        )
+
+
+_TASKS_OF = 'project_id = %s'
+_COMMENTS_OF = 'task_id IN (SELECT id FROM {tasks} WHERE project_id = %s)'
+
+
+def archive_project(project):
+    """
+    Move a finished project's tasks and comments to the archive.
+
+    Returns how many tasks moved, or None when the project is no longer
+    archivable.
+    """
+    with transaction.atomic():
+        # Lock the row and recheck, in case it changed since it was picked
+        project = (archivable_projects().select_for_update(of=('self',))
+                   .select_related('organization').filter(pk=project.pk).first())
+        if project is None:
+            return None
+        tasks = Task.objects.filter(project=project)
+        comments = TaskComment.objects.filter(task__project=project)
+        SearchEntry.objects.filter(kind='task', object_id__in=tasks.values('pk')).delete()
+        SearchEntry.objects.filter(kind='comment', object_id__in=comments.values('pk')).delete()
+
+        now = timezone.now()
+        params = [project.pk]
+        comments_of = _COMMENTS_OF.format(tasks=Task._meta.db_table)
+        _leave_tombstones('task', Task, _TASKS_OF, params, now)
+        _leave_tombstones('comment', TaskComment, comments_of, params, now)
+        # Parents are copied first and deleted last, so no foreign key is ever dangling
+        moved = _copy(Task, ArchivedTask, _TASKS_OF, params)
+        _copy(TaskComment, ArchivedTaskComment, comments_of, params)
+        _delete(TaskComment, comments_of, params)
+        _delete(Task, _TASKS_OF, params)
+
+        Project.objects.filter(pk=project.pk).update(archived_at=now, updated_at=now)
+        response_cache.bump_data_version(project.organization.slug)
+    return moved
+
+
+def restore_project(project):
+    """Move an archived project's tasks and comments back to the hot tables"""
+    with transaction.atomic():
+        project = Project.objects.select_for_update().select_related('organization').get(pk=project.pk)
+        if project.archived_at is None:
+            return 0
+        params = [project.pk]
+        comments_of = _COMMENTS_OF.format(tasks=ArchivedTask._meta.db_table)
+        # Parents are copied first and deleted last, so no foreign key is ever dangling
+        moved = _copy(ArchivedTask, Task, _TASKS_OF, params)
+        _copy(ArchivedTaskComment, TaskComment, comments_of, params)
+        _delete(ArchivedTaskComment, comments_of, params)
+        _delete(ArchivedTask, _TASKS_OF, params)
+        tasks = Task.objects.filter(project=project)
+        comments = TaskComment.objects.filter(task__project=project)
+        # Drop the tombstones archiving left, or a client that has not read them yet drops the restored rows
+        Tombstone.objects.filter(
+            organization_id=project.organization_id, kind='task', object_id__in=tasks.values('pk')
+        ).delete()
+        Tombstone.objects.filter(
+            organization_id=project.organization_id, kind='comment', object_id__in=comments.values('pk')
+        ).delete()
+        search.index(tasks, organization_id=project.organization_id)
+        search.index(comments, organization_id=project.organization_id)
+
+        # Touch everything so changesSince sends the rows back to clients
+        now = timezone.now()
+        tasks.update(updated_at=now)
+        comments.update(updated_at=now)
+        Project.objects.filter(pk=project.pk).update(archived_at=None, updated_at=now)
+        response_cache.bump_data_version(project.organization.slug)
+    return moved
+
+
+def archive_finished_projects(limit=None, progress=None):
+    """Archive finished projects one transaction at a time; returns ``(projects, tasks)`` moved"""
+    projects = archivable_projects().order_by('updated_at', 'pk')
+    if limit is not None:
+        projects = projects[:limit]
+    archived = tasks = 0
+    for project in list(projects):
+        moved = archive_project(project)
+        if moved is None:
+            continue
+        archived += 1
+        tasks += moved
+        if progress is not None:
+            progress(project, moved)
+    return archived, tasks
+
+
+def tasks_of(project, include_archived=False):
+    """Task queryset for a project: the archive when it is archived and asked for"""
+    if include_archived and project.archived_at is not None:
+        return ArchivedTask.objects.filter(project=project)
+    return Task.objects.filter(project=project)
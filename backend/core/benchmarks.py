@@ -0,0 +1,206 @@
+"""
+In-process benchmarks for the operations the frontend sends.
+
+Documents are read straight from ``frontend/src/graphql/queries.ts`` and
+``mutations.ts`` so the suite always measures what clients actually run.
+Each operation is executed against ``project_manager.schema.schema`` on a
+synthetic dataset and reports latency percentiles, peak allocations and SQL
+query counts. Results can be compared with a stored baseline.
+"""
+import re
+import statistics as stats
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from .models import Organization, Project, Task
+from .synthetic import SyntheticDataGenerator
+
+
+GRAPHQL_DIR = Path(settings.BASE_DIR).parent / 'frontend' / 'src' / 'graphql'
+DOCUMENT_FILES = ['queries.ts', 'mutations.ts']
+
+# name -> (organizations, projects per org, tasks per project, comments per task)
+SCALES = {
+    'small': (1, 5, 20, 1),
+    'medium': (1, 20, 200, 2),
+    'large': (1, 50, 1000, 2),
+}
+
+_GQL_EXPORT = re.compile(r'export const (\w+) = gql`(.*?)`;', re.DOTALL)
+
+
+@dataclass
+class OperationResult:
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries: int
+    peak_alloc_kb: float
+
+
+@dataclass
+class Fixture:
+    organization: Organization
+    project: Project
+    task: Task
+
+
+def load_documents(directory=GRAPHQL_DIR):
+    """Return ``{export name: document}`` for every gql export in the frontend"""
+    documents = {}
+    for filename in DOCUMENT_FILES:
+        source = (Path(directory) / filename).read_text()
+        for name, document in _GQL_EXPORT.findall(source):
+            documents[name] = document
+    return documents
+
+
+def _variables(name, fixture, iteration):
+    """Variables for each frontend operation; mutations get unique values per run"""
+    slug = fixture.organization.slug
+    project_id = str(fixture.project.pk)
+    task_id = str(fixture.task.pk)
+    variables = {
+        'GET_ORGANIZATIONS': {},
+        'GET_PROJECTS': {'organizationSlug': slug},
+        'GET_PROJECT': {'id': project_id, 'organizationSlug': slug},
+        'GET_PROJECT_STATISTICS': {'organizationSlug': slug},
+        'GET_TASKS': {'projectId': project_id, 'organizationSlug': slug},
+        'GET_TASK': {'id': task_id, 'organizationSlug': slug},
+        'CREATE_ORGANIZATION': {
+            'name': f'Benchmark {iteration}',
+            'slug': f'benchmark-{iteration}-{time.monotonic_ns()}',
+            'contactEmail': 'bench@example.com',
+        },
+        'CREATE_PROJECT': {'organizationSlug': slug, 'name': f'Benchmark project {iteration}'},
+        'UPDATE_PROJECT': {'id': project_id, 'organizationSlug': slug, 'description': f'Run {iteration}'},
+        'CREATE_TASK': {'projectId': project_id, 'organizationSlug': slug, 'title': f'Benchmark task {iteration}'},
+        'UPDATE_TASK': {
+            'id': task_id, 'organizationSlug': slug,
+            'status': ['TODO', 'IN_PROGRESS', 'DONE'][iteration % 3],
+        },
+        'CREATE_TASK_COMMENT': {
+            'taskId': task_id, 'organizationSlug': slug,
+            'content': f'Benchmark comment {iteration}', 'authorEmail': 'bench@example.com',
+        },
+    }
+    return variables.get(name)
+
+
+def build_fixture(scale, seed=0):
+    organizations, projects, tasks, comments = SCALES[scale]
+    SyntheticDataGenerator(
+        organizations=organizations,
+        projects_per_org=projects,
+        tasks_per_project=tasks,
+        comments_per_task=comments,
+        seed=seed,
+        prefix=f'bench-{scale}',
+    ).run()
+    organization = Organization.objects.get(slug=f'bench-{scale}-org-1')
+    project = Project.objects.filter(organization=organization).order_by('pk').first()
+    task = Task.objects.filter(project=project).order_by('pk').first()
+    return Fixture(organization=organization, project=project, task=task)
+
+
+def _percentile(samples, percent):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def benchmark_operation(schema, name, document, fixture, iterations=20, warmup=3):
+    factory = RequestFactory()
+
+    def execute(iteration):
+        result = schema.execute(
+            document,
+            variable_values=_variables(name, fixture, iteration),
+            context_value=factory.post('/graphql/'),
+        )
+        if result.errors:
+            raise RuntimeError(f'{name} failed: {result.errors[0]}')
+
+    for iteration in range(warmup):
+        execute(iteration)
+
+    timings = []
+    for iteration in range(iterations):
+        start = time.perf_counter()
+        execute(warmup + iteration)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    with CaptureQueriesContext(connection) as queries:
+        execute(warmup + iterations)
+
+    tracemalloc.start()
+    try:
+        execute(warmup + iterations + 1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return OperationResult(
+        p50_ms=round(stats.median(timings), 3),
+        p95_ms=round(_percentile(timings, 95), 3),
+        p99_ms=round(_percentile(timings, 99), 3),
+        queries=len(queries.captured_queries),
+        peak_alloc_kb=round(peak / 1024, 1),
+    )
+
+
+def run_benchmarks(schema, scales, iterations=20, warmup=3, operations=None, seed=0, log=None):
+    """Return ``{scale: {operation: OperationResult as dict}}``"""
+    documents = load_documents()
+    results = {}
+    for scale in scales:
+        fixture = build_fixture(scale, seed=seed)
+        results[scale] = {}
+        for name, document in documents.items():
+            if operations and name not in operations:
+                continue
+            if _variables(name, fixture, 0) is None:
+                if log:
+                    log(f'  skipping {name}: no benchmark variables defined')
+                continue
+            result = benchmark_operation(schema, name, document, fixture, iterations, warmup)
+            results[scale][name] = asdict(result)
+            if log:
+                log(
+                    f'  [{scale}] {name}: p50 {result.p50_ms}ms p95 {result.p95_ms}ms '
+                    f'p99 {result.p99_ms}ms, {result.queries} queries, {result.peak_alloc_kb}KB peak'
+                )
+    return results
+
+
+def compare(results, baseline, latency_threshold=0.25):
+    """
+    Return a list of regressions of ``results`` against ``baseline``.
+
+    Any increase in SQL query count is a regression; p95 latency regresses
+    when it grows by more than ``latency_threshold`` (a fraction).
+    """
+    regressions = []
+    for scale, operations in results.items():
+        for name, current in operations.items():
+            previous = baseline.get(scale, {}).get(name)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append(
+                    f"[{scale}] {name}: SQL queries {previous['queries']} -> {current['queries']}"
+                )
+            limit = previous['p95_ms'] * (1 + latency_threshold)
+            if current['p95_ms'] > limit:
+                regressions.append(
+                    f"[{scale}] {name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms "
+                    f"(limit {limit:.3f}ms)"
+                )
+    return regressions
@@ -0,0 +1,239 @@
+"""
+Batch task writes for the bulk mutations.
+
+Each operation checks organization scoping with one query, validates every
+item up front and writes the valid ones in a single transaction with
+``bulk_create`` / ``bulk_update``. Results come back in input order as
+``(task, errors)`` pairs so callers can report per-item outcomes.
+
+The ``COPY`` helpers at the bottom serve the bulk loaders (``synthetic``,
+``importer``).
+"""
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.core.validators import EmailValidator
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import counters, history, search, statistics
+from .models import Project, Task
+
+
+MAX_BATCH_SIZE = 1000
+WRITE_BATCH_SIZE = 500
+
+TASK_STATUSES = {value for value, _ in Task.TASK_STATUS_CHOICES}
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+TASK_FIELDS = ['title', 'description', 'status', 'assignee_email', 'due_date']
+SEARCHABLE_FIELDS = {'title', 'description', 'assignee_email'}
+
+_validate_email = EmailValidator()
+
+
+def check_batch_size(items):
+    if len(items) > MAX_BATCH_SIZE:
+        raise Exception(f"Cannot process more than {MAX_BATCH_SIZE} tasks in one request")
+
+
+def validate_task_values(values):
+    """Return a list of error messages for the task fields present in ``values``"""
+    errors = []
+    title = values.get('title')
+    if title is not None:
+        if not title.strip():
+            errors.append("Title cannot be blank")
+        elif len(title) > TITLE_MAX_LENGTH:
+            errors.append(f"Title cannot exceed {TITLE_MAX_LENGTH} characters")
+    status = values.get('status')
+    if status is not None and status not in TASK_STATUSES:
+        errors.append(f"Invalid status '{status}'")
+    assignee_email = values.get('assignee_email')
+    if assignee_email:
+        try:
+            _validate_email(assignee_email)
+        except ValidationError:
+            errors.append(f"Invalid assignee email '{assignee_email}'")
+    return errors
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def bulk_create_tasks(organization, items):
+    check_batch_size(items)
+    project_ids = {_parse_id(item['project_id']) for item in items}
+    projects = Project.objects.filter(
+        organization=organization, pk__in=project_ids, archived_at__isnull=True
+    ).in_bulk()
+
+    results = []
+    to_create = []
+    for item in items:
+        errors = validate_task_values(item)
+        project = projects.get(_parse_id(item['project_id']))
+        if project is None:
+            errors.append(f"Project with id '{item['project_id']}' not found in organization '{organization.slug}'")
+        if errors:
+            results.append((None, errors))
+            continue
+
+        task = Task(
+            organization=organization,
+            project=project,
+            title=item['title'],
+            description=item.get('description') or '',
+            status=item.get('status') or 'TODO',
+            assignee_email=item.get('assignee_email') or '',
+            due_date=item.get('due_date'),
+        )
+        to_create.append(task)
+        results.append((task, []))
+
+    with transaction.atomic():
+        Task.objects.bulk_create(to_create, batch_size=WRITE_BATCH_SIZE)
+        statistics.record_task_changes(organization.pk, created=[task.status for task in to_create])
+        counters.record_task_changes(
+            [(task.project_id, None, task.status) for task in to_create],
+            [task.project for task in to_create]
+        )
+        history.record_status_changes([(task, None, task.status) for task in to_create])
+        search.index(to_create, organization_id=organization.pk)
+    return results
+
+
+def _fetch_tasks(organization, ids):
+    task_ids = {_parse_id(task_id) for task_id in ids}
+    return (
+        Task.objects
+        .filter(organization=organization, pk__in=task_ids)
+        .select_related('project')
+        .in_bulk()
+    )
+
+
+def _not_found(task_id, organization):
+    return f"Task with id '{task_id}' not found in organization '{organization.slug}'"
+
+
+def bulk_update_tasks(organization, items):
+    check_batch_size(items)
+    tasks = _fetch_tasks(organization, [item['id'] for item in items])
+
+    results = []
+    to_update = {}
+    status_changes = []
+    transitions = []
+    changed_fields = set()
+    now = timezone.now()
+    for item in items:
+        task = tasks.get(_parse_id(item['id']))
+        errors = validate_task_values(item)
+        if task is None:
+            errors.append(_not_found(item['id'], organization))
+        if errors:
+            results.append((None, errors))
+            continue
+
+        old_status = task.status
+        for field in TASK_FIELDS:
+            if item.get(field) is not None:
+                setattr(task, field, item[field])
+                changed_fields.add(field)
+        task.updated_at = now
+        status_changes.append((task.project_id, old_status, task.status))
+        transitions.append((task, old_status, task.status))
+        to_update[task.pk] = task
+        results.append((task, []))
+
+    with transaction.atomic():
+        if to_update:
+            Task.objects.bulk_update(
+                to_update.values(), sorted(changed_fields) + ['updated_at'],
+                batch_size=WRITE_BATCH_SIZE
+            )
+        statistics.record_task_changes(
+            organization.pk, status_changes=[(old, new) for _, old, new in status_changes]
+        )
+        counters.record_task_changes(status_changes, [task.project for task in to_update.values()])
+        history.record_status_changes(transitions)
+        if changed_fields & SEARCHABLE_FIELDS:
+            search.index(to_update.values(), organization_id=organization.pk)
+    return results
+
+
+def bulk_move_tasks(organization, ids, status):
+    """Move every task in ``ids`` to ``status`` with a single UPDATE"""
+    check_batch_size(ids)
+    if status not in TASK_STATUSES:
+        raise Exception(f"Invalid status '{status}'")
+    tasks = _fetch_tasks(organization, ids)
+
+    results = []
+    moved = {}
+    status_changes = []
+    transitions = []
+    now = timezone.now()
+    for task_id in ids:
+        task = tasks.get(_parse_id(task_id))
+        if task is None:
+            results.append((None, [_not_found(task_id, organization)]))
+            continue
+        if task.pk not in moved:
+            status_changes.append((task.project_id, task.status, status))
+            transitions.append((task, task.status, status))
+        task.status = status
+        task.updated_at = now
+        moved[task.pk] = task
+        results.append((task, []))
+
+    with transaction.atomic():
+        Task.objects.filter(pk__in=moved).update(status=status, updated_at=now)
+        statistics.record_task_changes(
+            organization.pk, status_changes=[(old, new) for _, old, new in status_changes]
+        )
+        counters.record_task_changes(status_changes, [task.project for task in moved.values()])
+        history.record_status_changes(transitions)
+    return results
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def reserve_ids(model, count):
+    """Draw ``count`` primary keys from the table's sequence for COPY"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [model._meta.db_table, count]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def copy_rows(model, columns, rows):
+    """Write ``rows`` (values in ``columns`` order) with PostgreSQL ``COPY``"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([r'\N' if value is None else value for value in row])
+    buffer.seek(0)
+
+    column_names = ', '.join(model._meta.get_field(column).column for column in columns)
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(
+            f"COPY {model._meta.db_table} ({column_names}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer
+        )
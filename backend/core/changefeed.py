@@ -0,0 +1,300 @@
+"""
+Organization-scoped change feed, served as Server-Sent Events at ``/events/``.
+
+Mutations publish one event per changed row once their transaction commits.
+Events fan out in-process to every subscriber of the organization and are
+kept in a short replay buffer so a reconnecting ``EventSource`` can resume
+from ``Last-Event-ID``. With ``CHANGE_FEED_BACKEND = 'channels'`` events go
+through the Django Channels layer so that every worker process receives them.
+"""
+import asyncio
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import Project, Task, TaskComment
+
+
+CHANNEL_GROUP = 'change-feed'
+SUBSCRIBER_QUEUE_SIZE = 1000
+RETRY_MS = 2000
+
+# Tells the client its view may have missed events and must refetch
+RESET = 'event: reset\ndata: {}\n\n'
+KEEPALIVE = ': keepalive\n\n'
+
+
+def heartbeat():
+    return getattr(settings, 'CHANGE_FEED_HEARTBEAT', 15)
+
+
+def max_duration():
+    return getattr(settings, 'CHANGE_FEED_MAX_DURATION', 300)
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _row(organization, instance):
+    """Return ``(kind, row)`` shaped like the GraphQL type of ``instance``"""
+    if isinstance(instance, Project):
+        return 'project', {
+            '__typename': 'ProjectType',
+            'id': str(instance.pk),
+            'name': instance.name,
+            'description': instance.description,
+            'status': instance.status,
+            'dueDate': _iso(instance.due_date),
+            'createdAt': _iso(instance.created_at),
+            'updatedAt': _iso(instance.updated_at),
+            'organization': {
+                '__typename': 'OrganizationType',
+                'id': str(organization.pk),
+                'slug': organization.slug,
+            },
+        }
+    if isinstance(instance, Task):
+        return 'task', {
+            '__typename': 'TaskType',
+            'id': str(instance.pk),
+            'title': instance.title,
+            'description': instance.description,
+            'status': instance.status,
+            'assigneeEmail': instance.assignee_email,
+            'dueDate': _iso(instance.due_date),
+            'createdAt': _iso(instance.created_at),
+            'updatedAt': _iso(instance.updated_at),
+            'project': {'__typename': 'ProjectType', 'id': str(instance.project_id)},
+        }
+    if isinstance(instance, TaskComment):
+        return 'comment', {
+            '__typename': 'TaskCommentType',
+            'id': str(instance.pk),
+            'content': instance.content,
+            'authorEmail': instance.author_email,
+            'createdAt': _iso(instance.created_at),
+            'task': {'__typename': 'TaskType', 'id': str(instance.task_id)},
+        }
+    raise TypeError(f'No change feed row for {type(instance).__name__}')
+
+
+def publish(organization, action, instances):
+    """
+    Publish ``<kind>.<action>`` events for ``instances`` once the current
+    transaction commits. Rows are serialized now, as committed.
+    """
+    events = []
+    for instance in instances:
+        kind, row = _row(organization, instance)
+        events.append({
+            'id': uuid.uuid4().hex,
+            'type': f'{kind}.{action}',
+            'organization': organization.slug,
+            'data': row,
+        })
+    if events:
+        transaction.on_commit(lambda: _get_backend().publish(events))
+
+
+class Subscription:
+    """One client's queue of events; async subscriptions are fed on their event loop"""
+
+    def __init__(self, broker, organization_slug, loop=None):
+        self.broker = broker
+        self.organization_slug = organization_slug
+        self.loop = loop
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE) if loop else queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, event):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._put, event)
+        else:
+            self._put(event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except (queue.Full, asyncio.QueueFull):
+            # A client this far behind resyncs instead of blocking publishers
+            self.overflowed = True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def aget(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """In-process fan-out with a per-organization replay buffer"""
+
+    def __init__(self, history_size):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._history = defaultdict(lambda: deque(maxlen=history_size))
+
+    def subscribe(self, organization_slug, last_event_id=None, loop=None):
+        """
+        Return ``(subscription, replay)``. ``replay`` lists the events after
+        ``last_event_id``, or is None when they are no longer buffered.
+        """
+        with self._lock:
+            subscription = Subscription(self, organization_slug, loop)
+            self._subscribers[organization_slug].add(subscription)
+            replay = []
+            if last_event_id:
+                history = list(self._history[organization_slug])
+                ids = [event['id'] for event in history]
+                replay = history[ids.index(last_event_id) + 1:] if last_event_id in ids else None
+            return subscription, replay
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers[subscription.organization_slug].discard(subscription)
+
+    def dispatch(self, events):
+        for event in events:
+            with self._lock:
+                self._history[event['organization']].append(event)
+                subscribers = list(self._subscribers[event['organization']])
+            for subscription in subscribers:
+                subscription.deliver(event)
+
+
+broker = Broker(history_size=getattr(settings, 'CHANGE_FEED_HISTORY', 500))
+
+
+class LocalBackend:
+    def publish(self, events):
+        broker.dispatch(events)
+
+    def listen(self):
+        pass
+
+
+class ChannelLayerBackend:
+    """Relays events between worker processes through the Channels layer"""
+
+    def __init__(self):
+        try:
+            from channels.layers import get_channel_layer
+        except ImportError:
+            raise ImproperlyConfigured("CHANGE_FEED_BACKEND = 'channels' requires the channels package")
+        self.layer = get_channel_layer()
+        if self.layer is None:
+            raise ImproperlyConfigured("CHANGE_FEED_BACKEND = 'channels' requires CHANNEL_LAYERS")
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, events):
+        async_to_sync(self.layer.group_send)(
+            CHANNEL_GROUP, {'type': 'change.events', 'events': events}
+        )
+
+    def listen(self):
+        """Start this process's relay from the layer to the local broker"""
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=asyncio.run, args=(self._relay(),), name='change-feed-relay', daemon=True
+                )
+                self._listener.start()
+
+    async def _relay(self):
+        channel = await self.layer.new_channel()
+        while True:
+            # Re-joining keeps the membership from expiring on idle feeds
+            await self.layer.group_add(CHANNEL_GROUP, channel)
+            try:
+                message = await asyncio.wait_for(self.layer.receive(channel), 60)
+            except asyncio.TimeoutError:
+                continue
+            broker.dispatch(message['events'])
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = getattr(settings, 'CHANGE_FEED_BACKEND', 'local')
+            if name == 'local':
+                _backend = LocalBackend()
+            elif name == 'channels':
+                _backend = ChannelLayerBackend()
+            else:
+                raise ImproperlyConfigured(f"Unknown CHANGE_FEED_BACKEND '{name}'")
+        return _backend
+
+
+def _format(event):
+    return f"id: {event['id']}\nevent: change\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
+
+
+def _opening(replay):
+    yield f'retry: {RETRY_MS}\n\n'
+    if replay is None:
+        yield RESET
+    else:
+        yield from (_format(event) for event in replay)
+
+
+def stream(organization_slug, last_event_id=None):
+    """Server-Sent Events for a WSGI worker thread"""
+    _get_backend().listen()
+    subscription, replay = broker.subscribe(organization_slug, last_event_id)
+    try:
+        yield from _opening(replay)
+        # Streams end periodically; EventSource reconnects and resumes
+        deadline = time.monotonic() + max_duration()
+        while time.monotonic() < deadline:
+            if subscription.overflowed:
+                yield RESET
+                return
+            event = subscription.get(timeout=heartbeat())
+            yield _format(event) if event else KEEPALIVE
+    finally:
+        subscription.close()
+
+
+async def astream(organization_slug, last_event_id=None):
+    """Server-Sent Events on the ASGI event loop"""
+    _get_backend().listen()
+    subscription, replay = broker.subscribe(
+        organization_slug, last_event_id, loop=asyncio.get_running_loop()
+    )
+    try:
+        for chunk in _opening(replay):
+            yield chunk
+        deadline = time.monotonic() + max_duration()
+        while time.monotonic() < deadline:
+            if subscription.overflowed:
+                yield RESET
+                return
+            event = await subscription.aget(timeout=heartbeat())
+            yield _format(event) if event else KEEPALIVE
+    finally:
+        subscription.close()
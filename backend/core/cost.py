@@ -0,0 +1,189 @@
+"""
+Static cost and depth analysis for GraphQL operations.
+
+Runs on the validated document before execution. Every object a query can
+materialize costs 1, list fields multiply their items' cost by the page
+size they can return, and fields that run extra SQL carry an additional
+weight. Operations over the configured budgets are rejected without
+touching the database.
+"""
+from dataclasses import dataclass
+
+from django.conf import settings
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    IntValueNode,
+    VariableNode,
+    get_named_type,
+    get_operation_ast,
+)
+from graphql.execution.values import get_variable_values
+
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+# Extra cost per resolved value for fields that do their own database work
+FIELD_WEIGHTS = {
+    'Query.projectStatistics': 5,
+    'Query.search': 10,
+    'Query.changesSince': 10,
+    'Query.projectBurndown': 2,
+    'Query.organizationThroughput': 2,
+    'Query.overdueTaskCounts': 5,
+}
+
+
+@dataclass
+class OperationCost:
+    cost: int
+    depth: int
+
+    def as_extension(self):
+        return {
+            'cost': self.cost,
+            'depth': self.depth,
+            'maxCost': max_cost(),
+            'maxDepth': max_depth(),
+        }
+
+
+def max_cost():
+    return getattr(settings, 'GRAPHQL_MAX_QUERY_COST', 10000)
+
+
+def max_depth():
+    return getattr(settings, 'GRAPHQL_MAX_QUERY_DEPTH', 10)
+
+
+def default_list_size():
+    return getattr(settings, 'GRAPHQL_DEFAULT_LIST_SIZE', 50)
+
+
+def analyze(schema, document, operation_name=None, variables=None):
+    """Return the ``OperationCost`` of the operation that will be executed"""
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return OperationCost(cost=0, depth=0)
+
+    root_type = schema.get_root_type(operation.operation)
+    analyzer = _Analyzer(schema, document, _coerce_variables(schema, operation, variables))
+    cost, depth = analyzer.selection_cost(root_type, operation.selection_set, depth=0)
+    return OperationCost(cost=cost, depth=depth)
+
+
+def _coerce_variables(schema, operation, variables):
+    """Variables as execution will see them; invalid ones are left to execution to report"""
+    if not isinstance(variables, dict):
+        variables = {}
+    coerced = get_variable_values(schema, operation.variable_definitions or (), variables)
+    return coerced if isinstance(coerced, dict) else {}
+
+
+def check_budget(operation_cost):
+    """Return an error message when ``operation_cost`` exceeds a budget, else None"""
+    if operation_cost.depth > max_depth():
+        return f"Query depth {operation_cost.depth} exceeds the maximum depth of {max_depth()}"
+    if operation_cost.cost > max_cost():
+        return f"Query cost {operation_cost.cost} exceeds the maximum cost of {max_cost()}"
+    return None
+
+
+class _Analyzer:
+    def __init__(self, schema, document, variables):
+        self.schema = schema
+        self.variables = variables
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+
+    def selection_cost(self, parent_type, selection_set, depth):
+        """Return ``(cost, depth)`` for a selection set resolved on ``parent_type``"""
+        total_cost = 0
+        max_seen_depth = depth
+        for node, node_type in self._fields(parent_type, selection_set):
+            cost, field_depth = self.field_cost(node_type, node, depth + 1)
+            total_cost += cost
+            max_seen_depth = max(max_seen_depth, field_depth)
+        return total_cost, max_seen_depth
+
+    def field_cost(self, parent_type, node, depth):
+        name = node.name.value
+        if name.startswith('__'):
+            # Introspection is served from the schema, not the database
+            return 0, depth - 1
+
+        field = getattr(parent_type, 'fields', {}).get(name)
+        if field is None:
+            return 0, depth
+
+        named_type = get_named_type(field.type)
+        weight = FIELD_WEIGHTS.get(f'{parent_type.name}.{name}', 0)
+        if not isinstance(named_type, GraphQLObjectType):
+            return weight, depth
+
+        children_cost, children_depth = self.selection_cost(
+            named_type, node.selection_set, depth
+        )
+        item_cost = 1 + weight + children_cost
+        return self.multiplier(parent_type, field, node) * item_cost, children_depth
+
+    def multiplier(self, parent_type, field, node):
+        """How many items a field can return"""
+        field_type = field.type
+        if isinstance(field_type, GraphQLNonNull):
+            field_type = field_type.of_type
+
+        page_size = self.argument(node, 'first')
+        if page_size is None:
+            page_size = self.argument(node, 'last')
+        if page_size is not None:
+            # Out-of-range sizes are rejected by the resolvers; never let them lower the cost
+            return min(max(page_size, 0), MAX_PAGE_SIZE)
+        if get_named_type(field_type).name.endswith('Connection'):
+            return DEFAULT_PAGE_SIZE
+        if isinstance(field_type, GraphQLList):
+            # A connection's page size has already been applied to its edges
+            if parent_type.name.endswith('Connection'):
+                return 1
+            return default_list_size()
+        return 1
+
+    def argument(self, node, name):
+        for argument in node.arguments or ():
+            if argument.name.value != name:
+                continue
+            value = argument.value
+            if isinstance(value, IntValueNode):
+                return int(value.value)
+            if isinstance(value, VariableNode):
+                value = self.variables.get(value.name.value)
+                # bool is an int subclass
+                if isinstance(value, int) and not isinstance(value, bool):
+                    return value
+        return None
+
+    def _fields(self, parent_type, selection_set):
+        """Yield ``(field node, parent type)`` pairs, expanding fragments"""
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection, parent_type
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = self.schema.get_type(selection.type_condition.name.value)
+                yield from self._fields(fragment_type, selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                # Validation has already rejected unknown and cyclic fragments
+                fragment = self.fragments[selection.name.value]
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                yield from self._fields(fragment_type, fragment.selection_set)
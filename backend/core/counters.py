@@ -0,0 +1,104 @@
+"""
+Per-project task counters.
+
+``Project`` stores its task total and per-status totals so that reading them
+costs nothing. Every task write moves them with ``F()`` updates inside the
+writer's transaction: single saves and deletes through the receivers in
+``signals``, batches through ``bulk``. Writes that bypass both (raw SQL,
+``QuerySet.update``) must call ``rebuild_counters`` afterwards.
+
+Archived projects keep the totals they had when their tasks moved to the
+archive tables (see ``archive``), so rebuilding and checking skip them.
+"""
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Project, Task
+
+
+STATUS_COUNTERS = {
+    'TODO': 'todo_task_count',
+    'IN_PROGRESS': 'in_progress_task_count',
+    'DONE': 'done_task_count',
+}
+
+
+def _deltas(changes):
+    deltas = defaultdict(Counter)
+    for project_id, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            if status is None:
+                continue
+            deltas[project_id][STATUS_COUNTERS[status]] += sign
+        if old_status is None or new_status is None:
+            deltas[project_id]['task_count'] += 1 if old_status is None else -1
+    return deltas
+
+
+def record_task_changes(changes, projects=()):
+    """
+    Move counters for ``(project_id, old_status, new_status)`` transitions.
+
+    An ``old_status`` of None is a created task and a ``new_status`` of None
+    a deleted one. Projects with the same delta share one UPDATE. In-memory
+    ``projects`` are adjusted too, so a mutation can return them as-is.
+    """
+    deltas = _deltas(changes)
+    by_delta = defaultdict(list)
+    for project_id, delta in deltas.items():
+        key = tuple(sorted((field, value) for field, value in delta.items() if value))
+        if key:
+            by_delta[key].append(project_id)
+
+    # Bumping updated_at lets changesSince pick up the new totals
+    now = timezone.now()
+    for key, project_ids in by_delta.items():
+        Project.objects.filter(pk__in=project_ids).update(
+            updated_at=now, **{field: F(field) + value for field, value in key}
+        )
+
+    moved = {project_id for project_ids in by_delta.values() for project_id in project_ids}
+    for project in {project.pk: project for project in projects}.values():
+        if project.pk not in moved:
+            continue
+        deferred = project.get_deferred_fields()
+        for field, value in deltas[project.pk].items():
+            if value and field not in deferred:
+                setattr(project, field, getattr(project, field) + value)
+        if 'updated_at' not in deferred:
+            project.updated_at = now
+
+
+def _task_count(status=None):
+    tasks = Task.objects.filter(project=OuterRef('pk'))
+    if status is not None:
+        tasks = tasks.filter(status=status)
+    return Coalesce(Subquery(
+        tasks.order_by().values('project').annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def rebuild_counters(projects=None):
+    """Recompute the counters of ``projects`` (default: all) from the task table"""
+    if projects is None:
+        projects = Project.objects.all()
+    return projects.filter(archived_at__isnull=True).update(
+        task_count=_task_count(),
+        **{field: _task_count(status) for status, field in STATUS_COUNTERS.items()}
+    )
+
+
+def with_actual_counts(projects):
+    """Annotate the live ``projects`` with task totals named ``actual_<counter>``"""
+    return projects.filter(archived_at__isnull=True).annotate(
+        actual_task_count=Count('tasks'),
+        **{
+            f'actual_{field}': Count('tasks', filter=Q(tasks__status=status))
+            for status, field in STATUS_COUNTERS.items()
+        }
+    )
@@ -0,0 +1,48 @@
+"""
+Overdue and due-soon tasks.
+
+Every query here is limited to open tasks with a due date, which is exactly
+the condition of the partial ``core_task_open_due_idx`` index on
+``(organization, due_date, id)``. DONE tasks are not in the index, so
+deadline lists and counts cost the same however many tasks have been
+completed. Lists are ordered by due date, earliest first, and paginated on
+the index's ``(due_date, id)`` keyset.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .models import Task
+
+
+DEFAULT_DUE_SOON_DAYS = 7
+MAX_DUE_SOON_DAYS = 90
+
+
+def open_tasks(organization):
+    """Tasks of ``organization`` that have a due date and are not DONE"""
+    return Task.objects.filter(organization=organization, due_date__isnull=False).exclude(status='DONE')
+
+
+def overdue_tasks(organization, now=None):
+    return open_tasks(organization).filter(due_date__lt=now or timezone.now())
+
+
+def due_soon_tasks(organization, within_days=DEFAULT_DUE_SOON_DAYS, now=None):
+    """Open tasks due from now until ``within_days`` days from now"""
+    if not 1 <= within_days <= MAX_DUE_SOON_DAYS:
+        raise Exception(f"'withinDays' must be between 1 and {MAX_DUE_SOON_DAYS}")
+    now = now or timezone.now()
+    return open_tasks(organization).filter(due_date__gte=now, due_date__lt=now + timedelta(days=within_days))
+
+
+def overdue_counts(organization, now=None):
+    """``{'project_id', 'overdue', 'oldest_due_date'}`` rows for projects with overdue tasks, most overdue tasks first"""
+    return list(
+        overdue_tasks(organization, now)
+        .order_by()
+        .values('project_id')
+        .annotate(overdue=Count('id'), oldest_due_date=Min('due_date'))
+        .order_by('-overdue', 'project_id')
+    )
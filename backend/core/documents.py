@@ -0,0 +1,108 @@
+"""
+Parsed document cache and Automatic Persisted Queries (APQ).
+
+Clients send the same handful of operations over and over, so validated
+documents are kept in a process-wide LRU keyed by the sha256 of the query
+text. Persisted queries let a client send only that hash; the query text is
+registered in a Django cache (``GRAPHQL_PERSISTED_QUERY_CACHE``) once it has
+validated, so only real operations are stored.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from graphql import GraphQLError, parse, validate
+
+from .lru import MISSING, LRUCache
+
+
+PERSISTED_QUERY_NOT_FOUND = 'PersistedQueryNotFound'
+
+_documents = LRUCache(maxsize=getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_SIZE', 512))
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+def get_validated_document(schema, query):
+    """
+    Return ``(document, errors)`` for ``query`` against the GraphQL schema.
+
+    Only documents that validate are cached; invalid ones are re-checked on
+    every request so that they cannot crowd out real operations.
+    """
+    key = query_hash(query)
+    document = _documents.get(key)
+    if document is not MISSING:
+        return document, []
+
+    try:
+        document = parse(query)
+    except GraphQLError as error:
+        return None, [error]
+
+    errors = validate(schema, document)
+    if errors:
+        return None, errors
+
+    _documents.set(key, document)
+    return document, []
+
+
+def document_cache_stats():
+    return _documents.stats()
+
+
+def _persisted_queries():
+    return caches[getattr(settings, 'GRAPHQL_PERSISTED_QUERY_CACHE', 'default')]
+
+
+def _persisted_query_extension(request, data):
+    extensions = request.GET.get('extensions') or data.get('extensions')
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            raise GraphQLError('Extensions are invalid JSON.')
+    if not isinstance(extensions, dict):
+        return None
+    return extensions.get('persistedQuery')
+
+
+def resolve_persisted_query(request, data, query):
+    """
+    Apply the persisted-query protocol to an incoming request.
+
+    Returns ``(query, sha256_hash)``: the query text to execute, and the hash
+    to register it under once it validates (None when there is nothing to
+    register). A hash without text is looked up in the store.
+    """
+    persisted_query = _persisted_query_extension(request, data)
+    if not persisted_query:
+        return query, None
+
+    if persisted_query.get('version') != 1:
+        raise GraphQLError('Unsupported persisted query version.')
+    sha256_hash = persisted_query.get('sha256Hash')
+    if not isinstance(sha256_hash, str):
+        raise GraphQLError('Persisted query is missing its sha256Hash.')
+
+    if not query:
+        query = _persisted_queries().get(f'apq:{sha256_hash}')
+        if query is None:
+            raise GraphQLError(
+                PERSISTED_QUERY_NOT_FOUND,
+                extensions={'code': 'PERSISTED_QUERY_NOT_FOUND'}
+            )
+        return query, None
+
+    if query_hash(query) != sha256_hash:
+        raise GraphQLError('Provided sha256Hash does not match query.')
+    return query, sha256_hash
+
+
+def register_persisted_query(sha256_hash, query):
+    """Store a validated ``query`` so later requests can send only its hash"""
+    _persisted_queries().set(f'apq:{sha256_hash}', query, timeout=None)
@@ -0,0 +1,138 @@
+"""
+Streaming export of one organization as NDJSON or CSV.
+
+Rows are read table by table (the organization, then its projects, tasks
+and comments, each in id order, so parents always come before their
+children) through ``iterator()``, which uses server-side cursors on
+PostgreSQL. Encoded lines are flushed in small chunks, so memory stays flat
+however large the organization is and the first bytes go out immediately.
+
+The whole export reads from one snapshot: a REPEATABLE READ transaction on
+PostgreSQL, a read transaction on SQLite.
+"""
+import csv
+import io
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import ArchivedTask, ArchivedTaskComment, Organization, Project, Task, TaskComment
+
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+CHUNK_SIZE = 2000  # Rows fetched per round trip
+BUFFER_SIZE = 64 * 1024  # Bytes encoded before a chunk is sent
+
+FIELDS = {
+    'organization': ['id', 'name', 'slug', 'contact_email', 'created_at'],
+    'project': ['id', 'organization_id', 'name', 'description', 'status', 'due_date',
+                'created_at', 'updated_at'],
+    'task': ['id', 'project_id', 'title', 'description', 'status', 'assignee_email', 'due_date',
+             'created_at', 'updated_at'],
+    'comment': ['id', 'task_id', 'content', 'author_email', 'created_at', 'updated_at'],
+}
+
+# One CSV header for every kind; columns a kind does not have are left empty
+CSV_COLUMNS = ['kind'] + list(dict.fromkeys(name for names in FIELDS.values() for name in names))
+
+
+def _querysets(organization, using):
+    """``(kind, queryset)`` pairs in export order; archived tasks and comments are included"""
+    return [
+        ('organization', Organization.objects.using(using).filter(pk=organization.pk)),
+        ('project', Project.objects.using(using).filter(organization=organization)),
+        ('task', Task.objects.using(using).filter(organization=organization)),
+        ('task', ArchivedTask.objects.using(using).filter(organization=organization)),
+        ('comment', TaskComment.objects.using(using).filter(organization=organization)),
+        ('comment', ArchivedTaskComment.objects.using(using).filter(organization=organization)),
+    ]
+
+
+def rows(organization, using=DEFAULT_DB_ALIAS):
+    """Yield ``(kind, {field: value})`` for the organization and everything under it"""
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+
+        for kind, queryset in _querysets(organization, using):
+            names = FIELDS[kind]
+            values = queryset.order_by('pk').values_list(*names).iterator(chunk_size=CHUNK_SIZE)
+            for row in values:
+                yield kind, dict(zip(names, row))
+
+
+def _plain(record):
+    # isoformat keeps microseconds, which DjangoJSONEncoder drops
+    for name, value in record.items():
+        if hasattr(value, 'isoformat'):
+            record[name] = value.isoformat()
+    return record
+
+
+def _ndjson_lines(records):
+    for kind, record in records:
+        yield json.dumps({'kind': kind, **_plain(record)}, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _csv_lines(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_COLUMNS, restval='')
+    writer.writeheader()
+    for kind, record in records:
+        writer.writerow({'kind': kind, **_plain(record)})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def render(organization, format='ndjson', compress=False, using=DEFAULT_DB_ALIAS):
+    """Return an iterator over the encoded export of ``organization``, in chunks of bytes"""
+    if format not in FORMATS:
+        raise Exception(f"Unknown export format '{format}'")
+    lines = (_ndjson_lines if format == 'ndjson' else _csv_lines)(rows(organization, using))
+    return _chunks(lines, compress)
+
+
+def _chunks(lines, compress):
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31: gzip container
+
+    def encode(text, final=False):
+        data = text.encode()
+        if compressor is None:
+            return data
+        data = compressor.compress(data)
+        # A sync flush lets the client decompress everything sent so far
+        return data + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    pending, size, first = [], 0, True
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        # The first line goes out at once so the download starts right away
+        if first or size >= BUFFER_SIZE:
+            yield encode(''.join(pending))
+            pending, size, first = [], 0, False
+    final = encode(''.join(pending), final=True)
+    if final:
+        yield final
+
+
+async def arender(*args, **kwargs):
+    """``render`` for ASGI, run on one worker thread so its transaction stays on one connection"""
+    chunks = render(*args, **kwargs)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await next_chunk(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
@@ -0,0 +1,206 @@
+"""
+Task status history and daily activity buckets.
+
+Every status change of a task, creation and deletion included, appends a
+``TaskStatusEvent`` and bumps two buckets inside the writer's transaction:
+
+- ``ProjectDailyStatistics`` counts the day's changes of one project and
+  holds its status totals after the last of them.
+- ``OrganizationDailyStatistics`` counts the day's changes of one
+  organization and sums the cycle time of the tasks completed that day.
+
+Buckets are upserted with ``INSERT ... ON CONFLICT DO UPDATE``, so concurrent
+writers add to the same row instead of racing on it. ``projectBurndown`` and
+``organizationThroughput`` read only the buckets, so a year of history is a
+range scan of at most 366 rows. Days without a bucket saw no change.
+"""
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import OrganizationDailyStatistics, ProjectDailyStatistics, TaskStatusEvent
+
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 731
+WRITE_BATCH_SIZE = 500
+
+DELTA_FIELDS = ['created', 'completed', 'reopened', 'deleted']
+
+_PROJECT_UPSERT = """
+    INSERT INTO core_projectdailystatistics
+        (project_id, date, created, completed, reopened, deleted, todo, in_progress, done)
+    SELECT p.id, %s, %s, %s, %s, %s, p.todo_task_count, p.in_progress_task_count, p.done_task_count
+    FROM core_project p WHERE p.id = %s
+    ON CONFLICT (project_id, date) DO UPDATE SET
+        created = core_projectdailystatistics.created + excluded.created,
+        completed = core_projectdailystatistics.completed + excluded.completed,
+        reopened = core_projectdailystatistics.reopened + excluded.reopened,
+        deleted = core_projectdailystatistics.deleted + excluded.deleted,
+        todo = excluded.todo,
+        in_progress = excluded.in_progress,
+        done = excluded.done
+"""
+
+_ORGANIZATION_UPSERT = """
+    INSERT INTO core_organizationdailystatistics
+        (organization_id, date, created, completed, reopened, deleted, cycle_time_total)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (organization_id, date) DO UPDATE SET
+        created = core_organizationdailystatistics.created + excluded.created,
+        completed = core_organizationdailystatistics.completed + excluded.completed,
+        reopened = core_organizationdailystatistics.reopened + excluded.reopened,
+        deleted = core_organizationdailystatistics.deleted + excluded.deleted,
+        cycle_time_total = core_organizationdailystatistics.cycle_time_total + excluded.cycle_time_total
+"""
+
+
+def _delta(old_status, new_status):
+    return Counter({
+        'created': int(old_status is None),
+        'deleted': int(new_status is None),
+        'completed': int(new_status == 'DONE'),
+        'reopened': int(old_status == 'DONE' and new_status is not None),
+    })
+
+
+def record_status_changes(changes, projects=(), now=None):
+    """
+    Log ``(task, old_status, new_status)`` changes and add them to today's buckets.
+
+    Call it after the project counters have moved, in the same transaction:
+    project buckets copy the counters as the day's totals. ``projects`` lists
+    more project ids whose totals changed without a status change.
+    """
+    now = now or timezone.now()
+    events = []
+    by_project = defaultdict(Counter)
+    by_organization = defaultdict(Counter)
+    for task, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        events.append(TaskStatusEvent(
+            organization_id=task.organization_id,
+            project_id=task.project_id,
+            task_id=task.pk,
+            from_status=old_status,
+            to_status=new_status,
+            occurred_at=now,
+        ))
+        delta = _delta(old_status, new_status)
+        by_project[task.project_id].update(delta)
+        created_at = task.__dict__.get('created_at')
+        if new_status == 'DONE' and created_at is not None:
+            delta['cycle_time_total'] = max(int((now - created_at).total_seconds()), 0)
+        by_organization[task.organization_id].update(delta)
+    for project_id in projects:
+        by_project.setdefault(project_id, Counter())
+    if not by_project:
+        return
+
+    TaskStatusEvent.objects.bulk_create(events, batch_size=WRITE_BATCH_SIZE)
+    day = timezone.localdate(now)
+    with connection.cursor() as cursor:
+        # Sorted so concurrent writers lock bucket rows in the same order
+        cursor.executemany(_PROJECT_UPSERT, [
+            [day, *(delta[field] for field in DELTA_FIELDS), project_id]
+            for project_id, delta in sorted(by_project.items())
+        ])
+        if by_organization:
+            cursor.executemany(_ORGANIZATION_UPSERT, [
+                [organization_id, day, *(delta[field] for field in DELTA_FIELDS), delta['cycle_time_total']]
+                for organization_id, delta in sorted(by_organization.items())
+            ])
+
+
+def date_range(since=None, until=None):
+    """Validate a reporting window; defaults to the last ``DEFAULT_DAYS`` days up to today"""
+    until = until or timezone.localdate()
+    since = since or until - timedelta(days=DEFAULT_DAYS - 1)
+    if since > until:
+        raise Exception("'since' cannot be after 'until'")
+    if (until - since).days >= MAX_DAYS:
+        raise Exception(f"Date ranges cannot exceed {MAX_DAYS} days")
+    return since, until
+
+
+def _days(since, until):
+    for offset in range((until - since).days + 1):
+        yield since + timedelta(days=offset)
+
+
+@dataclass
+class BurndownPoint:
+    date: object
+    todo: int
+    in_progress: int
+    done: int
+    created: int
+    completed: int
+
+    @property
+    def remaining(self):
+        return self.todo + self.in_progress
+
+
+def project_burndown(project, since=None, until=None):
+    """
+    Daily ``BurndownPoint``s of ``project`` from ``since`` to ``until``.
+
+    Totals carry over days without changes. Days before the project's first
+    bucket (its first task change, or the day history tracking started) are
+    left out.
+    """
+    since, until = date_range(since, until)
+    buckets = {
+        bucket.date: bucket
+        for bucket in ProjectDailyStatistics.objects.filter(project=project, date__range=(since, until))
+    }
+    # The totals in force when the window opens
+    last = ProjectDailyStatistics.objects.filter(project=project, date__lt=since).order_by('-date').first()
+
+    points = []
+    for day in _days(since, until):
+        bucket = buckets.get(day)
+        if bucket is not None:
+            last = bucket
+        if last is None:
+            continue
+        points.append(BurndownPoint(
+            date=day,
+            todo=last.todo,
+            in_progress=last.in_progress,
+            done=last.done,
+            created=bucket.created if bucket is not None else 0,
+            completed=bucket.completed if bucket is not None else 0,
+        ))
+    return points
+
+
+@dataclass
+class ThroughputPoint:
+    date: object
+    created: int = 0
+    completed: int = 0
+    reopened: int = 0
+    deleted: int = 0
+    cycle_time_total: int = 0
+
+    @property
+    def average_cycle_time_hours(self):
+        if not self.completed:
+            return None
+        return round(self.cycle_time_total / self.completed / 3600, 2)
+
+
+def organization_throughput(organization, since=None, until=None):
+    """Daily ``ThroughputPoint``s of ``organization`` from ``since`` to ``until``, days without changes included"""
+    since, until = date_range(since, until)
+    buckets = OrganizationDailyStatistics.objects.filter(
+        organization=organization, date__range=(since, until)
+    ).values('date', *DELTA_FIELDS, 'cycle_time_total')
+    by_day = {bucket.pop('date'): bucket for bucket in buckets}
+    return [ThroughputPoint(date=day, **by_day.get(day, {})) for day in _days(since, until)]
@@ -0,0 +1,314 @@
+"""
+Bulk import of projects, tasks and comments from NDJSON or CSV.
+
+Input uses the layout written by ``export``: one record per line (or CSV
+row) with a ``kind`` column and the record's own ``id``. Tasks point at
+their project with ``project_id`` and comments at their task with
+``task_id``, using the ids from the file. Parents must come before their
+children. ``organization`` records are skipped; everything is imported into
+the target organization.
+
+Records are read lazily and processed in chunks. Each chunk is validated in
+one pass, with parent ids resolved through in-memory maps, then written in
+one transaction: ``bulk_create`` for projects, ``COPY`` for tasks and
+comments on PostgreSQL (``bulk_create`` elsewhere). The same transaction
+records the new ids in ``ImportedRow`` and advances the ``ImportRun``
+checkpoint, so a failed import resumes after its last committed chunk.
+"""
+import codecs
+import csv
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.validators import EmailValidator
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import bulk, counters, history, response_cache, search, statistics
+from .models import ImportedRow, ImportRun, Project, Task, TaskComment
+
+
+FORMATS = ('ndjson', 'csv')
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+PROJECT_STATUSES = {value for value, _ in Project.STATUS_CHOICES}
+NAME_MAX_LENGTH = Project._meta.get_field('name').max_length
+SOURCE_ID_MAX_LENGTH = ImportedRow._meta.get_field('source_id').max_length
+
+_validate_email = EmailValidator()
+
+
+def read_records(lines, format):
+    """Yield one dict per record from an iterable of byte lines"""
+    lines = codecs.iterdecode(lines, 'utf-8-sig')
+    if format == 'csv':
+        for record in csv.DictReader(lines):
+            # CSV cannot tell an empty value from a missing one
+            yield {name: value for name, value in record.items() if value != '' and name is not None}
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield record if isinstance(record, dict) else {'kind': None}
+
+
+def _source_id(value):
+    if value is None or value == '':
+        return None
+    return str(value)[:SOURCE_ID_MAX_LENGTH]
+
+
+def _text(record, name):
+    value = record.get(name)
+    return '' if value is None else str(value)
+
+
+def _moment(record, name, errors, parse=parse_datetime):
+    value = record.get(name)
+    if value is None:
+        return None
+    try:
+        parsed = parse(str(value))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        errors.append(f"Invalid {name} '{value}'")
+        return None
+    if parse is parse_datetime and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _email_errors(email, label):
+    try:
+        _validate_email(email)
+    except ValidationError:
+        return [f"Invalid {label} '{email}'"]
+    return []
+
+
+class Importer:
+    """Imports records into one organization, checkpointing into an ``ImportRun``"""
+
+    def __init__(self, run, chunk_size=CHUNK_SIZE, progress=None):
+        self.run = run
+        self.organization = run.organization
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.use_copy = connection.vendor == 'postgresql'
+        self.now = timezone.now()
+        # Source id -> primary key, rebuilt from earlier chunks on resume
+        self.ids = {'project': {}, 'task': {}}
+        for kind, source_id, object_id in run.imported_rows.values_list('kind', 'source_id', 'object_id'):
+            self.ids[kind][source_id] = object_id
+
+    def run_import(self, records):
+        """Import ``records``, skipping those committed by an earlier attempt"""
+        run = self.run
+        run.status = 'RUNNING'
+        run.save(update_fields=['status', 'updated_at'])
+        started = time.monotonic()
+        skipped = run.rows_processed
+        try:
+            numbered = enumerate(records, start=1)
+            chunk = []
+            for number, record in numbered:
+                if number <= skipped:
+                    continue
+                chunk.append((number, record))
+                if len(chunk) == self.chunk_size:
+                    self._commit_chunk(chunk)
+                    self._report(skipped, started)
+                    chunk = []
+            if chunk:
+                self._commit_chunk(chunk)
+            run.status = 'COMPLETED'
+            run.save(update_fields=['status', 'updated_at'])
+        except Exception:
+            run.status = 'FAILED'
+            run.save(update_fields=['status', 'updated_at'])
+            raise
+        # Mappings only serve resumes
+        run.imported_rows.all().delete()
+        self._report(skipped, started)
+        return run
+
+    def _report(self, skipped, started):
+        if self.progress is not None:
+            elapsed = time.monotonic() - started
+            rate = (self.run.rows_processed - skipped) / elapsed if elapsed else 0
+            self.progress(self.run, rate)
+
+    def _error(self, number, errors):
+        self.run.error_count += 1
+        if len(self.run.errors) < MAX_REPORTED_ERRORS:
+            self.run.errors.append({'row': number, 'errors': errors})
+
+    def _commit_chunk(self, chunk):
+        by_kind = {'project': [], 'task': [], 'comment': []}
+        for number, record in chunk:
+            kind = record.get('kind')
+            if kind in by_kind:
+                by_kind[kind].append((number, record))
+            elif kind is None:
+                self._error(number, ["Missing or unreadable kind"])
+            elif kind != 'organization':
+                self._error(number, [f"Unknown kind '{kind}'"])
+
+        run = self.run
+        with transaction.atomic():
+            # Children in this chunk may point at parents written just before them
+            projects = self._write_projects(self._valid('project', by_kind['project'], self._project))
+            tasks = self._write_tasks(self._valid('task', by_kind['task'], self._task))
+            comments = self._write_comments(self._valid('comment', by_kind['comment'], self._comment))
+
+            counters.record_task_changes([(task.project_id, None, task.status) for task in tasks])
+            # Imported work is not activity of the day; only the totals move
+            history.record_status_changes([], projects={task.project_id for task in tasks})
+            if statistics.rollup_enabled():
+                statistics.rebuild_statistics(self.organization)
+            search.index([*projects, *tasks, *comments], organization_id=self.organization.pk)
+
+            run.rows_processed += len(chunk)
+            run.projects_created += len(projects)
+            run.tasks_created += len(tasks)
+            run.comments_created += len(comments)
+            run.errors.sort(key=lambda error: error['row'])
+            run.save()
+            response_cache.bump_data_version(self.organization.slug)
+
+    def _valid(self, kind, numbered, validate):
+        """Return ``(source id, values)`` for the records that pass ``validate``"""
+        valid = []
+        pending = set()
+        for number, record in numbered:
+            source_id, values, errors = validate(record)
+            if source_id is not None and (source_id in pending or source_id in self.ids.get(kind, ())):
+                errors.append(f"Duplicate {kind} id '{source_id}'")
+            if errors:
+                self._error(number, errors)
+                continue
+            valid.append((source_id, values))
+            if source_id is not None:
+                pending.add(source_id)
+        return valid
+
+    def _parent(self, kind, record, field, errors):
+        source_id = _source_id(record.get(field))
+        object_id = self.ids[kind].get(source_id)
+        if object_id is None:
+            errors.append(f"Unknown {kind} '{record.get(field)}'")
+        return object_id
+
+    def _project(self, record):
+        errors = []
+        source_id = _source_id(record.get('id'))
+        name = _text(record, 'name')
+        if not name.strip():
+            errors.append("Name cannot be blank")
+        elif len(name) > NAME_MAX_LENGTH:
+            errors.append(f"Name cannot exceed {NAME_MAX_LENGTH} characters")
+        status = record.get('status') or 'ACTIVE'
+        if status not in PROJECT_STATUSES:
+            errors.append(f"Invalid status '{status}'")
+        values = {
+            'organization_id': self.organization.pk,
+            'name': name,
+            'description': _text(record, 'description'),
+            'status': status,
+            'due_date': _moment(record, 'due_date', errors, parse=parse_date),
+        }
+        return source_id, values, errors
+
+    def _task(self, record):
+        errors = []
+        source_id = _source_id(record.get('id'))
+        values = {
+            'organization_id': self.organization.pk,
+            'project_id': self._parent('project', record, 'project_id', errors),
+            'title': _text(record, 'title'),
+            'description': _text(record, 'description'),
+            'status': record.get('status') or 'TODO',
+            'assignee_email': _text(record, 'assignee_email'),
+            'due_date': _moment(record, 'due_date', errors),
+            'created_at': _moment(record, 'created_at', errors) or self.now,
+        }
+        errors.extend(bulk.validate_task_values(values))
+        return source_id, values, errors
+
+    def _comment(self, record):
+        errors = []
+        values = {
+            'organization_id': self.organization.pk,
+            'task_id': self._parent('task', record, 'task_id', errors),
+            'content': _text(record, 'content'),
+            'author_email': _text(record, 'author_email'),
+            'created_at': _moment(record, 'created_at', errors) or self.now,
+        }
+        if not values['content'].strip():
+            errors.append("Content cannot be blank")
+        errors.extend(_email_errors(values['author_email'], 'author email'))
+        return None, values, errors
+
+    def _remember(self, kind, source_ids, instances):
+        mapped = [
+            ImportedRow(run=self.run, kind=kind, source_id=source_id, object_id=instance.pk)
+            for source_id, instance in zip(source_ids, instances)
+            if source_id is not None
+        ]
+        for row in mapped:
+            self.ids[kind][row.source_id] = row.object_id
+        ImportedRow.objects.bulk_create(mapped, batch_size=bulk.WRITE_BATCH_SIZE)
+
+    def _write_projects(self, valid):
+        projects = Project.objects.bulk_create(
+            [Project(**values) for _, values in valid], batch_size=bulk.WRITE_BATCH_SIZE
+        )
+        self._remember('project', [source_id for source_id, _ in valid], projects)
+        return projects
+
+    def _write_tasks(self, valid):
+        tasks = self._write(Task, [values for _, values in valid])
+        self._remember('task', [source_id for source_id, _ in valid], tasks)
+        return tasks
+
+    def _write_comments(self, valid):
+        return self._write(TaskComment, [values for _, values in valid])
+
+    def _write(self, model, rows):
+        if not rows:
+            return []
+        if not self.use_copy:
+            # bulk_create stamps created_at with the current time; only COPY keeps it
+            return model.objects.bulk_create(
+                [model(**row) for row in rows], batch_size=bulk.WRITE_BATCH_SIZE
+            )
+        ids = bulk.reserve_ids(model, len(rows))
+        bulk.copy_rows(model, ['id', *rows[0], 'updated_at'], (
+            [object_id, *row.values(), self.now] for object_id, row in zip(ids, rows)
+        ))
+        return [model(id=object_id, **row) for object_id, row in zip(ids, rows)]
+
+
+def import_records(organization, records, format, source='', run=None, chunk_size=CHUNK_SIZE,
+                   progress=None):
+    """
+    Import ``records`` into ``organization`` and return the ``ImportRun``.
+
+    Pass the ``run`` of a failed import, with the same input, to resume it.
+    ``progress(run, rows_per_second)`` is called after every chunk.
+    """
+    if format not in FORMATS:
+        raise Exception(f"Unknown import format '{format}'")
+    if run is None:
+        run = ImportRun.objects.create(organization=organization, source=source, format=format)
+    elif run.status == 'COMPLETED':
+        raise Exception(f"Import {run.pk} has already completed")
+    return Importer(run, chunk_size=chunk_size, progress=progress).run_import(records)
@@ -0,0 +1,284 @@
+"""
+Database-backed background jobs.
+
+A job is a ``Job`` row naming a registered handler. ``enqueue`` inserts it in
+the caller's transaction, so workers only see it once the work that asked
+for it has committed. Workers (``python manage.py run_jobs``) claim the next
+due job, highest priority first. On PostgreSQL the claim reads with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so concurrent workers pass over each
+other's rows instead of waiting on them. SQLite has no row locks and
+serializes writers. There a claim is a conditional UPDATE that only one
+worker can win.
+
+A job that raises is queued again after ``JOB_RETRY_DELAY * 2 ** (attempts - 1)``
+seconds until it has used its attempts. Running jobs whose lock is older
+than ``JOB_LOCK_TIMEOUT`` (their worker died) are treated as failed attempts.
+"""
+import gzip
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from contextlib import nullcontext
+from copy import copy
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import changefeed, counters, importer, response_cache, search, statistics
+from .models import ImportRun, Job, Organization, Project, Task, TaskComment
+
+
+CLAIM_RETRIES = 5  # Claims lost to another worker before giving up for this poll
+HOUSEKEEPING_INTERVAL = 60  # Seconds between stale-lock and retention sweeps
+MAX_ERROR_LENGTH = 10000
+MAX_PRIORITY = 100  # Bound for priorities chosen by API clients
+SPOOL_BUFFER_SIZE = 64 * 1024
+
+HANDLERS = {}
+
+
+def max_attempts():
+    return getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+
+
+def retry_delay():
+    return getattr(settings, 'JOB_RETRY_DELAY', 30)
+
+
+def lock_timeout():
+    return timedelta(seconds=getattr(settings, 'JOB_LOCK_TIMEOUT', 3600))
+
+
+def poll_interval():
+    return getattr(settings, 'JOB_POLL_INTERVAL', 1.0)
+
+
+def retention():
+    return timedelta(days=getattr(settings, 'JOB_RETENTION_DAYS', 7))
+
+
+def spool_dir():
+    return Path(getattr(settings, 'JOB_SPOOL_DIR', Path(settings.BASE_DIR) / 'spool'))
+
+
+def handler(kind):
+    """Register the decorated ``function(job)`` as the handler of ``kind``; its return value is stored as the result"""
+    def register(function):
+        HANDLERS[kind] = function
+        return function
+    return register
+
+
+def enqueue(kind, organization=None, payload=None, priority=0, delay=0):
+    """Queue a ``kind`` job; it becomes visible to workers when the current transaction commits"""
+    if kind not in HANDLERS:
+        raise Exception(f"Unknown job kind '{kind}'")
+    return Job.objects.create(
+        organization=organization,
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts(),
+    )
+
+
+def claim(worker):
+    """Mark the next due job as run by ``worker`` and return it, or None when none is due"""
+    due = Job.objects.select_related('organization').order_by('-priority', 'run_at', 'pk')
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    for _ in range(CLAIM_RETRIES):
+        now = timezone.now()
+        # SQLite fails a read transaction that tries to write after another writer; use autocommit there
+        with transaction.atomic() if skip_locked else nullcontext():
+            candidates = due.filter(status='QUEUED', run_at__lte=now)
+            if skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True, of=('self',))
+            job = candidates.first()
+            if job is None:
+                return None
+            # Without row locks another worker may have claimed it since the read
+            claimed = Job.objects.filter(pk=job.pk, status='QUEUED').update(
+                status='RUNNING', attempts=F('attempts') + 1, locked_by=worker, locked_at=now
+            )
+        if claimed:
+            job.status, job.attempts, job.locked_by, job.locked_at = 'RUNNING', job.attempts + 1, worker, now
+            _status_changed(job)
+            return job
+    return None
+
+
+def _status_changed(job):
+    # Job status is served through GraphQL, so cached responses must not outlive it
+    if job.organization is not None:
+        response_cache.bump_data_version(job.organization.slug)
+
+
+def _claimed(job):
+    """Filter matching ``job`` only while the claim this process holds is still current"""
+    return Job.objects.filter(pk=job.pk, status='RUNNING', locked_by=job.locked_by, locked_at=job.locked_at)
+
+
+def _attempt_failed(job, error):
+    now = timezone.now()
+    if job.attempts >= job.max_attempts:
+        changes = {'status': 'FAILED', 'finished_at': now}
+    else:
+        changes = {
+            'status': 'QUEUED',
+            'run_at': now + timedelta(seconds=retry_delay() * 2 ** (job.attempts - 1)),
+            'locked_by': '',
+            'locked_at': None,
+        }
+    changes['last_error'] = error[-MAX_ERROR_LENGTH:]
+    if _claimed(job).update(**changes):
+        for name, value in changes.items():
+            setattr(job, name, value)
+        _status_changed(job)
+
+
+def run(job):
+    """Run a claimed job and record its outcome; returns the job"""
+    try:
+        function = HANDLERS.get(job.kind)
+        if function is None:
+            raise Exception(f"Unknown job kind '{job.kind}'")
+        result = function(job)
+    except Exception:
+        _attempt_failed(job, traceback.format_exc())
+        return job
+    changes = {'status': 'SUCCEEDED', 'result': result, 'finished_at': timezone.now()}
+    if _claimed(job).update(**changes):
+        for name, value in changes.items():
+            setattr(job, name, value)
+        _status_changed(job)
+    return job
+
+
+def recover_stale_jobs():
+    """Count running jobs whose lock expired as failed attempts; returns how many"""
+    stale = Job.objects.select_related('organization').filter(status='RUNNING', locked_at__lt=timezone.now() - lock_timeout())
+    for job in stale:
+        _attempt_failed(job, f"Worker '{job.locked_by}' stopped responding")
+    return len(stale)
+
+
+def prune_jobs(before=None):
+    """Delete jobs that finished before the retention period; returns how many"""
+    before = before or timezone.now() - retention()
+    deleted, _ = Job.objects.filter(status__in=['SUCCEEDED', 'FAILED'], finished_at__lt=before).delete()
+    return deleted
+
+
+def work(worker, burst=False, interval=None, stop=None, progress=None):
+    """
+    Claim and run jobs until ``stop`` is set; returns how many ran.
+
+    With ``burst`` the loop ends as soon as no job is due. ``progress(job)``
+    is called after every job.
+    """
+    interval = poll_interval() if interval is None else interval
+    stop = stop or threading.Event()
+    ran = 0
+    housekeeping_at = 0
+    while not stop.is_set():
+        # Drop connections the database closed while idle, like a request would
+        close_old_connections()
+        if time.monotonic() >= housekeeping_at:
+            recover_stale_jobs()
+            prune_jobs()
+            housekeeping_at = time.monotonic() + HOUSEKEEPING_INTERVAL
+        job = claim(worker)
+        if job is None:
+            if burst:
+                break
+            stop.wait(interval)
+            continue
+        run(job)
+        ran += 1
+        if progress is not None:
+            progress(job)
+    return ran
+
+
+def spool_upload(stream, suffix=''):
+    """Copy an uploaded body into the spool directory for a worker to read; returns the file name"""
+    directory = spool_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f'{uuid.uuid4().hex}{suffix}'
+    with open(directory / name, 'wb') as spooled:
+        shutil.copyfileobj(stream, spooled, SPOOL_BUFFER_SIZE)
+    return name
+
+
+# Built-in jobs
+
+@handler('rebuild_statistics')
+def rebuild_statistics(job):
+    statistics.rebuild_statistics(job.organization)
+
+
+@handler('rebuild_counters')
+def rebuild_counters(job):
+    return {'projects': counters.rebuild_counters(Project.objects.filter(organization=job.organization))}
+
+
+@handler('rebuild_search_index')
+def rebuild_search_index(job):
+    search.rebuild_index(job.organization)
+
+
+@handler('delete_project')
+def delete_project(job):
+    """Delete a project with all of its tasks and comments"""
+    organization = job.organization
+    project = Project.objects.filter(pk=job.payload['project_id'], organization=organization).first()
+    if project is None:
+        return {'deleted': 0}
+    with transaction.atomic():
+        # Set-based, before the children go: the delete receivers skip rows deleted with their project
+        search.unindex(project)
+        # Plain DELETEs: with delete receivers registered, delete() would load every task and comment
+        comments = connection.ops.quote_name(TaskComment._meta.db_table)
+        tasks = connection.ops.quote_name(Task._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {comments} WHERE task_id IN (SELECT id FROM {tasks} WHERE project_id = %s)',
+                [project.pk]
+            )
+            deleted = cursor.rowcount
+            cursor.execute(f'DELETE FROM {tasks} WHERE project_id = %s', [project.pk])
+            deleted += cursor.rowcount
+        deleted_project = copy(project)  # delete() clears the primary key
+        deleted += project.delete()[0]
+        changefeed.publish(organization, 'deleted', [deleted_project])
+        response_cache.bump_data_version(organization.slug)
+    return {'deleted': deleted}
+
+
+@handler('import_file')
+def import_file(job):
+    """Import a file spooled by the import endpoint; retries resume the same ``ImportRun``"""
+    run = ImportRun.objects.select_related('organization').get(pk=job.payload['run_id'])
+    path = spool_dir() / job.payload['file']
+    if run.status != 'COMPLETED':
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rb') as lines:
+            importer.import_records(run.organization, importer.read_records(lines, run.format), run.format, run=run)
+    path.unlink(missing_ok=True)
+    return {'run': run.pk}
+
+
+@handler('load_sample_data')
+def load_sample_data(job):
+    from django.core.management import call_command
+
+    # Only load if no organizations exist
+    if not Organization.objects.exists():
+        call_command('load_sample_data', verbosity=0)
@@ -0,0 +1,45 @@
+"""
+Django management command to move finished projects' tasks and comments to the archive tables.
+Run with: python manage.py archive_finished_work [--limit <n>] [--dry-run] [--restore <project id>]
+Schedule it (e.g. nightly with cron) to keep the hot task tables small.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.archive import archivable_projects, archive_finished_projects, restore_project
+from core.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Archives COMPLETED projects whose tasks are all DONE and idle for ARCHIVE_AFTER_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int,
+                            help='Archive at most this many projects in this run')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List the projects that would be archived without moving anything')
+        parser.add_argument('--restore', type=int, metavar='PROJECT_ID',
+                            help='Move an archived project back to the hot tables instead')
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            project = Project.objects.filter(pk=options['restore']).first()
+            if project is None:
+                raise CommandError(f"Project with id '{options['restore']}' not found")
+            if project.archived_at is None:
+                raise CommandError(f"Project with id '{project.pk}' is not archived")
+            moved = restore_project(project)
+            self.stdout.write(self.style.SUCCESS(f'Restored {moved} tasks of {project.name}.'))
+            return
+
+        if options['dry_run']:
+            projects = archivable_projects().order_by('updated_at', 'pk')
+            if options['limit']:
+                projects = projects[:options['limit']]
+            for project in projects:
+                self.stdout.write(f'{project.pk} {project.name}: {project.task_count} tasks')
+            return
+
+        archived, tasks = archive_finished_projects(limit=options['limit'], progress=self.report)
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} projects ({tasks} tasks).'))
+
+    def report(self, project, moved):
+        self.stdout.write(f'Archived {project.name} ({moved} tasks)')
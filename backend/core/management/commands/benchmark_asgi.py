@@ -0,0 +1,150 @@
+"""
+Django management command comparing the WSGI and ASGI GraphQL paths under concurrent load.
+Run with: python manage.py benchmark_asgi [--organization acme-corp] [--requests 200] [--concurrency 32]
+"""
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from core.models import Organization
+
+
+# Two independent root fields: served one after the other on WSGI, concurrently on ASGI
+DEFAULT_QUERY = """
+query Dashboard($organizationSlug: String!) {
+  projects(organizationSlug: $organizationSlug) {
+    id
+    name
+    status
+    taskCount
+    completedTasks
+  }
+  projectStatistics(organizationSlug: $organizationSlug) {
+    totalProjects
+    activeProjects
+    completedProjects
+    totalTasks
+    completedTasks
+    overallCompletionRate
+  }
+}
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Sends the same GraphQL query through the WSGI and ASGI request handlers '
+        'in-process and reports throughput and latency percentiles for each'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', default='acme-corp',
+                            help='Organization slug to query (default: acme-corp)')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per path (default: 200)')
+        parser.add_argument('--concurrency', type=int, default=32,
+                            help='Concurrent clients on the ASGI path (default: 32)')
+        parser.add_argument('--wsgi-threads', type=int, default=4,
+                            help='Request threads of the WSGI worker (default: 4)')
+        parser.add_argument('--db-latency', type=float, default=0,
+                            help='Milliseconds added to every SQL query to mimic a networked database (default: 0)')
+        parser.add_argument('--query-file',
+                            help='File with the GraphQL document to send (default: projects + projectStatistics)')
+
+    def handle(self, *args, **options):
+        if not Organization.objects.filter(slug=options['organization']).exists():
+            raise CommandError(f"Organization with slug '{options['organization']}' not found")
+
+        query = DEFAULT_QUERY
+        if options['query_file']:
+            with open(options['query_file']) as f:
+                query = f.read()
+        body = json.dumps({
+            'query': query,
+            'variables': {'organizationSlug': options['organization']},
+        })
+
+        latency = options['db_latency'] / 1000
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_delay(sender, connection, **kwargs):
+            # Connections are per thread; wrap each one as it is opened
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        if latency:
+            connection_created.connect(add_delay)
+            for connection in connections.all():
+                connection.close()
+
+        # Measure execution, not the response cache or metrics sampling
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            GRAPHQL_RESPONSE_CACHE=False,
+            GRAPHQL_METRICS_SAMPLE_RATE=0,
+        ):
+            wsgi = self.run_wsgi(body, options['requests'], options['wsgi_threads'])
+            with override_settings(ROOT_URLCONF='project_manager.asgi_urls'):
+                asgi = asyncio.run(self.run_asgi(body, options['requests'], options['concurrency']))
+
+        connection_created.disconnect(add_delay)
+        self.report(f"WSGI ({options['wsgi_threads']} threads)", wsgi, options['requests'])
+        self.report(f"ASGI ({options['concurrency']} concurrent)", asgi, options['requests'])
+
+    def run_wsgi(self, body, requests, threads):
+        local = threading.local()
+
+        def send(_):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            start = time.perf_counter()
+            response = local.client.post('/graphql/', body, content_type='application/json')
+            self.check_response(response)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = list(executor.map(send, range(requests)))
+        return time.perf_counter() - start, latencies
+
+    async def run_asgi(self, body, requests, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post('/graphql/', body, content_type='application/json')
+                self.check_response(response)
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(send() for _ in range(requests)))
+        return time.perf_counter() - start, latencies
+
+    def check_response(self, response):
+        payload = json.loads(response.content)
+        if response.status_code != 200 or payload.get('errors'):
+            raise CommandError(f'Request failed ({response.status_code}): {payload.get("errors")}')
+
+    def report(self, label, run, requests):
+        elapsed, latencies = run
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{label}: {requests / elapsed:.1f} req/s, '
+            f'p50 {percentiles[49] * 1000:.1f}ms, p95 {percentiles[94] * 1000:.1f}ms, '
+            f'p99 {percentiles[98] * 1000:.1f}ms'
+        )
@@ -0,0 +1,89 @@
+"""
+Django management command to benchmark the frontend's GraphQL operations.
+Run with: python manage.py benchmark_graphql [--scales small,medium] [--baseline benchmarks/baseline.json]
+"""
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.benchmarks import SCALES, compare, run_benchmarks
+from project_manager.schema import schema
+
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs every operation in frontend/src/graphql against the schema at several '
+        'dataset scales and fails on query-count or latency regressions'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='small,medium',
+                            help=f"Comma-separated scales from {', '.join(SCALES)} (default: small,medium)")
+        parser.add_argument('--operations',
+                            help='Comma-separated operation names to run (default: all)')
+        parser.add_argument('--iterations', type=int, default=20,
+                            help='Timed runs per operation (default: 20)')
+        parser.add_argument('--warmup', type=int, default=3,
+                            help='Untimed runs per operation (default: 3)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed for the synthetic dataset (default: 0)')
+        parser.add_argument('--output',
+                            help='Write results as JSON to this path')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                            help='Baseline JSON to compare against (default: benchmarks/baseline.json)')
+        parser.add_argument('--latency-threshold', type=float, default=0.25,
+                            help='Allowed fractional p95 latency growth over baseline (default: 0.25)')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Overwrite the baseline with these results instead of comparing')
+
+    def handle(self, *args, **options):
+        scales = [scale.strip() for scale in options['scales'].split(',') if scale.strip()]
+        unknown = [scale for scale in scales if scale not in SCALES]
+        if unknown:
+            raise CommandError(f"Unknown scale(s): {', '.join(unknown)}")
+        operations = None
+        if options['operations']:
+            operations = {name.strip() for name in options['operations'].split(',')}
+
+        # Datasets and mutations are rolled back so benchmarks leave no trace
+        with transaction.atomic():
+            results = run_benchmarks(
+                schema, scales,
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                operations=operations,
+                seed=options['seed'],
+                log=self.stdout.write,
+            )
+            transaction.set_rollback(True)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(f"Results written to {options['output']}")
+
+        baseline_path = Path(options['baseline'])
+        if options['update_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline updated: {baseline_path}'))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'No baseline at {baseline_path}; skipping comparison.'))
+            return
+
+        regressions = compare(
+            results, json.loads(baseline_path.read_text()),
+            latency_threshold=options['latency_threshold'],
+        )
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f'{len(regressions)} performance regression(s) against {baseline_path}')
+        self.stdout.write(self.style.SUCCESS('No regressions against baseline.'))
@@ -0,0 +1,35 @@
+"""
+Django management command to export an organization as NDJSON or CSV.
+Run with: python manage.py export_organization <slug> [--format csv] [--gzip] [--output <file>]
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from core.export import FORMATS, render
+from core.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Streams an organization with its projects, tasks and comments to a file or stdout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization', help='Slug of the organization to export')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.filter(slug=options['organization']).first()
+        if organization is None:
+            raise CommandError(f"Organization with slug '{options['organization']}' not found")
+
+        chunks = render(organization, options['format'], options['gzip'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported '{organization.slug}' to {options['output']}."))
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
@@ -1,9 +1,13 @@
 """
 Django management command to load sample data.
 Run with: python manage.py load_sample_data
+Generate a large synthetic dataset with: python manage.py load_sample_data --scale
 """
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from core.models import Organization, Project, Task, TaskComment
+from core.synthetic import SyntheticDataGenerator
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
@@ -18,6 +22,25 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing data before loading',
         )
+        parser.add_argument(
+            '--scale',
+            action='store_true',
+            help='Generate a synthetic dataset instead of the fixed sample data',
+        )
+        parser.add_argument('--organizations', type=int, default=10,
+                            help='Organizations to generate with --scale (default: 10)')
+        parser.add_argument('--projects-per-org', type=int, default=20,
+                            help='Projects per organization with --scale (default: 20)')
+        parser.add_argument('--tasks-per-project', type=int, default=200,
+                            help='Tasks per project with --scale (default: 200)')
+        parser.add_argument('--comments-per-task', type=float, default=2,
+                            help='Mean comments per task with --scale (default: 2)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed for a reproducible --scale dataset (default: 0)')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows written per batch with --scale (default: 5000)')
+        parser.add_argument('--prefix', default='scale',
+                            help='Slug prefix for generated organizations (default: scale)')
 
     def handle(self, *args, **options):
         if options['clear']:
@@ -28,6 +51,10 @@ class Command(BaseCommand):
             Organization.objects.all().delete()
             self.stdout.write(self.style.SUCCESS('Existing data cleared.'))
 
+        if options['scale']:
+            self.load_synthetic_data(options)
+            return
+
         self.stdout.write('Loading sample data...')
 
         # Create Organizations
@@ -278,3 +305,30 @@ class Command(BaseCommand):
         self.stdout.write(f'  Tasks: {Task.objects.count()}')
         self.stdout.write(f'  Comments: {TaskComment.objects.count()}')
 
+
+    def load_synthetic_data(self, options):
+        prefix = options['prefix']
+        if Organization.objects.filter(slug__startswith=f'{prefix}-org-').exists():
+            raise CommandError(
+                f"Organizations with prefix '{prefix}' already exist. "
+                "Use --clear or a different --prefix."
+            )
+
+        self.stdout.write('Generating synthetic data...')
+        started = time.monotonic()
+        counts = SyntheticDataGenerator(
+            organizations=options['organizations'],
+            projects_per_org=options['projects_per_org'],
+            tasks_per_project=options['tasks_per_project'],
+            comments_per_task=options['comments_per_task'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            prefix=prefix,
+            stdout=self.stdout if options['verbosity'] > 1 else None,
+        ).run()
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.SUCCESS(f'\nSynthetic data generated in {elapsed:.1f}s'))
+        self.stdout.write('\nSummary:')
+        for name, count in counts.items():
+            self.stdout.write(f'  {name.title()}: {count}')
@@ -0,0 +1,14 @@
+"""
+Django management command to delete tombstones past their retention period.
+Run with: python manage.py prune_tombstones
+"""
+from django.core.management.base import BaseCommand
+from core.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Deletes changesSince tombstones older than CHANGES_SINCE_TOMBSTONE_DAYS'
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones.'))
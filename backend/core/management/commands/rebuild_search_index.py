@@ -0,0 +1,30 @@
+"""
+Django management command to rebuild the full-text search index.
+Run with: python manage.py rebuild_search_index [--organization <slug>]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Organization, SearchEntry
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rewrites the search entries of projects, tasks and comments from live data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            help='Slug of a single organization to rebuild (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        organization = None
+        if options['organization']:
+            organization = Organization.objects.filter(slug=options['organization']).first()
+            if organization is None:
+                raise CommandError(f"Organization with slug '{options['organization']}' not found")
+
+        rebuild_index(organization)
+        entries = SearchEntry.objects.all()
+        if organization is not None:
+            entries = entries.filter(organization=organization)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {entries.count()} search entries.'))
@@ -0,0 +1,35 @@
+"""
+Django management command to rebuild the organization statistics rollup.
+Run with: python manage.py rebuild_statistics [--organization <slug>]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Organization
+from core.statistics import rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the per-organization statistics rollup table from live data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            help='Slug of a single organization to rebuild (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.all()
+        if options['organization']:
+            organizations = organizations.filter(slug=options['organization'])
+            if not organizations.exists():
+                raise CommandError(f"Organization with slug '{options['organization']}' not found")
+
+        rebuilt = 0
+        for organization in organizations.iterator():
+            rollup = rebuild_statistics(organization)
+            rebuilt += 1
+            self.stdout.write(
+                f'{organization.slug}: {rollup.total_projects} projects, '
+                f'{rollup.total_tasks} tasks'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics for {rebuilt} organization(s).'))
@@ -0,0 +1,72 @@
+"""
+Django management command to run queued background jobs.
+Run with: python manage.py run_jobs [--processes <n>] [--burst] [--poll-interval <seconds>]
+SIGTERM or Ctrl+C stops it once the jobs in progress have finished.
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs (statistics rebuilds, imports, project deletes, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Worker processes to run side by side (default: 1)')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no job is due instead of waiting for new ones')
+        parser.add_argument('--poll-interval', type=float,
+                            help='Seconds to wait when the queue is empty (default: JOB_POLL_INTERVAL)')
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes < 1:
+            raise CommandError('--processes must be at least 1')
+        if processes == 1:
+            ran = self.work(options)
+            self.stdout.write(self.style.SUCCESS(f'Ran {ran} jobs.'))
+            return
+
+        # Forked workers must open their own database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=self.work, args=(options,)) for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+
+        def stop_workers(signum, frame):
+            for worker in workers:
+                if worker.is_alive():
+                    os.kill(worker.pid, signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, stop_workers)
+        signal.signal(signal.SIGINT, stop_workers)
+        for worker in workers:
+            worker.join()
+        failed = [worker.pid for worker in workers if worker.exitcode]
+        if failed:
+            raise CommandError(f"Worker process(es) {', '.join(map(str, failed))} exited with an error")
+        self.stdout.write(self.style.SUCCESS(f'{processes} workers stopped.'))
+
+    def work(self, options):
+        stop = threading.Event()
+        # Finish the job in progress, then leave the loop
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        return jobs.work(worker, burst=options['burst'], interval=options['poll_interval'],
+                         stop=stop, progress=self.report)
+
+    def report(self, job):
+        line = f'{job.kind} job {job.pk}: {job.status} (attempt {job.attempts} of {job.max_attempts})'
+        if job.status == 'SUCCEEDED' or not job.last_error.strip():
+            self.stdout.write(line)
+        else:
+            self.stdout.write(self.style.WARNING(f'{line}: {job.last_error.strip().splitlines()[-1]}'))
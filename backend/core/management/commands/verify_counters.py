@@ -0,0 +1,54 @@
+"""
+Django management command to check the per-project task counters against the task table.
+Run with: python manage.py verify_counters [--organization <slug>] [--repair]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.counters import rebuild_counters, with_actual_counts
+from core.models import Organization, Project
+
+
+REPAIR_BATCH_SIZE = 500
+
+class Command(BaseCommand):
+    help = 'Reports projects whose stored task counters disagree with their tasks, and optionally repairs them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            help='Slug of a single organization to check (default: all)',
+        )
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Recompute the counters of every drifted project',
+        )
+
+    def handle(self, *args, **options):
+        projects = Project.objects.order_by('pk')
+        if options['organization']:
+            if not Organization.objects.filter(slug=options['organization']).exists():
+                raise CommandError(f"Organization with slug '{options['organization']}' not found")
+            projects = projects.filter(organization__slug=options['organization'])
+
+        drifted = []
+        checked = 0
+        for project in with_actual_counts(projects).iterator(chunk_size=2000):
+            checked += 1
+            differences = [
+                f'{field} {getattr(project, field)} != {getattr(project, f"actual_{field}")}'
+                for field in Project.COUNTER_FIELDS
+                if getattr(project, field) != getattr(project, f'actual_{field}')
+            ]
+            if differences:
+                drifted.append(project.pk)
+                self.stdout.write(f'Project {project.pk} ({project.name}): {", ".join(differences)}')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f'Counters of {checked} project(s) are exact.'))
+            return
+        if not options['repair']:
+            raise CommandError(f'{len(drifted)} of {checked} project(s) have drifted counters; rerun with --repair')
+
+        for start in range(0, len(drifted), REPAIR_BATCH_SIZE):
+            rebuild_counters(Project.objects.filter(pk__in=drifted[start:start + REPAIR_BATCH_SIZE]))
+        self.stdout.write(self.style.SUCCESS(f'Repaired counters of {len(drifted)} project(s).'))
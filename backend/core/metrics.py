@@ -0,0 +1,297 @@
+"""
+Per-operation GraphQL instrumentation exposed in Prometheus text format.
+
+A sampled fraction of operations (``GRAPHQL_METRICS_SAMPLE_RATE``) records:
+
+* resolver latency histograms per operation name and field,
+* SQL query counts and SQL time per operation name and field,
+* SQL query counts and SQL time per operation name and database alias,
+* end-to-end operation latency.
+
+Label values are bounded, so clients cannot grow the registry: operation
+names outside ``GRAPHQL_METRICS_OPERATIONS`` are counted as ``other``, and
+fields are labelled ``Type.field`` from the schema rather than by their
+(aliased) response path.
+
+``MetricsMiddleware`` times resolvers and marks the field being resolved;
+a database ``execute_wrapper`` installed by ``record_operation`` charges
+every query to that field. Unsampled operations skip all of it.
+"""
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Field label used for SQL issued outside any resolver (e.g. by the view itself)
+OPERATION_FIELD = '<operation>'
+# Operation label for names outside the allow-list, and for anonymous operations
+OTHER_OPERATION = 'other'
+
+_current_recorder = ContextVar('graphql_metrics_recorder', default=None)
+_current_field = ContextVar('graphql_metrics_field', default=OPERATION_FIELD)
+
+
+class Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(DURATION_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Process-wide store of the recorded series"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.operations = defaultdict(int)
+            self.operation_durations = defaultdict(Histogram)
+            self.resolver_durations = defaultdict(Histogram)
+            self.sql_queries = defaultdict(int)
+            self.sql_seconds = defaultdict(float)
+            self.database_queries = defaultdict(int)
+            self.database_seconds = defaultdict(float)
+
+    def merge(self, recorder):
+        operation = recorder.operation
+        with self._lock:
+            self.operations[operation] += 1
+            self.operation_durations[operation].observe(recorder.duration)
+            for field, durations in recorder.resolver_durations.items():
+                histogram = self.resolver_durations[(operation, field)]
+                for duration in durations:
+                    histogram.observe(duration)
+            for field, count in recorder.sql_queries.items():
+                self.sql_queries[(operation, field)] += count
+            for field, seconds in recorder.sql_seconds.items():
+                self.sql_seconds[(operation, field)] += seconds
+            for alias, count in recorder.database_queries.items():
+                self.database_queries[(operation, alias)] += count
+            for alias, seconds in recorder.database_seconds.items():
+                self.database_seconds[(operation, alias)] += seconds
+
+    def render(self):
+        """Return every series in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            _render_counter(
+                lines, 'graphql_operations_total',
+                'GraphQL operations recorded (sampled)',
+                {(operation,): value for operation, value in self.operations.items()},
+                ('operation',),
+            )
+            _render_histograms(
+                lines, 'graphql_operation_duration_seconds',
+                'End-to-end execution time of sampled GraphQL operations',
+                {(operation,): value for operation, value in self.operation_durations.items()},
+                ('operation',),
+            )
+            _render_histograms(
+                lines, 'graphql_resolver_duration_seconds',
+                'Resolver execution time per field',
+                self.resolver_durations, ('operation', 'field'),
+            )
+            _render_counter(
+                lines, 'graphql_sql_queries_total',
+                'SQL queries issued per field',
+                self.sql_queries, ('operation', 'field'),
+            )
+            _render_counter(
+                lines, 'graphql_sql_duration_seconds_total',
+                'Time spent in SQL per field',
+                self.sql_seconds, ('operation', 'field'),
+            )
+            _render_counter(
+                lines, 'graphql_database_queries_total',
+                'SQL queries issued per database alias',
+                self.database_queries, ('operation', 'database'),
+            )
+            _render_counter(
+                lines, 'graphql_database_duration_seconds_total',
+                'Time spent in SQL per database alias',
+                self.database_seconds, ('operation', 'database'),
+            )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class OperationRecorder:
+    """Collects one operation's measurements before merging them into the registry"""
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.duration = 0.0
+        self.resolver_durations = defaultdict(list)
+        self.sql_queries = defaultdict(int)
+        self.sql_seconds = defaultdict(float)
+        self.database_queries = defaultdict(int)
+        self.database_seconds = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        # Django execute_wrapper: charge the query to the field being resolved
+        field = _current_field.get()
+        alias = context['connection'].alias
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.sql_queries[field] += 1
+            self.sql_seconds[field] += elapsed
+            self.database_queries[alias] += 1
+            self.database_seconds[alias] += elapsed
+
+
+def sample_rate():
+    return getattr(settings, 'GRAPHQL_METRICS_SAMPLE_RATE', 0.0)
+
+
+def operation_label(operation_name):
+    if operation_name and operation_name in getattr(settings, 'GRAPHQL_METRICS_OPERATIONS', ()):
+        return operation_name
+    return OTHER_OPERATION
+
+
+@contextmanager
+def record_operation(operation_name):
+    """Instrument the enclosed GraphQL execution when it is sampled"""
+    rate = sample_rate()
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        yield
+        return
+
+    recorder = OperationRecorder(operation_label(operation_name))
+    token = _current_recorder.set(recorder)
+    start = time.perf_counter()
+    try:
+        with instrument_connections():
+            yield
+    finally:
+        recorder.duration = time.perf_counter() - start
+        _current_recorder.reset(token)
+        registry.merge(recorder)
+
+
+@contextmanager
+def instrument_connections():
+    """
+    Charge queries on this thread's connections to the active recorder.
+
+    Connections are per thread, so code that executes part of an operation
+    on another thread must enter this there as well.
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        yield
+        return
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield
+
+
+class MetricsMiddleware:
+    """Graphene middleware timing each resolver of a sampled operation"""
+
+    def resolve(self, next, root, info, **args):
+        recorder = _current_recorder.get()
+        if recorder is None:
+            return next(root, info, **args)
+
+        field = f'{info.parent_type.name}.{info.field_name}'
+        token = _current_field.set(field)
+        start = time.perf_counter()
+        try:
+            result = next(root, info, **args)
+            if isinstance(result, QuerySet):
+                # Evaluate here so the rows are charged to this field
+                len(result)
+            return result
+        finally:
+            recorder.resolver_durations[field].append(time.perf_counter() - start)
+            _current_field.reset(token)
+
+
+def render_cache_stats(caches):
+    """Render ``{cache name: LRUCache.stats()}`` as Prometheus series"""
+    lines = []
+    for metric, key, kind in (
+        ('cache_hits_total', 'hits', 'counter'),
+        ('cache_misses_total', 'misses', 'counter'),
+        ('cache_entries', 'size', 'gauge'),
+    ):
+        lines.append(f'# TYPE {metric} {kind}')
+        for name, stats in sorted(caches.items()):
+            lines.append(f'{metric}{_labels(("cache",), (name,))} {stats[key]}')
+    return '\n'.join(lines) + '\n'
+
+
+def render_database_stats(databases):
+    """Render ``{alias: ReplicaPool.stats() entry}`` as Prometheus series"""
+    lines = []
+    for metric, key, kind in (
+        ('database_read_operations_total', 'reads', 'counter'),
+        ('database_replica_failures_total', 'failures', 'counter'),
+        ('database_available', 'available', 'gauge'),
+    ):
+        lines.append(f'# TYPE {metric} {kind}')
+        for alias, stats in sorted(databases.items()):
+            lines.append(f'{metric}{_labels(("database",), (alias,))} {int(stats[key])}')
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _render_counter(lines, name, help_text, series, label_names):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} counter')
+    for label_values, value in sorted(series.items()):
+        lines.append(f'{name}{_labels(label_names, label_values)} {value}')
+
+
+def _render_histograms(lines, name, help_text, series, label_names):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for label_values, histogram in sorted(series.items()):
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS, histogram.counts):
+            cumulative += count
+            labels = _labels(label_names, label_values, [('le', bound)])
+            lines.append(f'{name}_bucket{labels} {cumulative}')
+        labels = _labels(label_names, label_values, [('le', '+Inf')])
+        lines.append(f'{name}_bucket{labels} {histogram.count}')
+        lines.append(f'{name}_sum{_labels(label_names, label_values)} {histogram.sum}')
+        lines.append(f'{name}_count{_labels(label_names, label_values)} {histogram.count}')
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationStatistics',
+            fields=[
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='core.organization')),
+                ('total_projects', models.IntegerField(default=0)),
+                ('active_projects', models.IntegerField(default=0)),
+                ('completed_projects', models.IntegerField(default=0)),
+                ('total_tasks', models.IntegerField(default=0)),
+                ('completed_tasks', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'organization statistics',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_organizationstatistics'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='core_projec_organiz_1e1dc9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='core_task_project_4b66a7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=models.Index(fields=['task', '-created_at', '-id'], name='core_taskco_task_id_93a2e5_idx'),
+        ),
+    ]
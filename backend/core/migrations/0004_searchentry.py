@@ -0,0 +1,132 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+POSTGRESQL_INDEX = [
+    """
+    ALTER TABLE core_searchentry ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX core_searchentry_vector_idx ON core_searchentry USING GIN (search_vector)",
+]
+
+POSTGRESQL_DROP_INDEX = [
+    "DROP INDEX IF EXISTS core_searchentry_vector_idx",
+    "ALTER TABLE core_searchentry DROP COLUMN IF EXISTS search_vector",
+]
+
+# External-content FTS5 table kept in sync with core_searchentry by triggers
+SQLITE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE core_searchentry_fts USING fts5(
+        title, body, content='core_searchentry', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER core_searchentry_fts_insert AFTER INSERT ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchentry_fts_delete AFTER DELETE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts (core_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchentry_fts_update AFTER UPDATE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts (core_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO core_searchentry_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_DROP_INDEX = [
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_insert",
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_delete",
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_update",
+    "DROP TABLE IF EXISTS core_searchentry_fts",
+]
+
+POPULATE = [
+    """
+    INSERT INTO core_searchentry (organization_id, kind, object_id, title, body, updated_at)
+    SELECT organization_id, 'project', id, name, description, CURRENT_TIMESTAMP FROM core_project
+    """,
+    """
+    INSERT INTO core_searchentry (organization_id, kind, object_id, title, body, updated_at)
+    SELECT p.organization_id, 'task', t.id, t.title, t.description || ' ' || t.assignee_email, CURRENT_TIMESTAMP
+    FROM core_task t JOIN core_project p ON p.id = t.project_id
+    """,
+    """
+    INSERT INTO core_searchentry (organization_id, kind, object_id, title, body, updated_at)
+    SELECT p.organization_id, 'comment', c.id, '', c.content || ' ' || c.author_email, CURRENT_TIMESTAMP
+    FROM core_taskcomment c JOIN core_task t ON t.id = c.task_id JOIN core_project p ON p.id = t.project_id
+    """,
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def _sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRESQL_INDEX)
+    elif vendor == 'sqlite' and _sqlite_has_fts5(schema_editor):
+        _run(schema_editor, SQLITE_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRESQL_DROP_INDEX)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_DROP_INDEX)
+
+
+def populate(apps, schema_editor):
+    _run(schema_editor, POPULATE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('project', 'Project'), ('task', 'Task'), ('comment', 'Comment')], max_length=10)),
+                ('object_id', models.IntegerField()),
+                ('title', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='core.organization')),
+            ],
+            options={
+                'verbose_name_plural': 'search entries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchentry',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_entry'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
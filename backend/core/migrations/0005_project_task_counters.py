@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:32
+
+from django.db import migrations, models
+
+
+# One set-based pass; core.counters keeps the columns exact afterwards
+POPULATE = """
+UPDATE core_project SET
+    task_count = (SELECT COUNT(*) FROM core_task t WHERE t.project_id = core_project.id),
+    todo_task_count = (SELECT COUNT(*) FROM core_task t WHERE t.project_id = core_project.id AND t.status = 'TODO'),
+    in_progress_task_count = (SELECT COUNT(*) FROM core_task t WHERE t.project_id = core_project.id AND t.status = 'IN_PROGRESS'),
+    done_task_count = (SELECT COUNT(*) FROM core_task t WHERE t.project_id = core_project.id AND t.status = 'DONE')
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_searchentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='done_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='todo_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(POPULATE, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:49
+"""
+Adds a nullable organization column to tasks and comments (live and
+archived) and backfills it in batches, each in its own short transaction,
+so the tables stay writable throughout. 0010 makes the column required
+and builds its indexes.
+"""
+from django.db import migrations, models, transaction
+import django.db.models.deletion
+
+
+BATCH_SIZE = 10000
+
+# Parents before children: comments copy the value from their task
+BACKFILL = [
+    ('core_task', 'SELECT p.organization_id FROM core_project p WHERE p.id = core_task.project_id'),
+    ('core_taskcomment', 'SELECT t.organization_id FROM core_task t WHERE t.id = core_taskcomment.task_id'),
+    ('core_archivedtask', 'SELECT p.organization_id FROM core_project p WHERE p.id = core_archivedtask.project_id'),
+    ('core_archivedtaskcomment',
+     'SELECT t.organization_id FROM core_archivedtask t WHERE t.id = core_archivedtaskcomment.task_id'),
+]
+
+
+def backfill(apps, schema_editor):
+    connection = schema_editor.connection
+    for table, source in BACKFILL:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT MIN(id), MAX(id) FROM {table}')
+            low, high = cursor.fetchone()
+        if low is None:
+            continue
+        for start in range(low, high + 1, BATCH_SIZE):
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {table} SET organization_id = ({source}) '
+                    f'WHERE id >= %s AND id < %s AND organization_id IS NULL',
+                    [start, start + BATCH_SIZE]
+                )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='taskcomment',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_comments', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='organization',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='archivedtaskcomment',
+            name='organization',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_task_comments', to='core.organization'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:49
+"""
+Makes the organization column of tasks and comments required and indexes it.
+
+On PostgreSQL the NOT NULL change is preceded by a validated CHECK
+constraint, so it needs no table scan under an exclusive lock, and the new
+indexes are built CONCURRENTLY. Other databases use the plain operations.
+"""
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+TABLES = ['core_task', 'core_taskcomment', 'core_archivedtask', 'core_archivedtaskcomment']
+
+# Rows written (or archived) by the previous release while 0009 was running; parents first
+FILL_STRAGGLERS = {
+    'core_task': 'SELECT p.organization_id FROM core_project p WHERE p.id = core_task.project_id',
+    'core_taskcomment': 'SELECT t.organization_id FROM core_task t WHERE t.id = core_taskcomment.task_id',
+    'core_archivedtask': 'SELECT p.organization_id FROM core_project p WHERE p.id = core_archivedtask.project_id',
+    'core_archivedtaskcomment':
+        'SELECT t.organization_id FROM core_archivedtask t WHERE t.id = core_archivedtaskcomment.task_id',
+}
+
+
+def fill_stragglers(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, source in FILL_STRAGGLERS.items():
+            cursor.execute(f'UPDATE {table} SET organization_id = ({source}) WHERE organization_id IS NULL')
+
+
+def add_not_null_checks(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            # NOT VALID takes no scan; VALIDATE scans without blocking writes
+            cursor.execute(
+                f'ALTER TABLE {table} ADD CONSTRAINT {table}_organization_not_null '
+                f'CHECK (organization_id IS NOT NULL) NOT VALID'
+            )
+            cursor.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_organization_not_null')
+
+
+def drop_not_null_checks(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_organization_not_null')
+
+
+class AddIndexOnline(AddIndexConcurrently):
+    """CREATE INDEX CONCURRENTLY on PostgreSQL, a plain CREATE INDEX elsewhere"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_task_organization'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_stragglers, migrations.RunPython.noop),
+        migrations.RunPython(add_not_null_checks, drop_not_null_checks),
+        migrations.AlterField(
+            model_name='task',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='core.organization'),
+        ),
+        migrations.AlterField(
+            model_name='taskcomment',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_comments', to='core.organization'),
+        ),
+        migrations.AlterField(
+            model_name='archivedtask',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='core.organization'),
+        ),
+        migrations.AlterField(
+            model_name='archivedtaskcomment',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_task_comments', to='core.organization'),
+        ),
+        migrations.RunPython(drop_not_null_checks, add_not_null_checks),
+        AddIndexOnline(
+            model_name='task',
+            index=models.Index(fields=['organization', 'status'], name='core_task_organiz_f17728_idx'),
+        ),
+        AddIndexOnline(
+            model_name='task',
+            index=models.Index(fields=['organization', 'id'], name='core_task_organiz_8b598c_idx'),
+        ),
+        AddIndexOnline(
+            model_name='task',
+            index=models.Index(fields=['organization', 'updated_at', 'id'], name='core_task_organiz_1cb007_idx'),
+        ),
+        AddIndexOnline(
+            model_name='taskcomment',
+            index=models.Index(fields=['organization', 'id'], name='core_taskco_organiz_9dcb81_idx'),
+        ),
+        AddIndexOnline(
+            model_name='taskcomment',
+            index=models.Index(fields=['organization', 'updated_at', 'id'], name='core_taskco_organiz_417923_idx'),
+        ),
+        # Superseded by the (organization, updated_at, id) indexes
+        migrations.RemoveIndex(
+            model_name='task',
+            name='core_task_updated_978cf6_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskcomment',
+            name='core_taskco_updated_06a0d6_idx',
+        ),
+    ]
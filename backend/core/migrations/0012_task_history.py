@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:59
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def seed_project_totals(apps, schema_editor):
+    # History starts now: give every project today's totals to count from
+    Project = apps.get_model('core', 'Project')
+    ProjectDailyStatistics = apps.get_model('core', 'ProjectDailyStatistics')
+    today = timezone.localdate()
+    totals = Project.objects.values_list('pk', 'todo_task_count', 'in_progress_task_count', 'done_task_count')
+    ProjectDailyStatistics.objects.bulk_create([
+        ProjectDailyStatistics(project_id=pk, date=today, todo=todo, in_progress=in_progress, done=done)
+        for pk, todo, in_progress, done in totals.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectDailyStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('reopened', models.PositiveIntegerField(default=0)),
+                ('deleted', models.PositiveIntegerField(default=0)),
+                ('todo', models.PositiveIntegerField(default=0)),
+                ('in_progress', models.PositiveIntegerField(default=0)),
+                ('done', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_statistics', to='core.project')),
+            ],
+            options={
+                'verbose_name_plural': 'project daily statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='OrganizationDailyStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('reopened', models.PositiveIntegerField(default=0)),
+                ('deleted', models.PositiveIntegerField(default=0)),
+                ('cycle_time_total', models.PositiveBigIntegerField(default=0)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_statistics', to='core.organization')),
+            ],
+            options={
+                'verbose_name_plural': 'organization daily statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('from_status', models.CharField(blank=True, choices=[('TODO', 'To Do'), ('IN_PROGRESS', 'In Progress'), ('DONE', 'Done')], max_length=20, null=True)),
+                ('to_status', models.CharField(blank=True, choices=[('TODO', 'To Do'), ('IN_PROGRESS', 'In Progress'), ('DONE', 'Done')], max_length=20, null=True)),
+                ('occurred_at', models.DateTimeField()),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_status_events', to='core.organization')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_status_events', to='core.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'occurred_at'], name='core_taskst_project_c8bade_idx'), models.Index(fields=['task_id', 'occurred_at'], name='core_taskst_task_id_4bccd9_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='projectdailystatistics',
+            constraint=models.UniqueConstraint(fields=('project', 'date'), name='unique_project_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='organizationdailystatistics',
+            constraint=models.UniqueConstraint(fields=('organization', 'date'), name='unique_organization_day'),
+        ),
+        migrations.RunPython(seed_project_totals, migrations.RunPython.noop),
+    ]
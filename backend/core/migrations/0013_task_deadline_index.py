@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:03
+"""
+Partial index for the deadline queries, built CONCURRENTLY on PostgreSQL.
+"""
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexOnline(AddIndexConcurrently):
+    """
+    CREATE INDEX CONCURRENTLY on PostgreSQL, a plain CREATE INDEX elsewhere.
+
+    ``postgresql_include`` adds covering columns on PostgreSQL only; other
+    databases ignore INCLUDE, and the model would warn about it (models.W040).
+    """
+
+    def __init__(self, model_name, index, postgresql_include=()):
+        super().__init__(model_name, index)
+        self.postgresql_include = tuple(postgresql_include)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        if self.postgresql_include:
+            kwargs['postgresql_include'] = self.postgresql_include
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+        self._ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            path, args, kwargs = self.index.deconstruct()
+            index = type(self.index)(*args, **{**kwargs, 'include': self.postgresql_include})
+            schema_editor.add_index(model, index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0012_task_history'),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name='task',
+            index=models.Index(condition=models.Q(('due_date__isnull', False), models.Q(('status', 'DONE'), _negated=True)), fields=['organization', 'due_date', 'id'], name='core_task_open_due_idx'),
+            # Lets PostgreSQL count overdue tasks per project from the index alone
+            postgresql_include=['project'],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_task_deadline_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='searchentry',
+            name='object_id',
+            field=models.BigIntegerField(),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_tombstone_object_id_bigint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importedrow',
+            name='object_id',
+            field=models.BigIntegerField(),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:02
+"""
+Restore the SQLite FTS5 triggers of core_searchentry.
+
+SQLite alters a column by rebuilding its table, and the rebuild in 0014 drops
+the triggers 0004 put on it, so entries written since then never reached the
+FTS5 table. The triggers are recreated and the FTS5 table rebuilt from
+core_searchentry. Other databases are left alone.
+"""
+from django.db import migrations
+
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_fts_insert AFTER INSERT ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_fts_delete AFTER DELETE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts (core_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_fts_update AFTER UPDATE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts (core_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO core_searchentry_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    "INSERT INTO core_searchentry_fts (core_searchentry_fts) VALUES ('rebuild')",
+]
+
+
+def restore_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if 'core_searchentry_fts' not in connection.introspection.table_names(cursor):
+            return
+    for statement in SQLITE_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_importedrow_object_id_bigint'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
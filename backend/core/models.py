@@ -36,15 +36,52 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Task totals, kept exact by core.counters with F() updates
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    todo_task_count = models.PositiveIntegerField(default=0, editable=False)
+    in_progress_task_count = models.PositiveIntegerField(default=0, editable=False)
+    done_task_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Set once core.archive has moved the project's tasks to the archive tables
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    COUNTER_FIELDS = ['task_count', 'todo_task_count', 'in_progress_task_count', 'done_task_count']
+    # Only ever written with UPDATE statements (counters, archive)
+    MANAGED_FIELDS = [*COUNTER_FIELDS, 'archived_at']
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['organization', 'status']),
+            # Keyset pagination order for projectsConnection
+            models.Index(fields=['organization', '-created_at', '-id']),
+            # changesSince scans
+            models.Index(fields=['organization', 'updated_at', 'id']),
         ]
 
     def __str__(self):
         return f"{self.name} ({self.organization.name})"
 
+    def save(self, *args, **kwargs):
+        # Counters and archived_at only change through UPDATEs; a stale copy must not overwrite them
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+                and field.name not in self.MANAGED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the row held, so the statistics rollup and the project's rows can be moved on save
+        instance._loaded_statistics_state = (
+            instance.__dict__.get('organization_id'), instance.__dict__.get('status')
+        )
+        return instance
+
 
 class Task(models.Model):
     """Task model linked to a project"""
@@ -54,6 +91,14 @@ class Task(models.Model):
         ('DONE', 'Done'),
     ]
 
+    # Copy of the project's organization, so tenant-scoped lookups need no join
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='tasks',
+        editable=False,
+        db_index=False  # Leads the composite indexes below
+    )
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
@@ -75,14 +120,56 @@ class Task(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['project', 'status']),
+            # Keyset pagination order for tasksConnection
+            models.Index(fields=['project', '-created_at', '-id']),
+            models.Index(fields=['organization', 'status']),
+            models.Index(fields=['organization', 'id']),
+            # changesSince scans
+            models.Index(fields=['organization', 'updated_at', 'id']),
+            # Deadline queries; DONE tasks are left out, so the index only grows with open work.
+            # Migration 0013 also covers project_id on PostgreSQL.
+            models.Index(
+                fields=['organization', 'due_date', 'id'],
+                name='core_task_open_due_idx',
+                condition=models.Q(due_date__isnull=False) & ~models.Q(status='DONE')
+            ),
         ]
 
     def __str__(self):
         return f"{self.title} ({self.project.name})"
 
+    def save(self, *args, **kwargs):
+        loaded_project_id = getattr(self, '_loaded_counter_state', (None, None))[0]
+        moved = loaded_project_id is not None and loaded_project_id != self.project_id
+        old_organization_id = self.__dict__.get('organization_id')
+        if (self._state.adding and self.organization_id is None) or moved:
+            self.organization_id = self.project.organization_id
+            if moved and kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = [*kwargs['update_fields'], 'organization']
+        super().save(*args, **kwargs)
+        if moved and self.organization_id != old_organization_id:
+            self.comments.update(organization_id=self.organization_id)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the row held, so project counters can be moved on save
+        instance._loaded_counter_state = (
+            instance.__dict__.get('project_id'), instance.__dict__.get('status')
+        )
+        return instance
+
 
 class TaskComment(models.Model):
     """Comment model for tasks"""
+    # Copy of the task's organization, so tenant-scoped lookups need no join
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='task_comments',
+        editable=False,
+        db_index=False  # Leads the composite indexes below
+    )
     task = models.ForeignKey(
         Task,
         on_delete=models.CASCADE,
@@ -95,7 +182,365 @@ class TaskComment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination order for commentsConnection
+            models.Index(fields=['task', '-created_at', '-id']),
+            models.Index(fields=['organization', 'id']),
+            # changesSince scans
+            models.Index(fields=['organization', 'updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"Comment on {self.task.title} by {self.author_email}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.organization_id is None:
+            self.organization_id = self.task.organization_id
+        super().save(*args, **kwargs)
+
+
+class ArchivedTask(models.Model):
+    """
+    Task of an archived project, moved out of the hot task table by core.archive.
+
+    Same columns as ``Task``, with the original ids and timestamps.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks'
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks'
+    )
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Task.TASK_STATUS_CHOICES)
+    assignee_email = models.EmailField(blank=True)
+    due_date = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', '-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+
+class ArchivedTaskComment(models.Model):
+    """Comment of an archived task"""
+    id = models.BigIntegerField(primary_key=True)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='archived_task_comments'
+    )
+    task = models.ForeignKey(
+        ArchivedTask,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    content = models.TextField()
+    author_email = models.EmailField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['task', '-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"Comment on {self.task.title} by {self.author_email} (archived)"
+
+
+class OrganizationStatistics(models.Model):
+    """Per-organization dashboard totals kept current by applying deltas on write"""
+    organization = models.OneToOneField(
+        Organization,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics'
+    )
+    total_projects = models.IntegerField(default=0)
+    active_projects = models.IntegerField(default=0)
+    completed_projects = models.IntegerField(default=0)
+    total_tasks = models.IntegerField(default=0)
+    completed_tasks = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'organization statistics'
+
+    def __str__(self):
+        return f"Statistics for {self.organization.name}"
+
+
+class TaskStatusEvent(models.Model):
+    """
+    Append-only log of task status changes.
+
+    A ``from_status`` of None is a created task and a ``to_status`` of None
+    a deleted one. Kept after the task is deleted, so ``task_id`` is not a
+    foreign key.
+    """
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='task_status_events'
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='task_status_events'
+    )
+    task_id = models.BigIntegerField()
+    from_status = models.CharField(max_length=20, choices=Task.TASK_STATUS_CHOICES, null=True, blank=True)
+    to_status = models.CharField(max_length=20, choices=Task.TASK_STATUS_CHOICES, null=True, blank=True)
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'occurred_at']),
+            models.Index(fields=['task_id', 'occurred_at']),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id}: {self.from_status} -> {self.to_status}"
+
+
+class ProjectDailyStatistics(models.Model):
+    """One project's task changes on one day, with its status totals after the last of them"""
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='daily_statistics'
+    )
+    date = models.DateField()
+    created = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    reopened = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    todo = models.PositiveIntegerField(default=0)
+    in_progress = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'project daily statistics'
+        constraints = [
+            # Also the index burndown ranges scan
+            models.UniqueConstraint(fields=['project', 'date'], name='unique_project_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.project.name} on {self.date}"
+
+
+class OrganizationDailyStatistics(models.Model):
+    """One organization's task changes on one day"""
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='daily_statistics'
+    )
+    date = models.DateField()
+    created = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    reopened = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    cycle_time_total = models.PositiveBigIntegerField(default=0)  # Seconds from creation to DONE, over completions
+
+    class Meta:
+        verbose_name_plural = 'organization daily statistics'
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'date'], name='unique_organization_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.organization.name} on {self.date}"
+
+
+class SearchEntry(models.Model):
+    """
+    Full-text index row for a project, task or comment.
+
+    Text is copied here on write. PostgreSQL adds a generated ``tsvector``
+    column with a GIN index and SQLite an FTS5 table; both are created in
+    migrations, outside the ORM.
+    """
+    KIND_CHOICES = [
+        ('project', 'Project'),
+        ('task', 'Task'),
+        ('comment', 'Comment'),
+    ]
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='search_entries'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    title = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'search entries'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_entry'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
+class Tombstone(models.Model):
+    """
+    Marker left by a deleted project, task or comment for ``changesSince``.
+    Tasks and comments moved to the archive leave one too.
+
+    Rows deleted along with their parent get no tombstone of their own; the
+    parent's tombstone covers them.
+    """
+    KIND_CHOICES = SearchEntry.KIND_CHOICES
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='tombstones'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'deleted_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted"
+
+
+class ImportRun(models.Model):
+    """
+    Progress of one data import.
+
+    Updated in the same transaction as every chunk of rows it writes, so an
+    interrupted import resumes exactly after the last committed chunk.
+    """
+    STATUS_CHOICES = [
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='import_runs'
+    )
+    source = models.CharField(max_length=255, blank=True)
+    format = models.CharField(max_length=10)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='RUNNING')
+    rows_processed = models.PositiveBigIntegerField(default=0)
+    projects_created = models.PositiveIntegerField(default=0)
+    tasks_created = models.PositiveIntegerField(default=0)
+    comments_created = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # The first errors, with their row numbers
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import {self.pk} into {self.organization.name} ({self.status})"
+
+
+class ImportedRow(models.Model):
+    """Maps an id from an import file to the project or task created for it"""
+    KIND_CHOICES = [
+        ('project', 'Project'),
+        ('task', 'Task'),
+    ]
+
+    run = models.ForeignKey(
+        ImportRun,
+        on_delete=models.CASCADE,
+        related_name='imported_rows'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    source_id = models.CharField(max_length=64)
+    object_id = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'kind', 'source_id'], name='unique_imported_row'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.source_id} -> {self.object_id}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work, run by ``python manage.py run_jobs``.
+
+    Workers claim queued jobs highest priority first (see ``core.jobs``). A
+    failed job is queued again with a growing delay until it has used
+    ``max_attempts``.
+    """
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+    ]
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='jobs',
+        null=True,
+        blank=True
+    )
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    priority = models.SmallIntegerField(default=0)  # Higher runs first
+    run_at = models.DateTimeField()  # Not claimed before this time
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Claim order; only queued jobs are indexed, so the index stays small
+            models.Index(
+                fields=['-priority', 'run_at', 'id'],
+                name='core_job_queued_idx',
+                condition=models.Q(status='QUEUED')
+            ),
+            # Keyset pagination order for jobs
+            models.Index(fields=['organization', '-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.pk} ({self.status})"
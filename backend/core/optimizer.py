@@ -0,0 +1,101 @@
+"""
+Selection-set-aware queryset optimizer for root resolvers.
+
+Reads the fields a query asks for from ``info`` and shapes the root queryset
+to match: forward relations are joined with ``select_related``, reverse
+relations are batched with ``prefetch_related`` and only the selected
+columns are loaded. Fields that do not map onto a model field (computed
+fields, connection fields) are left to their own resolvers.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+
+# Model columns read by computed fields, keyed by model name then GraphQL field
+COMPUTED_FIELD_COLUMNS = {
+    'Project': {
+        'completedTasks': ['done_task_count'],
+        'completionRate': ['task_count', 'done_task_count'],
+        'archived': ['archived_at'],
+    },
+}
+
+
+def optimize(queryset, info, path=(), required=()):
+    """
+    Apply joins, prefetches and column pruning for the current field's selection.
+
+    ``path`` descends through wrapper fields before reaching the model's own
+    selection, e.g. ``('edges', 'node')`` for a connection. ``required``
+    names extra columns the resolver itself reads.
+    """
+    selections = _collect(info, info.field_nodes)
+    for name in path:
+        selections = _collect(info, selections.get(name, []))
+    return _optimize(queryset, info, selections, required)
+
+
+def _optimize(queryset, info, selections, required=()):
+    only = set(required)
+    select_related = set()
+    prefetches = []
+    _plan(queryset.model, info, selections, '', only, select_related, prefetches)
+
+    queryset = queryset.only(*only)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset
+
+
+def _collect(info, field_nodes):
+    """Merge the sub-selections of ``field_nodes`` into ``{field name: [FieldNode, ...]}``"""
+    fields = {}
+
+    def visit(selection_set):
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                fields.setdefault(selection.name.value, []).append(selection)
+            elif isinstance(selection, InlineFragmentNode):
+                visit(selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                visit(info.fragments[selection.name.value].selection_set)
+
+    for node in field_nodes:
+        visit(node.selection_set)
+    return fields
+
+
+def _plan(model, info, selections, prefix, only, select_related, prefetches):
+    only.add(prefix + model._meta.pk.name)
+
+    for graphql_name, nodes in selections.items():
+        try:
+            field = model._meta.get_field(to_snake_case(graphql_name))
+        except FieldDoesNotExist:
+            columns = COMPUTED_FIELD_COLUMNS.get(model.__name__, {}).get(graphql_name, [])
+            only.update(prefix + column for column in columns)
+            continue
+
+        if not field.is_relation:
+            only.add(prefix + field.name)
+        elif field.many_to_one or (field.one_to_one and field.concrete):
+            path = prefix + field.name
+            only.add(path)
+            select_related.add(path)
+            _plan(
+                field.related_model, info, _collect(info, nodes),
+                path + '__', only, select_related, prefetches
+            )
+        elif field.one_to_many:
+            # The child rows need their foreign key to be matched back to parents
+            queryset = _optimize(
+                field.related_model._default_manager.all(), info,
+                _collect(info, nodes), required=(field.field.name,)
+            )
+            prefetches.append(Prefetch(prefix + field.name, queryset=queryset))
@@ -0,0 +1,58 @@
+"""
+Organization lookup by slug.
+
+Every resolver and mutation scopes its work to an organization slug, so
+lookups are memoized per request and shared across requests through a
+bounded process-wide LRU. Saving or deleting an organization invalidates
+its entries (see ``core.signals``).
+"""
+from django.conf import settings
+
+from .lru import MISSING, LRUCache
+from .models import Organization
+
+
+_cache = LRUCache(
+    maxsize=getattr(settings, 'ORGANIZATION_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'ORGANIZATION_CACHE_TTL', None),
+)
+
+
+def get_organization(info, slug):
+    """Return the organization for ``slug`` or raise the schema's not-found error"""
+    memo = _request_memo(info)
+    if slug in memo:
+        return memo[slug]
+
+    organization = _cache.get(slug)
+    if organization is MISSING:
+        try:
+            organization = Organization.objects.get(slug=slug)
+        except Organization.DoesNotExist:
+            raise Exception(f"Organization with slug '{slug}' not found")
+        _cache.set(slug, organization)
+
+    memo[slug] = organization
+    return organization
+
+
+def invalidate_organization(organization):
+    """Forget ``organization`` under its current slug and any slug it was cached under"""
+    _cache.delete(organization.slug)
+    _cache.delete_where(lambda cached: cached.pk == organization.pk)
+
+
+def organization_cache_stats():
+    return _cache.stats()
+
+
+def _request_memo(info):
+    context = info.context
+    if context is None:
+        return {}
+
+    memo = getattr(context, '_organizations', None)
+    if memo is None:
+        memo = {}
+        context._organizations = memo
+    return memo
@@ -0,0 +1,171 @@
+"""
+Keyset (cursor) pagination for Relay-style connection fields.
+
+Lists are ordered newest first on ``(created_at, id)``, or by another column
+with ``paginate_ascending``; a cursor encodes the keyset of the row it points
+at, so each page is one indexed range scan no matter how deep into the list
+it is.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from graphene import relay
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(instance, field='created_at'):
+    value = f"{getattr(instance, field).isoformat()}|{instance.pk}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise Exception(f"Invalid cursor '{cursor}'")
+
+
+def _older_than(cursor):
+    created_at, pk = decode_cursor(cursor)
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+
+
+def _newer_than(cursor):
+    created_at, pk = decode_cursor(cursor)
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+
+
+def _page_size(value, name):
+    if value is None:
+        return None
+    if value < 0:
+        raise Exception(f"'{name}' must be a non-negative integer")
+    if value > MAX_PAGE_SIZE:
+        raise Exception(f"'{name}' cannot exceed {MAX_PAGE_SIZE}")
+    return value
+
+
+def paginate(queryset, connection_type, first=None, after=None, last=None, before=None):
+    """
+    Slice ``queryset`` into one page of ``connection_type``.
+
+    ``first``/``after`` walk forwards from the newest row and
+    ``last``/``before`` walk backwards from the oldest, following the Relay
+    cursor connection spec. Only ``page size + 1`` rows are fetched.
+    """
+    first = _page_size(first, 'first')
+    last = _page_size(last, 'last')
+    if first is None and last is None:
+        first = DEFAULT_PAGE_SIZE
+
+    if after:
+        queryset = queryset.filter(_older_than(after))
+    if before:
+        queryset = queryset.filter(_newer_than(before))
+
+    if first is not None:
+        rows = list(queryset.order_by('-created_at', '-pk')[:first + 1])
+        has_next_page = len(rows) > first
+        rows = rows[:first]
+        has_previous_page = bool(after)
+        if last is not None:
+            has_previous_page = has_previous_page or len(rows) > last
+            rows = rows[len(rows) - last:] if last else []
+    else:
+        rows = list(queryset.order_by('created_at', 'pk')[:last + 1])
+        has_previous_page = len(rows) > last
+        rows = list(reversed(rows[:last]))
+        has_next_page = bool(before)
+
+    edges = [connection_type.Edge(node=row, cursor=encode_cursor(row)) for row in rows]
+    return connection_type(
+        edges=edges,
+        page_info=relay.PageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=has_previous_page,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
+
+
+def paginate_ascending(queryset, connection_type, field, first=None, after=None):
+    """
+    Walk ``queryset`` forwards in ascending ``(field, id)`` order.
+
+    For lists ordered by a non-null datetime column other than
+    ``created_at``; ``after`` is a cursor from a previous page. Only
+    ``first + 1`` rows are fetched.
+    """
+    first = _page_size(first, 'first')
+    if first is None:
+        first = DEFAULT_PAGE_SIZE
+    if after:
+        value, pk = decode_cursor(after)
+        queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
+
+    rows = list(queryset.order_by(field, 'pk')[:first + 1])
+    has_next_page = len(rows) > first
+    rows = rows[:first]
+
+    edges = [connection_type.Edge(node=row, cursor=encode_cursor(row, field)) for row in rows]
+    return connection_type(
+        edges=edges,
+        page_info=relay.PageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=bool(after),
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
+
+
+def encode_offset_cursor(offset):
+    return base64.urlsafe_b64encode(f"offset|{offset}".encode()).decode()
+
+
+def decode_offset_cursor(cursor):
+    try:
+        prefix, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        if prefix != 'offset' or int(offset) < 0:
+            raise ValueError(cursor)
+        return int(offset)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise Exception(f"Invalid cursor '{cursor}'")
+
+
+def paginate_ranked(fetch, connection_type, first=None, after=None):
+    """
+    Page through a ranked result list, which has no stable keyset.
+
+    ``fetch(limit, offset)`` returns rows best first; cursors encode the
+    row's position. Only ``first + 1`` rows are fetched.
+    """
+    first = _page_size(first, 'first')
+    if first is None:
+        first = DEFAULT_PAGE_SIZE
+    offset = decode_offset_cursor(after) + 1 if after else 0
+
+    rows = fetch(first + 1, offset)
+    has_next_page = len(rows) > first
+    rows = rows[:first]
+
+    edges = [
+        connection_type.Edge(node=row, cursor=encode_offset_cursor(offset + position))
+        for position, row in enumerate(rows)
+    ]
+    return connection_type(
+        edges=edges,
+        page_info=relay.PageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=offset > 0,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
@@ -0,0 +1,149 @@
+"""
+Versioned whole-response cache for read-only GraphQL operations.
+
+Each organization has a data version token kept in the response cache.
+Mutations replace the token once their transaction commits, so every
+response cached under the old token becomes unreachable without having to
+find and delete it. Operations that are not scoped to an organization (e.g.
+``organizations``) use a global token that every mutation replaces.
+
+A response's cache key doubles as its ``ETag``: it is derived from the query
+hash, operation name, variables and the data versions in scope, so an
+unchanged ``If-None-Match`` can be answered with a 304 before executing.
+"""
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from graphql import FieldNode, StringValueNode, VariableNode
+
+from .documents import query_hash
+
+
+GLOBAL_SCOPE = '*'
+
+# Root field arguments naming the organization an operation reads
+SCOPE_ARGUMENTS = {'organizationSlug', 'slug'}
+
+
+def enabled():
+    return getattr(settings, 'GRAPHQL_RESPONSE_CACHE', False)
+
+
+def _cache():
+    return caches[getattr(settings, 'GRAPHQL_RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'GRAPHQL_RESPONSE_CACHE_TTL', 300)
+
+
+def _version_key(scope):
+    return f'gql:version:{scope}'
+
+
+def _new_token():
+    # Tokens record when they were issued, see CachedResponse.changed_within
+    return f'{time.time():.3f}-{uuid.uuid4().hex}'
+
+
+def _issued_at(token):
+    try:
+        return float(token.split('-', 1)[0])
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def _argument_value(argument, variables):
+    value = argument.value
+    if isinstance(value, StringValueNode):
+        return value.value
+    if isinstance(value, VariableNode):
+        return variables.get(value.name.value)
+    return None
+
+
+def operation_scopes(operation_ast, variables):
+    """
+    Return the sorted organization slugs ``operation_ast`` reads.
+
+    Falls back to the global scope when any root field is not tied to a
+    single organization.
+    """
+    slugs = set()
+    for selection in operation_ast.selection_set.selections:
+        if not isinstance(selection, FieldNode):
+            return [GLOBAL_SCOPE]
+        if selection.name.value.startswith('__'):
+            continue
+        slug = None
+        for argument in selection.arguments or ():
+            if argument.name.value in SCOPE_ARGUMENTS:
+                slug = _argument_value(argument, variables or {})
+        if not isinstance(slug, str):
+            return [GLOBAL_SCOPE]
+        slugs.add(slug)
+    return sorted(slugs) or [GLOBAL_SCOPE]
+
+
+def data_versions(scopes):
+    """Return ``{scope: version token}``, creating tokens for new scopes"""
+    cache = _cache()
+    keys = [_version_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # add() keeps a token another worker created in the meantime
+            cache.add(key, _new_token(), timeout=None)
+            found[key] = cache.get(key)
+    return {scope: found[_version_key(scope)] for scope in scopes}
+
+
+def bump_data_version(organization_slug=None):
+    """
+    Invalidate cached responses for an organization once the current
+    transaction commits. The global scope is always invalidated as well.
+    """
+    scopes = [GLOBAL_SCOPE]
+    if organization_slug:
+        scopes.append(organization_slug)
+
+    def bump():
+        _cache().set_many(
+            {_version_key(scope): _new_token() for scope in scopes}, timeout=None
+        )
+
+    transaction.on_commit(bump)
+
+
+class CachedResponse:
+    """Cache entry for one operation at the current data versions"""
+
+    def __init__(self, query, operation_ast, operation_name, variables):
+        self.versions = data_versions(operation_scopes(operation_ast, variables))
+        payload = json.dumps(
+            [query_hash(query), operation_name, variables or {}, self.versions],
+            sort_keys=True, default=str
+        )
+        self.digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        self.etag = f'"{self.digest}"'
+
+    @property
+    def key(self):
+        return f'gql:response:{self.digest}'
+
+    def get(self):
+        """Return ``(data, extensions)`` or None"""
+        return _cache().get(self.key)
+
+    def set(self, data, extensions):
+        _cache().set(self.key, (data, extensions), timeout=_timeout())
+
+    def changed_within(self, seconds):
+        """Whether a data version in scope was replaced in the last ``seconds``"""
+        now = time.time()
+        return any(now - _issued_at(token) < seconds for token in self.versions.values())
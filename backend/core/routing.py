@@ -0,0 +1,143 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+``DATABASE_REPLICAS`` lists the database aliases that may serve reads.
+Everything runs on the primary (``default``) except GraphQL queries, which
+execute inside ``replica_reads()``: one healthy replica is picked per
+operation, so all of its reads come from the same server. Mutations always
+use the primary, and the view then sets a cookie that keeps the client's
+reads on the primary for ``DATABASE_STICKY_SECONDS``, long enough for the
+replicas to catch up with what it just wrote.
+"""
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+
+STICKY_COOKIE = 'read_primary'
+
+_read_alias = ContextVar('database_read_alias', default=None)
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def sticky_seconds():
+    return getattr(settings, 'DATABASE_STICKY_SECONDS', 5)
+
+
+def retry_seconds():
+    return getattr(settings, 'DATABASE_REPLICA_RETRY', 30)
+
+
+class ReplicaPool:
+    """Tracks replicas that failed to connect and counts routed operations per alias"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._down_until = {}
+        self.reads = defaultdict(int)
+        self.failures = defaultdict(int)
+
+    def available(self):
+        now = time.monotonic()
+        with self._lock:
+            return [alias for alias in replicas() if self._down_until.get(alias, 0) <= now]
+
+    def mark_down(self, alias):
+        with self._lock:
+            self._down_until[alias] = time.monotonic() + retry_seconds()
+            self.failures[alias] += 1
+
+    def record_read(self, alias):
+        with self._lock:
+            self.reads[alias] += 1
+
+    def stats(self):
+        """Return ``{alias: {'reads', 'failures', 'available'}}`` for every alias"""
+        available = set(self.available())
+        with self._lock:
+            return {
+                alias: {
+                    'reads': self.reads[alias],
+                    'failures': self.failures[alias],
+                    'available': alias == DEFAULT_DB_ALIAS or alias in available,
+                }
+                for alias in [DEFAULT_DB_ALIAS, *replicas()]
+            }
+
+
+pool = ReplicaPool()
+
+
+def _pick_replica():
+    candidates = pool.available()
+    random.shuffle(candidates)
+    for alias in candidates:
+        try:
+            # Reuses the thread's persistent connection; only a dead replica costs a connect
+            connections[alias].ensure_connection()
+            return alias
+        except DatabaseError:
+            pool.mark_down(alias)
+    return None
+
+
+def read_alias():
+    """Pick the database for a read-only unit of work: a healthy replica, else the primary"""
+    alias = (_pick_replica() if replicas() else None) or DEFAULT_DB_ALIAS
+    pool.record_read(alias)
+    return alias
+
+
+@contextmanager
+def replica_reads():
+    """Route the enclosed reads to one healthy replica, or the primary if none is up"""
+    alias = read_alias()
+    if alias == DEFAULT_DB_ALIAS:
+        alias = None
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+def is_sticky(request):
+    return STICKY_COOKIE in request.COOKIES
+
+
+def stick_to_primary(response):
+    """Keep the client's reads on the primary while replicas catch up with its write"""
+    if replicas():
+        response.set_cookie(
+            STICKY_COOKIE, '1', max_age=sticky_seconds(), httponly=True, samesite='Lax'
+        )
+
+
+class ReplicaRouter:
+    """Sends reads inside ``replica_reads()`` to its replica and every write to the primary"""
+
+    def db_for_read(self, model, **hints):
+        # None falls back to the primary (or the database a related instance came from)
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        return db not in replicas()
@@ -1,7 +1,13 @@
 import graphene
+from graphene import relay
 from graphene_django import DjangoObjectType
+from django.db import transaction
 from django.db.models import Q, Count, Case, When, IntegerField
-from .models import Organization, Project, Task, TaskComment
+from .models import ArchivedTask, ArchivedTaskComment, Job, Organization, Project, Task, TaskComment
+from . import archive, bulk, changefeed, deadlines, history, jobs, response_cache, search, statistics, sync
+from .optimizer import optimize
+from .organizations import get_organization
+from .pagination import paginate, paginate_ascending, paginate_ranked
 
 
 # Define explicit enums to avoid conflicts
@@ -17,56 +23,105 @@ class TaskStatusEnum(graphene.Enum):
     DONE = 'DONE'
 
 
+class SearchKindEnum(graphene.Enum):
+    PROJECT = 'project'
+    TASK = 'task'
+    COMMENT = 'comment'
+
+
+class JobStatusEnum(graphene.Enum):
+    QUEUED = 'QUEUED'
+    RUNNING = 'RUNNING'
+    SUCCEEDED = 'SUCCEEDED'
+    FAILED = 'FAILED'
+
+
+class JobKindEnum(graphene.Enum):
+    """Maintenance jobs clients may queue for their organization"""
+    REBUILD_STATISTICS = 'rebuild_statistics'
+    REBUILD_COUNTERS = 'rebuild_counters'
+    REBUILD_SEARCH_INDEX = 'rebuild_search_index'
+
+
 class OrganizationType(DjangoObjectType):
     class Meta:
         model = Organization
-        fields = '__all__'
+        # Unbounded and only there for tenant-scoped lookups; read tasks through projects
+        exclude = ['tasks', 'task_comments', 'jobs']
 
 
 class ProjectType(DjangoObjectType):
     task_count = graphene.Int()
     completed_tasks = graphene.Int()
     completion_rate = graphene.Float()
+    archived = graphene.Boolean()
     status = ProjectStatusEnum()  # Use explicit enum for return type
 
     class Meta:
         model = Project
-        fields = '__all__'
+        # Internal counter and archive columns; served through the fields above
+        exclude = ['todo_task_count', 'in_progress_task_count', 'done_task_count', 'archived_at']
         convert_choices_to_enum = False  # Disable auto-enum generation
 
     def resolve_status(self, info):
         # Convert database string to enum value
         return self.status  # Returns the string, GraphQL converts to enum
 
-    def resolve_task_count(self, info):
-        return self.tasks.count()
-
+    # taskCount reads the task_count counter column directly
     def resolve_completed_tasks(self, info):
-        return self.tasks.filter(status='DONE').count()
+        return self.done_task_count
 
     def resolve_completion_rate(self, info):
-        total = self.tasks.count()
-        if total == 0:
+        if self.task_count == 0:
             return 0.0
-        completed = self.tasks.filter(status='DONE').count()
-        return round((completed / total) * 100, 2)
+        return round((self.done_task_count / self.task_count) * 100, 2)
+
+    def resolve_archived(self, info):
+        return self.archived_at is not None
+
+
+class ProjectConnection(relay.Connection):
+    class Meta:
+        node = ProjectType
 
 
 class TaskCommentType(DjangoObjectType):
     class Meta:
         model = TaskComment
-        fields = '__all__'
+        exclude = ['organization']  # Denormalized copy of the task's
+
+    @classmethod
+    def is_type_of(cls, root, info):
+        # Archived comments have the same fields
+        return isinstance(root, (TaskComment, ArchivedTaskComment))
+
+
+class TaskCommentConnection(relay.Connection):
+    class Meta:
+        node = TaskCommentType
 
 
 class TaskType(DjangoObjectType):
     comments = graphene.List(TaskCommentType)
+    comments_connection = graphene.Field(
+        TaskCommentConnection,
+        first=graphene.Int(),
+        after=graphene.String(),
+        last=graphene.Int(),
+        before=graphene.String()
+    )
     status = TaskStatusEnum()  # Use explicit enum for return type
 
     class Meta:
         model = Task
-        fields = '__all__'
+        exclude = ['organization']  # Denormalized copy of the project's
         convert_choices_to_enum = False  # Disable auto-enum generation
 
+    @classmethod
+    def is_type_of(cls, root, info):
+        # Archived tasks have the same fields
+        return isinstance(root, (Task, ArchivedTask))
+
     def resolve_status(self, info):
         # Convert database string to enum value
         return self.status  # Returns the string, GraphQL converts to enum
@@ -74,6 +129,71 @@ class TaskType(DjangoObjectType):
     def resolve_comments(self, info):
         return self.comments.all()
 
+    def resolve_comments_connection(self, info, first=None, after=None, last=None, before=None):
+        return paginate(
+            self.comments.all(),
+            TaskCommentConnection,
+            first=first, after=after, last=last, before=before
+        )
+
+
+class TaskConnection(relay.Connection):
+    class Meta:
+        node = TaskType
+
+
+class SearchResultType(graphene.ObjectType):
+    kind = SearchKindEnum()
+    object_id = graphene.ID()
+    title = graphene.String()
+    snippet = graphene.String()  # HTML-escaped, matches wrapped in <mark>
+    rank = graphene.Float()
+    project = graphene.Field(ProjectType)
+    task = graphene.Field(TaskType)
+    comment = graphene.Field(TaskCommentType)
+
+    def resolve_project(self, info):
+        return self.instance if self.kind == 'project' else None
+
+    def resolve_task(self, info):
+        return self.instance if self.kind == 'task' else None
+
+    def resolve_comment(self, info):
+        return self.instance if self.kind == 'comment' else None
+
+
+class SearchResultConnection(relay.Connection):
+    class Meta:
+        node = SearchResultType
+
+
+class JobType(DjangoObjectType):
+    class Meta:
+        model = Job
+        exclude = ['organization', 'locked_by', 'locked_at']
+        convert_choices_to_enum = False  # Disable auto-enum generation
+
+
+class JobConnection(relay.Connection):
+    class Meta:
+        node = JobType
+
+
+class TombstoneType(graphene.ObjectType):
+    kind = SearchKindEnum()
+    object_id = graphene.ID()
+    deleted_at = graphene.DateTime()
+
+
+class ChangesType(graphene.ObjectType):
+    projects = graphene.List(ProjectType)
+    tasks = graphene.List(TaskType)
+    comments = graphene.List(TaskCommentType)
+    deleted = graphene.List(TombstoneType)  # A deleted project also removes its tasks and comments
+    cursor = graphene.String()  # Pass back as 'cursor' to get only later changes
+    has_more = graphene.Boolean()  # Call again right away with the new cursor
+    full_resync = graphene.Boolean()  # The cursor is too old; drop local data and start over
+
 
 class ProjectStatisticsType(graphene.ObjectType):
     total_projects = graphene.Int()
@@ -84,6 +204,31 @@ class ProjectStatisticsType(graphene.ObjectType):
     overall_completion_rate = graphene.Float()
 
 
+class BurndownPointType(graphene.ObjectType):
+    date = graphene.Date()
+    remaining = graphene.Int()  # todo + inProgress at the end of the day
+    todo = graphene.Int()
+    in_progress = graphene.Int()
+    done = graphene.Int()
+    created = graphene.Int()
+    completed = graphene.Int()
+
+
+class ThroughputPointType(graphene.ObjectType):
+    date = graphene.Date()
+    created = graphene.Int()
+    completed = graphene.Int()
+    reopened = graphene.Int()
+    deleted = graphene.Int()
+    average_cycle_time_hours = graphene.Float()  # Creation to DONE, for tasks completed that day
+
+
+class ProjectOverdueType(graphene.ObjectType):
+    project = graphene.Field(ProjectType)
+    overdue_task_count = graphene.Int()
+    oldest_due_date = graphene.DateTime()
+
+
 class Query(graphene.ObjectType):
     # Organization queries
     organizations = graphene.List(OrganizationType)
@@ -93,7 +238,18 @@ class Query(graphene.ObjectType):
     projects = graphene.List(
         ProjectType,
         organization_slug=graphene.String(required=True),
-        status=graphene.String()  # Keep as String for flexibility (frontend sends strings)
+        status=graphene.String(),  # Keep as String for flexibility (frontend sends strings)
+        include_archived=graphene.Boolean(default_value=False)
+    )
+    projects_connection = graphene.Field(
+        ProjectConnection,
+        organization_slug=graphene.String(required=True),
+        status=graphene.String(),
+        include_archived=graphene.Boolean(default_value=False),
+        first=graphene.Int(),
+        after=graphene.String(),
+        last=graphene.Int(),
+        before=graphene.String()
     )
     project = graphene.Field(
         ProjectType,
@@ -105,12 +261,39 @@ class Query(graphene.ObjectType):
         organization_slug=graphene.String(required=True)
     )
 
+    # Daily history, read from pre-aggregated buckets (default: the last 30 days)
+    project_burndown = graphene.List(
+        BurndownPointType,
+        organization_slug=graphene.String(required=True),
+        project_id=graphene.ID(required=True),
+        since=graphene.Date(),
+        until=graphene.Date()
+    )
+    organization_throughput = graphene.List(
+        ThroughputPointType,
+        organization_slug=graphene.String(required=True),
+        since=graphene.Date(),
+        until=graphene.Date()
+    )
+
     # Task queries
     tasks = graphene.List(
         TaskType,
         project_id=graphene.ID(required=True),
         organization_slug=graphene.String(required=True),
-        status=graphene.String()  # Keep as String for flexibility (frontend sends strings)
+        status=graphene.String(),  # Keep as String for flexibility (frontend sends strings)
+        include_archived=graphene.Boolean(default_value=False)
+    )
+    tasks_connection = graphene.Field(
+        TaskConnection,
+        project_id=graphene.ID(required=True),
+        organization_slug=graphene.String(required=True),
+        status=graphene.String(),
+        include_archived=graphene.Boolean(default_value=False),
+        first=graphene.Int(),
+        after=graphene.String(),
+        last=graphene.Int(),
+        before=graphene.String()
     )
     task = graphene.Field(
         TaskType,
@@ -118,90 +301,243 @@ class Query(graphene.ObjectType):
         organization_slug=graphene.String(required=True)
     )
 
+    # Open tasks by deadline, earliest due first
+    overdue_tasks = graphene.Field(
+        TaskConnection,
+        organization_slug=graphene.String(required=True),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
+    due_soon = graphene.Field(
+        TaskConnection,
+        organization_slug=graphene.String(required=True),
+        within_days=graphene.Int(default_value=deadlines.DEFAULT_DUE_SOON_DAYS),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
+    overdue_task_counts = graphene.List(
+        ProjectOverdueType,
+        organization_slug=graphene.String(required=True)
+    )
+
+    # Full-text search across projects, tasks and comments, best match first
+    search = graphene.Field(
+        SearchResultConnection,
+        organization_slug=graphene.String(required=True),
+        query=graphene.String(required=True),
+        kind=SearchKindEnum(),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
+
+    # Rows changed or deleted after a cursor, for clients that keep a local copy
+    changes_since = graphene.Field(
+        ChangesType,
+        organization_slug=graphene.String(required=True),
+        cursor=graphene.String(),
+        limit=graphene.Int()
+    )
+
+    # Background jobs of an organization, newest first
+    job = graphene.Field(
+        JobType,
+        id=graphene.ID(required=True),
+        organization_slug=graphene.String(required=True)
+    )
+    jobs = graphene.Field(
+        JobConnection,
+        organization_slug=graphene.String(required=True),
+        status=JobStatusEnum(),
+        first=graphene.Int(),
+        after=graphene.String(),
+        last=graphene.Int(),
+        before=graphene.String()
+    )
+
     def resolve_organizations(self, info):
         return Organization.objects.all()
 
     def resolve_organization(self, info, slug):
-        return Organization.objects.get(slug=slug)
+        return get_organization(info, slug)
 
-    def resolve_projects(self, info, organization_slug, status=None):
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
+    def resolve_projects(self, info, organization_slug, status=None, include_archived=False):
+        organization = get_organization(info, organization_slug)
 
-        projects = Project.objects.filter(organization=organization)
+        projects = optimize(Project.objects.filter(organization=organization), info)
         if status:
             projects = projects.filter(status=status)
+        if not include_archived:
+            projects = projects.filter(archived_at__isnull=True)
         return projects
 
+    def resolve_projects_connection(self, info, organization_slug, status=None, include_archived=False,
+                                    first=None, after=None, last=None, before=None):
+        organization = get_organization(info, organization_slug)
+
+        projects = optimize(
+            Project.objects.filter(organization=organization), info,
+            path=('edges', 'node'), required=('created_at',)
+        )
+        if status:
+            projects = projects.filter(status=status)
+        if not include_archived:
+            projects = projects.filter(archived_at__isnull=True)
+
+        return paginate(
+            projects, ProjectConnection,
+            first=first, after=after, last=last, before=before
+        )
+
     def resolve_project(self, info, id, organization_slug):
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
+        organization = get_organization(info, organization_slug)
 
         try:
-            return Project.objects.get(id=id, organization=organization)
+            return optimize(Project.objects.all(), info).get(id=id, organization=organization)
         except Project.DoesNotExist:
             raise Exception(f"Project with id '{id}' not found in organization '{organization_slug}'")
 
     def resolve_project_statistics(self, info, organization_slug):
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
-
-        projects = Project.objects.filter(organization=organization)
-        tasks = Task.objects.filter(project__organization=organization)
-
-        total_projects = projects.count()
-        active_projects = projects.filter(status='ACTIVE').count()
-        completed_projects = projects.filter(status='COMPLETED').count()
-        total_tasks = tasks.count()
-        completed_tasks = tasks.filter(status='DONE').count()
-
-        overall_completion_rate = 0.0
-        if total_tasks > 0:
-            overall_completion_rate = round((completed_tasks / total_tasks) * 100, 2)
+        organization = get_organization(info, organization_slug)
 
+        totals = statistics.get_statistics(organization)
         return ProjectStatisticsType(
-            total_projects=total_projects,
-            active_projects=active_projects,
-            completed_projects=completed_projects,
-            total_tasks=total_tasks,
-            completed_tasks=completed_tasks,
-            overall_completion_rate=overall_completion_rate
+            overall_completion_rate=statistics.completion_rate(totals),
+            **totals
         )
 
-    def resolve_tasks(self, info, project_id, organization_slug, status=None):
+    def resolve_project_burndown(self, info, organization_slug, project_id, since=None, until=None):
+        organization = get_organization(info, organization_slug)
+
         try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
+            project = Project.objects.only('pk').get(id=project_id, organization=organization)
+        except Project.DoesNotExist:
+            raise Exception(f"Project with id '{project_id}' not found in organization '{organization_slug}'")
+        return history.project_burndown(project, since, until)
+
+    def resolve_organization_throughput(self, info, organization_slug, since=None, until=None):
+        organization = get_organization(info, organization_slug)
+
+        return history.organization_throughput(organization, since, until)
+
+    def resolve_tasks(self, info, project_id, organization_slug, status=None, include_archived=False):
+        organization = get_organization(info, organization_slug)
 
         try:
             project = Project.objects.get(id=project_id, organization=organization)
         except Project.DoesNotExist:
             raise Exception(f"Project with id '{project_id}' not found in organization '{organization_slug}'")
 
-        tasks = Task.objects.filter(project=project)
+        tasks = optimize(archive.tasks_of(project, include_archived), info)
         if status:
             tasks = tasks.filter(status=status)
         return tasks
 
-    def resolve_task(self, info, id, organization_slug):
+    def resolve_tasks_connection(self, info, project_id, organization_slug, status=None, include_archived=False,
+                                 first=None, after=None, last=None, before=None):
+        organization = get_organization(info, organization_slug)
+
         try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
+            project = Project.objects.get(id=project_id, organization=organization)
+        except Project.DoesNotExist:
+            raise Exception(f"Project with id '{project_id}' not found in organization '{organization_slug}'")
+
+        tasks = optimize(
+            archive.tasks_of(project, include_archived), info,
+            path=('edges', 'node'), required=('created_at',)
+        )
+        if status:
+            tasks = tasks.filter(status=status)
+        return paginate(
+            tasks, TaskConnection,
+            first=first, after=after, last=last, before=before
+        )
+
+    def resolve_task(self, info, id, organization_slug):
+        organization = get_organization(info, organization_slug)
 
         try:
-            task = Task.objects.get(id=id, project__organization=organization)
+            task = optimize(Task.objects.all(), info).get(id=id, organization=organization)
             return task
         except Task.DoesNotExist:
+            pass
+        try:
+            return optimize(ArchivedTask.objects.all(), info).get(id=id, organization=organization)
+        except ArchivedTask.DoesNotExist:
             raise Exception(f"Task with id '{id}' not found in organization '{organization_slug}'")
 
+    def resolve_overdue_tasks(self, info, organization_slug, first=None, after=None):
+        organization = get_organization(info, organization_slug)
+
+        tasks = optimize(
+            deadlines.overdue_tasks(organization), info,
+            path=('edges', 'node'), required=('due_date',)
+        )
+        return paginate_ascending(tasks, TaskConnection, 'due_date', first=first, after=after)
+
+    def resolve_due_soon(self, info, organization_slug, within_days, first=None, after=None):
+        organization = get_organization(info, organization_slug)
+
+        tasks = optimize(
+            deadlines.due_soon_tasks(organization, within_days), info,
+            path=('edges', 'node'), required=('due_date',)
+        )
+        return paginate_ascending(tasks, TaskConnection, 'due_date', first=first, after=after)
+
+    def resolve_overdue_task_counts(self, info, organization_slug):
+        organization = get_organization(info, organization_slug)
+
+        counts = deadlines.overdue_counts(organization)
+        projects = optimize(Project.objects.all(), info, path=('project',)).in_bulk(
+            [row['project_id'] for row in counts]
+        )
+        return [
+            ProjectOverdueType(
+                project=projects[row['project_id']],
+                overdue_task_count=row['overdue'],
+                oldest_due_date=row['oldest_due_date'],
+            )
+            for row in counts
+            if row['project_id'] in projects
+        ]
+
+    def resolve_search(self, info, organization_slug, query, kind=None, first=None, after=None):
+        organization = get_organization(info, organization_slug)
+
+        def fetch(limit, offset):
+            return search.search(
+                query, limit, offset, organization=organization, kind=kind.value if kind else None
+            )
+
+        connection = paginate_ranked(fetch, SearchResultConnection, first=first, after=after)
+        search.attach_instances([edge.node for edge in connection.edges])
+        return connection
+
+    def resolve_changes_since(self, info, organization_slug, cursor=None, limit=None):
+        organization = get_organization(info, organization_slug)
+
+        querysets = {
+            'projects': optimize(Project.objects.all(), info, path=('projects',), required=('updated_at',)),
+            'tasks': optimize(Task.objects.all(), info, path=('tasks',), required=('updated_at',)),
+            'comments': optimize(TaskComment.objects.all(), info, path=('comments',), required=('updated_at',)),
+        }
+        return sync.changes_since(organization, cursor, limit, querysets=querysets)
+
+    def resolve_job(self, info, id, organization_slug):
+        organization = get_organization(info, organization_slug)
+
+        try:
+            return Job.objects.get(id=id, organization=organization)
+        except Job.DoesNotExist:
+            raise Exception(f"Job with id '{id}' not found in organization '{organization_slug}'")
+
+    def resolve_jobs(self, info, organization_slug, status=None, first=None, after=None, last=None, before=None):
+        organization = get_organization(info, organization_slug)
+
+        jobs = Job.objects.filter(organization=organization)
+        if status:
+            jobs = jobs.filter(status=status.value)
+        return paginate(jobs, JobConnection, first=first, after=after, last=last, before=before)
+
 
 class CreateOrganization(graphene.Mutation):
     class Arguments:
@@ -217,6 +553,7 @@ class CreateOrganization(graphene.Mutation):
             slug=slug,
             contact_email=contact_email
         )
+        response_cache.bump_data_version(organization.slug)
         return CreateOrganization(organization=organization)
 
 
@@ -231,18 +568,18 @@ class CreateProject(graphene.Mutation):
     project = graphene.Field(ProjectType)
 
     def mutate(self, info, organization_slug, name, description="", status="ACTIVE", due_date=None):
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
-
-        project = Project.objects.create(
-            organization=organization,
-            name=name,
-            description=description,
-            status=status,
-            due_date=due_date
-        )
+        organization = get_organization(info, organization_slug)
+
+        with transaction.atomic():
+            project = Project.objects.create(
+                organization=organization,
+                name=name,
+                description=description,
+                status=status,
+                due_date=due_date
+            )
+            response_cache.bump_data_version(organization.slug)
+            changefeed.publish(organization, 'created', [project])
         return CreateProject(project=project)
 
 
@@ -258,15 +595,14 @@ class UpdateProject(graphene.Mutation):
     project = graphene.Field(ProjectType)
 
     def mutate(self, info, id, organization_slug, name=None, description=None, status=None, due_date=None):
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
+        organization = get_organization(info, organization_slug)
 
         try:
             project = Project.objects.get(id=id, organization=organization)
         except Project.DoesNotExist:
             raise Exception(f"Project with id '{id}' not found in organization '{organization_slug}'")
+        if project.archived_at is not None:
+            raise Exception(f"Project with id '{id}' is archived")
 
         if name is not None:
             project.name = name
@@ -277,7 +613,10 @@ class UpdateProject(graphene.Mutation):
         if due_date is not None:
             project.due_date = due_date
 
-        project.save()
+        with transaction.atomic():
+            project.save()
+            response_cache.bump_data_version(organization.slug)
+            changefeed.publish(organization, 'updated', [project])
         return UpdateProject(project=project)
 
 
@@ -294,24 +633,26 @@ class CreateTask(graphene.Mutation):
     task = graphene.Field(TaskType)
 
     def mutate(self, info, project_id, organization_slug, title, description="", status="TODO", assignee_email="", due_date=None):
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
+        organization = get_organization(info, organization_slug)
 
         try:
             project = Project.objects.get(id=project_id, organization=organization)
         except Project.DoesNotExist:
             raise Exception(f"Project with id '{project_id}' not found in organization '{organization_slug}'")
-
-        task = Task.objects.create(
-            project=project,
-            title=title,
-            description=description,
-            status=status,
-            assignee_email=assignee_email,
-            due_date=due_date
-        )
+        if project.archived_at is not None:
+            raise Exception(f"Project with id '{project_id}' is archived")
+
+        with transaction.atomic():
+            task = Task.objects.create(
+                project=project,
+                title=title,
+                description=description,
+                status=status,
+                assignee_email=assignee_email,
+                due_date=due_date
+            )
+            response_cache.bump_data_version(organization.slug)
+            changefeed.publish(organization, 'created', [task])
         return CreateTask(task=task)
 
 
@@ -328,13 +669,10 @@ class UpdateTask(graphene.Mutation):
     task = graphene.Field(TaskType)
 
     def mutate(self, info, id, organization_slug, title=None, description=None, status=None, assignee_email=None, due_date=None):
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
+        organization = get_organization(info, organization_slug)
 
         try:
-            task = Task.objects.get(id=id, project__organization=organization)
+            task = Task.objects.select_related('project').get(id=id, organization=organization)
         except Task.DoesNotExist:
             raise Exception(f"Task with id '{id}' not found in organization '{organization_slug}'")
 
@@ -349,7 +687,10 @@ class UpdateTask(graphene.Mutation):
         if due_date is not None:
             task.due_date = due_date
 
-        task.save()
+        with transaction.atomic():
+            task.save()
+            response_cache.bump_data_version(organization.slug)
+            changefeed.publish(organization, 'updated', [task])
         return UpdateTask(task=task)
 
 
@@ -363,13 +704,10 @@ class CreateTaskComment(graphene.Mutation):
     comment = graphene.Field(TaskCommentType)
 
     def mutate(self, info, task_id, organization_slug, content, author_email):
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise Exception(f"Organization with slug '{organization_slug}' not found")
+        organization = get_organization(info, organization_slug)
 
         try:
-            task = Task.objects.get(id=task_id, project__organization=organization)
+            task = Task.objects.select_related('project').get(id=task_id, organization=organization)
         except Task.DoesNotExist:
             raise Exception(f"Task with id '{task_id}' not found in organization '{organization_slug}'")
 
@@ -378,9 +716,122 @@ class CreateTaskComment(graphene.Mutation):
             content=content,
             author_email=author_email
         )
+        response_cache.bump_data_version(organization.slug)
+        changefeed.publish(organization, 'created', [comment])
         return CreateTaskComment(comment=comment)
 
 
+class TaskInput(graphene.InputObjectType):
+    project_id = graphene.ID(required=True)
+    title = graphene.String(required=True)
+    description = graphene.String()
+    status = graphene.String()
+    assignee_email = graphene.String()
+    due_date = graphene.DateTime()
+
+
+class TaskUpdateInput(graphene.InputObjectType):
+    id = graphene.ID(required=True)
+    title = graphene.String()
+    description = graphene.String()
+    status = graphene.String()
+    assignee_email = graphene.String()
+    due_date = graphene.DateTime()
+
+
+class BulkTaskResult(graphene.ObjectType):
+    """Outcome of one item in a bulk task mutation, in input order"""
+    index = graphene.Int()
+    ok = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+    task = graphene.Field(TaskType)
+
+
+def _bulk_results(results):
+    return [
+        BulkTaskResult(index=index, ok=not errors, errors=errors, task=task)
+        for index, (task, errors) in enumerate(results)
+    ]
+
+
+class BulkCreateTasks(graphene.Mutation):
+    class Arguments:
+        organization_slug = graphene.String(required=True)
+        tasks = graphene.List(graphene.NonNull(TaskInput), required=True)
+
+    results = graphene.List(BulkTaskResult)
+
+    def mutate(self, info, organization_slug, tasks):
+        organization = get_organization(info, organization_slug)
+        results = bulk.bulk_create_tasks(organization, tasks)
+        response_cache.bump_data_version(organization.slug)
+        changefeed.publish(organization, 'created', [task for task, _ in results if task is not None])
+        return BulkCreateTasks(results=_bulk_results(results))
+
+
+class BulkUpdateTasks(graphene.Mutation):
+    class Arguments:
+        organization_slug = graphene.String(required=True)
+        tasks = graphene.List(graphene.NonNull(TaskUpdateInput), required=True)
+
+    results = graphene.List(BulkTaskResult)
+
+    def mutate(self, info, organization_slug, tasks):
+        organization = get_organization(info, organization_slug)
+        results = bulk.bulk_update_tasks(organization, tasks)
+        response_cache.bump_data_version(organization.slug)
+        changefeed.publish(organization, 'updated', [task for task, _ in results if task is not None])
+        return BulkUpdateTasks(results=_bulk_results(results))
+
+
+class BulkMoveTasks(graphene.Mutation):
+    class Arguments:
+        organization_slug = graphene.String(required=True)
+        ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+        status = graphene.String(required=True)
+
+    results = graphene.List(BulkTaskResult)
+
+    def mutate(self, info, organization_slug, ids, status):
+        organization = get_organization(info, organization_slug)
+        results = bulk.bulk_move_tasks(organization, ids, status)
+        response_cache.bump_data_version(organization.slug)
+        changefeed.publish(organization, 'updated', [task for task, _ in results if task is not None])
+        return BulkMoveTasks(results=_bulk_results(results))
+
+
+class EnqueueJob(graphene.Mutation):
+    class Arguments:
+        organization_slug = graphene.String(required=True)
+        kind = JobKindEnum(required=True)
+        priority = graphene.Int()
+
+    job = graphene.Field(JobType)
+
+    def mutate(self, info, organization_slug, kind, priority=0):
+        organization = get_organization(info, organization_slug)
+
+        if abs(priority) > jobs.MAX_PRIORITY:
+            raise Exception(f"'priority' must be between -{jobs.MAX_PRIORITY} and {jobs.MAX_PRIORITY}")
+        return EnqueueJob(job=jobs.enqueue(kind.value, organization, priority=priority))
+
+
+class DeleteProject(graphene.Mutation):
+    """Queue the deletion of a project with its tasks and comments; poll the returned job"""
+    class Arguments:
+        id = graphene.ID(required=True)
+        organization_slug = graphene.String(required=True)
+
+    job = graphene.Field(JobType)
+
+    def mutate(self, info, id, organization_slug):
+        organization = get_organization(info, organization_slug)
+
+        if not Project.objects.filter(id=id, organization=organization).exists():
+            raise Exception(f"Project with id '{id}' not found in organization '{organization_slug}'")
+        return DeleteProject(job=jobs.enqueue('delete_project', organization, {'project_id': int(id)}))
+
+
 class Mutation(graphene.ObjectType):
     create_organization = CreateOrganization.Field()
     create_project = CreateProject.Field()
@@ -388,6 +839,11 @@ class Mutation(graphene.ObjectType):
     create_task = CreateTask.Field()
     update_task = UpdateTask.Field()
     create_task_comment = CreateTaskComment.Field()
+    bulk_create_tasks = BulkCreateTasks.Field()
+    bulk_update_tasks = BulkUpdateTasks.Field()
+    bulk_move_tasks = BulkMoveTasks.Field()
+    enqueue_job = EnqueueJob.Field()
+    delete_project = DeleteProject.Field()
 
 
 schema = graphene.Schema(query=Query, mutation=Mutation)
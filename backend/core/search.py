@@ -0,0 +1,241 @@
+"""
+Ranked full-text search over projects, tasks and comments.
+
+Every searchable row has a ``SearchEntry`` with its text, written by the
+save/delete receivers and the bulk paths. PostgreSQL matches entries with
+``websearch_to_tsquery`` against a GIN-indexed generated ``tsvector`` and
+ranks with ``ts_rank_cd``; SQLite uses an FTS5 table ranked by ``bm25``.
+Other databases fall back to ``icontains``.
+
+Snippets are HTML-escaped with matches wrapped in ``<mark>``.
+"""
+import html
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Project, SearchEntry, Task, TaskComment
+
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+SNIPPET_LENGTH = 160
+WRITE_BATCH_SIZE = 500
+
+# Private-use characters mark matches inside the database, before escaping
+_START = '\ue000'
+_STOP = '\ue001'
+
+KINDS = {Project: 'project', Task: 'task', TaskComment: 'comment'}
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    object_id: int
+    title: str
+    snippet: str
+    rank: float
+    instance: Any = field(default=None)
+
+
+def _text(instance):
+    """Return ``(title, body)`` indexed for ``instance``"""
+    if isinstance(instance, Project):
+        return instance.name, instance.description
+    if isinstance(instance, Task):
+        return instance.title, f'{instance.description} {instance.assignee_email}'.strip()
+    return '', f'{instance.content} {instance.author_email}'.strip()
+
+
+def index(instances, organization_id=None):
+    """Create or refresh the search entries of ``instances``"""
+    entries = []
+    for instance in instances:
+        title, body = _text(instance)
+        entries.append(SearchEntry(
+            organization_id=organization_id or instance.organization_id,
+            kind=KINDS[type(instance)],
+            object_id=instance.pk,
+            title=title,
+            body=body,
+        ))
+    SearchEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['title', 'body', 'updated_at'],
+        batch_size=WRITE_BATCH_SIZE,
+    )
+
+
+def unindex(instance):
+    """Remove the entry of ``instance`` and those of the tasks and comments under it"""
+    entries = Q(kind=KINDS[type(instance)], object_id=instance.pk)
+    if isinstance(instance, Project):
+        entries |= Q(kind='task', object_id__in=Task.objects.filter(project=instance).values('pk'))
+        entries |= Q(kind='comment', object_id__in=TaskComment.objects.filter(task__project=instance).values('pk'))
+    elif isinstance(instance, Task):
+        entries |= Q(kind='comment', object_id__in=TaskComment.objects.filter(task=instance).values('pk'))
+    SearchEntry.objects.filter(entries).delete()
+
+
+_REBUILD = [
+    """
+    INSERT INTO core_searchentry (organization_id, kind, object_id, title, body, updated_at)
+    SELECT p.organization_id, 'project', p.id, p.name, p.description, %s
+    FROM core_project p {where}
+    """,
+    """
+    INSERT INTO core_searchentry (organization_id, kind, object_id, title, body, updated_at)
+    SELECT t.organization_id, 'task', t.id, t.title, TRIM(t.description || ' ' || t.assignee_email), %s
+    FROM core_task t {where}
+    """,
+    """
+    INSERT INTO core_searchentry (organization_id, kind, object_id, title, body, updated_at)
+    SELECT c.organization_id, 'comment', c.id, '', TRIM(c.content || ' ' || c.author_email), %s
+    FROM core_taskcomment c {where}
+    """,
+]
+
+
+def rebuild_index(organization=None):
+    """Rewrite the search entries of one organization (or all) with set-based SQL"""
+    entries = SearchEntry.objects.all()
+    where, params = '', []
+    if organization is not None:
+        entries = entries.filter(organization=organization)
+        # Every source table carries organization_id, so no joins are needed
+        where, params = 'WHERE organization_id = %s', [organization.pk]
+
+    now = timezone.now()
+    with transaction.atomic():
+        entries.delete()
+        with connection.cursor() as cursor:
+            for statement in _REBUILD:
+                cursor.execute(statement.format(where=where), [now, *params])
+
+
+@lru_cache(maxsize=None)
+def _has_fts5(alias):
+    return 'core_searchentry_fts' in connections[alias].introspection.table_names()
+
+
+def _filters(organization_id, kind):
+    conditions, params = [], []
+    if organization_id is not None:
+        conditions.append('e.organization_id = %s')
+        params.append(organization_id)
+    if kind is not None:
+        conditions.append('e.kind = %s')
+        params.append(kind)
+    return ''.join(f' AND {condition}' for condition in conditions), params
+
+
+def _search_postgresql(text, limit, offset, organization_id, kind):
+    filters, params = _filters(organization_id, kind)
+    options = f'StartSel={_START}, StopSel={_STOP}, MaxWords=24, MinWords=8, MaxFragments=2'
+    # Headlines are expensive, so only the requested page gets them
+    sql = f"""
+        WITH query AS (SELECT websearch_to_tsquery('english', %s) AS q)
+        SELECT hits.kind, hits.object_id, hits.title,
+               ts_headline('english', CASE WHEN hits.body = '' THEN hits.title ELSE hits.body END,
+                           query.q, %s),
+               hits.rank
+        FROM (
+            SELECT e.id, e.kind, e.object_id, e.title, e.body, ts_rank_cd(e.search_vector, query.q) AS rank
+            FROM core_searchentry e, query
+            WHERE e.search_vector @@ query.q{filters}
+            ORDER BY rank DESC, e.id DESC
+            LIMIT %s OFFSET %s
+        ) hits, query
+        ORDER BY hits.rank DESC, hits.id DESC
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [text, options, *params, limit, offset])
+        return cursor.fetchall()
+
+
+def _search_sqlite(text, limit, offset, organization_id, kind):
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return []
+    # Quote every term so user input is never parsed as FTS5 syntax
+    match = ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+    filters, params = _filters(organization_id, kind)
+    sql = f"""
+        SELECT e.kind, e.object_id, e.title,
+               snippet(core_searchentry_fts, -1, %s, %s, '…', 16),
+               -bm25(core_searchentry_fts, 4.0, 1.0) AS rank
+        FROM core_searchentry_fts JOIN core_searchentry e ON e.id = core_searchentry_fts.rowid
+        WHERE core_searchentry_fts MATCH %s{filters}
+        ORDER BY rank DESC, e.id DESC
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_START, _STOP, match, *params, limit, offset])
+        return cursor.fetchall()
+
+
+def _search_fallback(text, limit, offset, organization_id, kind):
+    entries = SearchEntry.objects.filter(Q(title__icontains=text) | Q(body__icontains=text))
+    if organization_id is not None:
+        entries = entries.filter(organization_id=organization_id)
+    if kind is not None:
+        entries = entries.filter(kind=kind)
+    pattern = re.compile(re.escape(text), re.IGNORECASE)
+    rows = []
+    for entry in entries.order_by('-updated_at', '-id')[offset:offset + limit]:
+        source = entry.body or entry.title
+        match = pattern.search(source)
+        start = max(0, match.start() - SNIPPET_LENGTH // 2) if match else 0
+        snippet = pattern.sub(lambda m: f'{_START}{m.group(0)}{_STOP}', source[start:start + SNIPPET_LENGTH])
+        rows.append((entry.kind, entry.object_id, entry.title, snippet, 0.0))
+    return rows
+
+
+def _highlight(snippet):
+    return html.escape(snippet or '').replace(_START, HIGHLIGHT_START).replace(_STOP, HIGHLIGHT_STOP)
+
+
+def search(text, limit, offset=0, organization=None, kind=None):
+    """Return one page of ``SearchHit`` for ``text``, best match first"""
+    text = (text or '').strip()
+    if not text:
+        return []
+    organization_id = organization.pk if organization is not None else None
+
+    if connection.vendor == 'postgresql':
+        run = _search_postgresql
+    elif connection.vendor == 'sqlite' and _has_fts5(connection.alias):
+        run = _search_sqlite
+    else:
+        run = _search_fallback
+    rows = run(text, limit, offset, organization_id, kind)
+    return [
+        SearchHit(kind=kind, object_id=object_id, title=title, snippet=_highlight(snippet), rank=rank)
+        for kind, object_id, title, snippet, rank in rows
+    ]
+
+
+def attach_instances(hits):
+    """Load the project, task or comment behind each hit with one query per kind"""
+    querysets = {
+        'project': Project.objects.all(),
+        'task': Task.objects.select_related('project'),
+        'comment': TaskComment.objects.select_related('task'),
+    }
+    for kind, queryset in querysets.items():
+        ids = [hit.object_id for hit in hits if hit.kind == kind]
+        if not ids:
+            continue
+        instances = queryset.in_bulk(ids)
+        for hit in hits:
+            if hit.kind == kind:
+                hit.instance = instances.get(hit.object_id)
+    return hits
@@ -0,0 +1,184 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import counters, history, search, statistics, sync
+from .models import (
+    ArchivedTask, ArchivedTaskComment, Organization, Project, SearchEntry, Task, TaskComment, Tombstone
+)
+from .organizations import invalidate_organization
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def invalidate_cached_organization(sender, instance, **kwargs):
+    # Covers CreateOrganization, admin edits and deletes
+    invalidate_organization(instance)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=TaskComment)
+def index_for_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index([instance])
+
+
+def _origin_model(origin):
+    return getattr(origin, 'model', type(origin))
+
+
+# Parents whose deletion already accounts for a row's search entry and tombstone
+CASCADE_PARENTS = {
+    Project: (Organization,),
+    Task: (Organization, Project),
+    TaskComment: (Organization, Project, Task),
+}
+
+
+def _deleted_with_parent(sender, origin):
+    return issubclass(_origin_model(origin), CASCADE_PARENTS[sender])
+
+
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Task)
+@receiver(pre_delete, sender=TaskComment)
+def remove_from_search(sender, instance, origin=None, **kwargs):
+    # Runs before the cascade so child rows can still be found
+    if not _deleted_with_parent(sender, origin):
+        search.unindex(instance)
+
+
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Task)
+@receiver(pre_delete, sender=TaskComment)
+def leave_tombstone(sender, instance, origin=None, **kwargs):
+    if not _deleted_with_parent(sender, origin):
+        sync.record_deletion(instance)
+
+
+@receiver(pre_save, sender=Project)
+def remember_project_statistics_state(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._loaded_statistics_state = (None, None)
+    elif None in getattr(instance, '_loaded_statistics_state', (None, None)):
+        # Built by hand or loaded with status deferred; read what the row holds
+        instance._loaded_statistics_state = (
+            Project.objects.values_list('organization_id', 'status').get(pk=instance.pk)
+        )
+
+
+@receiver(post_save, sender=Project)
+def move_project_rows(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Carry a project's tasks, comments and their copies over when it moves to another organization"""
+    # Registered before move_project_statistics, which records the row's new state
+    if raw:
+        return
+    old_organization_id = instance._loaded_statistics_state[0]
+    organization_id = instance.organization_id
+    if update_fields is not None and not {'organization', 'organization_id'} & set(update_fields):
+        organization_id = old_organization_id
+    if old_organization_id in (None, organization_id):
+        return
+
+    tasks = Task.objects.filter(project=instance)
+    comments = TaskComment.objects.filter(task__project=instance)
+    SearchEntry.objects.filter(
+        Q(kind='project', object_id=instance.pk)
+        | Q(kind='task', object_id__in=tasks.values('pk'))
+        | Q(kind='comment', object_id__in=comments.values('pk'))
+    ).update(organization_id=organization_id)
+    # Touched so the new organization's changesSince clients get them
+    now = timezone.now()
+    comments.update(organization_id=organization_id, updated_at=now)
+    tasks.update(organization_id=organization_id, updated_at=now)
+    ArchivedTaskComment.objects.filter(task__project=instance).update(organization_id=organization_id)
+    ArchivedTask.objects.filter(project=instance).update(organization_id=organization_id)
+    # The project's tombstone covers its tasks and comments for the old organization's clients
+    Tombstone.objects.create(organization_id=old_organization_id, kind='project', object_id=instance.pk)
+
+
+@receiver(post_save, sender=Project)
+def move_project_statistics(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    old_organization_id, old_status = instance._loaded_statistics_state
+    organization_id, status = instance.organization_id, instance.status
+    if update_fields is not None:
+        organization_id = organization_id if {'organization', 'organization_id'} & set(update_fields) else old_organization_id
+        status = status if 'status' in update_fields else old_status
+
+    if old_organization_id is None:
+        statistics.record_project_created(organization_id, status)
+    elif old_organization_id != organization_id:
+        totals = Project.objects.values_list('task_count', 'done_task_count').get(pk=instance.pk)
+        statistics.record_project_deleted(old_organization_id, old_status, *totals)
+        statistics.record_project_created(organization_id, status, *totals)
+    else:
+        statistics.record_project_status_changed(organization_id, old_status, status)
+    instance._loaded_statistics_state = (organization_id, status)
+
+
+@receiver(pre_delete, sender=Project)
+def release_project_statistics(sender, instance, origin=None, **kwargs):
+    # An organization's rollup row is deleted with it
+    if not issubclass(_origin_model(origin), Organization):
+        # The row's own totals: the instance's counters may be stale
+        status, task_count, done_task_count = (
+            Project.objects.values_list('status', 'task_count', 'done_task_count').get(pk=instance.pk)
+        )
+        statistics.record_project_deleted(instance.organization_id, status, task_count, done_task_count)
+
+
+@receiver(pre_save, sender=Task)
+def remember_counted_state(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._loaded_counter_state = (None, None)
+    elif None in getattr(instance, '_loaded_counter_state', (None, None)):
+        # Built by hand or loaded with status deferred; read what the row holds
+        instance._loaded_counter_state = (
+            Task.objects.values_list('project_id', 'status').get(pk=instance.pk)
+        )
+
+
+@receiver(post_save, sender=Task)
+def move_project_counters(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    old_project_id, old_status = instance._loaded_counter_state
+    project_id, status = instance.project_id, instance.status
+    if update_fields is not None:
+        project_id = project_id if {'project', 'project_id'} & set(update_fields) else old_project_id
+        status = status if 'status' in update_fields else old_status
+
+    projects = [instance.project] if Task.project.is_cached(instance) else []
+    if old_project_id is None:
+        counters.record_task_changes([(project_id, None, status)], projects)
+        statistics.record_task_changes(instance.organization_id, created=[status])
+        history.record_status_changes([(instance, None, status)])
+    elif old_project_id != project_id:
+        counters.record_task_changes(
+            [(old_project_id, old_status, None), (project_id, None, status)], projects
+        )
+        old_organization_id = Project.objects.values_list('organization_id', flat=True).get(pk=old_project_id)
+        if old_organization_id == instance.organization_id:
+            statistics.record_task_changes(instance.organization_id, status_changes=[(old_status, status)])
+        else:
+            statistics.record_task_changes(old_organization_id, deleted=[old_status])
+            statistics.record_task_changes(instance.organization_id, created=[status])
+        history.record_status_changes([(instance, old_status, status)], projects=[old_project_id, project_id])
+    else:
+        counters.record_task_changes([(project_id, old_status, status)], projects)
+        statistics.record_task_changes(instance.organization_id, status_changes=[(old_status, status)])
+        history.record_status_changes([(instance, old_status, status)])
+    instance._loaded_counter_state = (project_id, status)
+
+
+@receiver(post_delete, sender=Task)
+def release_project_counters(sender, instance, origin=None, **kwargs):
+    # Tasks deleted with their project need no counter or statistics update
+    if not issubclass(_origin_model(origin), (Organization, Project)):
+        counters.record_task_changes([(instance.project_id, instance.status, None)])
+        statistics.record_task_changes(instance.organization_id, deleted=[instance.status])
+        history.record_status_changes([(instance, instance.status, None)])
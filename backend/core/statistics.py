@@ -0,0 +1,140 @@
+"""
+Organization dashboard statistics.
+
+Totals are answered with a single conditional-aggregation query over the
+projects and their task counters, without touching the task table. When
+``PROJECT_STATISTICS_ROLLUP`` is enabled they are instead read from the
+``OrganizationStatistics`` rollup row, kept current by applying deltas inside
+the writer's transaction: from the save and delete receivers in
+``core.signals`` for single rows (mutations, admin, any ORM ``save()`` or
+``delete()``), and from the bulk paths, which bypass those receivers.
+"""
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import OrganizationStatistics, Project
+
+
+STATISTICS_FIELDS = [
+    'total_projects',
+    'active_projects',
+    'completed_projects',
+    'total_tasks',
+    'completed_tasks',
+]
+
+
+def rollup_enabled():
+    return getattr(settings, 'PROJECT_STATISTICS_ROLLUP', False)
+
+
+def compute_statistics(organization):
+    """Aggregate an organization's totals in one query over its projects' task counters"""
+    return Project.objects.filter(organization=organization).aggregate(
+        total_projects=Count('id'),
+        active_projects=Count('id', filter=Q(status='ACTIVE')),
+        completed_projects=Count('id', filter=Q(status='COMPLETED')),
+        total_tasks=Coalesce(Sum('task_count'), 0),
+        completed_tasks=Coalesce(Sum('done_task_count'), 0),
+    )
+
+
+def get_statistics(organization):
+    """Return the organization's totals as a dict keyed by ``STATISTICS_FIELDS``"""
+    if not rollup_enabled():
+        return compute_statistics(organization)
+
+    try:
+        rollup = OrganizationStatistics.objects.get(organization=organization)
+    except OrganizationStatistics.DoesNotExist:
+        # First read for this organization builds the row; deltas keep it current
+        rollup, _ = OrganizationStatistics.objects.get_or_create(
+            organization=organization,
+            defaults=compute_statistics(organization)
+        )
+    return {field: getattr(rollup, field) for field in STATISTICS_FIELDS}
+
+
+def completion_rate(statistics):
+    if statistics['total_tasks'] == 0:
+        return 0.0
+    return round((statistics['completed_tasks'] / statistics['total_tasks']) * 100, 2)
+
+
+def _apply_deltas(organization_id, deltas):
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas or not rollup_enabled():
+        return
+    # Organizations without a rollup row are built from scratch on first read
+    OrganizationStatistics.objects.filter(organization_id=organization_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def _project_deltas(status, sign):
+    return {
+        'total_projects': sign,
+        'active_projects': sign if status == 'ACTIVE' else 0,
+        'completed_projects': sign if status == 'COMPLETED' else 0,
+    }
+
+
+def _task_deltas(status, sign):
+    return {
+        'total_tasks': sign,
+        'completed_tasks': sign if status == 'DONE' else 0,
+    }
+
+
+def _merge(removed, added):
+    return {field: removed.get(field, 0) + added.get(field, 0) for field in set(removed) | set(added)}
+
+
+def _project_totals(status, task_count, done_task_count, sign):
+    return _merge(_project_deltas(status, sign), {
+        'total_tasks': sign * task_count,
+        'completed_tasks': sign * done_task_count,
+    })
+
+
+def record_project_created(organization_id, status, task_count=0, done_task_count=0):
+    _apply_deltas(organization_id, _project_totals(status, task_count, done_task_count, 1))
+
+
+def record_project_deleted(organization_id, status, task_count=0, done_task_count=0):
+    """Remove a project and the tasks it counted"""
+    _apply_deltas(organization_id, _project_totals(status, task_count, done_task_count, -1))
+
+
+def record_project_status_changed(organization_id, old_status, new_status):
+    if old_status != new_status:
+        _apply_deltas(organization_id, _merge(
+            _project_deltas(old_status, -1),
+            _project_deltas(new_status, 1),
+        ))
+
+
+def record_task_changes(organization_id, created=(), status_changes=(), deleted=()):
+    """Apply one combined delta for a batch of created tasks, status transitions and deleted tasks"""
+    deltas = {}
+    for status in created:
+        deltas = _merge(deltas, _task_deltas(status, 1))
+    for status in deleted:
+        deltas = _merge(deltas, _task_deltas(status, -1))
+    for old_status, new_status in status_changes:
+        if old_status != new_status:
+            deltas = _merge(deltas, _merge(
+                _task_deltas(old_status, -1),
+                _task_deltas(new_status, 1),
+            ))
+    _apply_deltas(organization_id, deltas)
+
+
+def rebuild_statistics(organization):
+    """Recompute an organization's rollup row from the live tables"""
+    rollup, _ = OrganizationStatistics.objects.update_or_create(
+        organization=organization,
+        defaults=compute_statistics(organization)
+    )
+    return rollup
@@ -0,0 +1,169 @@
+"""
+Incremental sync for ``changesSince``.
+
+Projects, tasks, comments and tombstones are each read as a keyset stream
+ordered by ``(updated_at, id)`` (``deleted_at`` for tombstones). The opaque
+cursor records where every stream stopped, so a client that passes back the
+previous cursor only downloads what changed.
+
+A row's ``updated_at`` is set before its transaction commits, so a slow
+writer (or a lagging replica) can make a row visible after newer ones were
+returned. Cursors therefore never move past ``now - CHANGES_SINCE_OVERLAP``
+seconds: the rows of that window are sent again on the next call, and
+clients apply changes as idempotent upserts.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Project, Task, TaskComment, Tombstone
+
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 1000
+
+KINDS = {Project: 'project', Task: 'task', TaskComment: 'comment'}
+
+
+def overlap():
+    return timedelta(seconds=getattr(settings, 'CHANGES_SINCE_OVERLAP', 10))
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'CHANGES_SINCE_TOMBSTONE_DAYS', 30))
+
+
+def record_deletion(instance):
+    """Leave a tombstone for a project, task or comment about to be deleted"""
+    Tombstone.objects.create(
+        organization_id=instance.organization_id,
+        kind=KINDS[type(instance)],
+        object_id=instance.pk,
+    )
+
+
+def encode_cursor(positions, issued_at):
+    payload = {
+        'issued': issued_at.isoformat(),
+        'positions': {
+            stream: [moment.isoformat(), pk] for stream, (moment, pk) in positions.items()
+        },
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return ``(positions, issued_at)``, where positions map a stream to ``(moment, id)``"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        positions = {
+            stream: (datetime.fromisoformat(moment), int(pk))
+            for stream, (moment, pk) in payload['positions'].items()
+        }
+        return positions, datetime.fromisoformat(payload['issued'])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise Exception(f"Invalid cursor '{cursor}'")
+
+
+def _after(ordering, position):
+    if position is None:
+        return Q()
+    moment, pk = position
+    return Q(**{f'{ordering}__gt': moment}) | Q(**{ordering: moment, 'pk__gt': pk})
+
+
+def _read(queryset, ordering, position, limit, horizon):
+    """
+    Return ``(rows, next position, has_more)`` for one stream.
+
+    The next position is capped at ``horizon`` so rows that may still be
+    committing are read again next time.
+    """
+    rows = list(queryset.filter(_after(ordering, position)).order_by(ordering, 'pk')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return rows, position, False
+
+    last = (getattr(rows[-1], ordering), rows[-1].pk)
+    if last[0] <= horizon:
+        return rows, last, has_more
+    # Rows past the horizon are re-sent; never fall back behind the old position
+    capped = (horizon, 0)
+    if position is not None and capped < position:
+        capped = position
+    # More rows inside the window would page forever; the next poll gets them
+    return rows, capped, False
+
+
+@dataclass
+class Changes:
+    """One page of changes for an organization"""
+    projects: list = field(default_factory=list)
+    tasks: list = field(default_factory=list)
+    comments: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+    cursor: str = None
+    has_more: bool = False
+    full_resync: bool = False
+
+
+def changes_since(organization, cursor=None, limit=None, querysets=None):
+    """
+    Return the ``Changes`` of ``organization`` after ``cursor``.
+
+    Without a cursor every row is returned, page by page. ``querysets`` may
+    override the project, task and comment querysets (e.g. to prune columns).
+    """
+    limit = DEFAULT_LIMIT if limit is None else limit
+    if limit < 1 or limit > MAX_LIMIT:
+        raise Exception(f"'limit' must be between 1 and {MAX_LIMIT}")
+
+    now = timezone.now()
+    positions = {}
+    if cursor:
+        positions, issued_at = decode_cursor(cursor)
+        if issued_at < now - tombstone_retention():
+            # Tombstones this old are pruned; the client must reload everything
+            return Changes(full_resync=True)
+
+    querysets = querysets or {}
+    streams = {
+        'projects': (querysets.get('projects', Project.objects.all())
+                     .filter(organization=organization), 'updated_at'),
+        'tasks': (querysets.get('tasks', Task.objects.all())
+                  .filter(organization=organization), 'updated_at'),
+        'comments': (querysets.get('comments', TaskComment.objects.all())
+                     .filter(organization=organization), 'updated_at'),
+        'deleted': (Tombstone.objects.filter(organization=organization), 'deleted_at'),
+    }
+
+    horizon = now - overlap()
+    results = {}
+    next_positions = {}
+    has_more = False
+    for stream, (queryset, ordering) in streams.items():
+        rows, position, more = _read(queryset, ordering, positions.get(stream), limit, horizon)
+        results[stream] = rows
+        if position is not None:
+            next_positions[stream] = position
+        has_more = has_more or more
+
+    return Changes(
+        cursor=encode_cursor(next_positions, now),
+        has_more=has_more,
+        **results,
+    )
+
+
+def prune_tombstones(before=None):
+    """Delete tombstones older than the retention period; returns how many"""
+    before = before or timezone.now() - tombstone_retention()
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=before).delete()
+    return deleted
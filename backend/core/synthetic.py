@@ -0,0 +1,166 @@
+"""
+Seedable synthetic dataset generator for reproducing production-sized tenants.
+
+Rows are generated lazily and written in batches, so memory stays flat no
+matter how large the dataset is. PostgreSQL uses ``COPY`` for tasks and
+comments; other databases fall back to ``bulk_create``.
+"""
+import random
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import counters, history, search
+from .bulk import batched, copy_rows, reserve_ids
+from .models import Organization, Project, Task, TaskComment
+
+
+PROJECT_STATUS_WEIGHTS = {'ACTIVE': 60, 'COMPLETED': 30, 'ON_HOLD': 10}
+
+# Finished projects are almost entirely DONE; active ones carry the open work
+TASK_STATUS_WEIGHTS = {
+    'ACTIVE': {'TODO': 40, 'IN_PROGRESS': 25, 'DONE': 35},
+    'COMPLETED': {'TODO': 0, 'IN_PROGRESS': 5, 'DONE': 95},
+    'ON_HOLD': {'TODO': 60, 'IN_PROGRESS': 20, 'DONE': 20},
+}
+
+ASSIGNEES_PER_ORGANIZATION = 25
+UNASSIGNED_RATE = 0.1
+NO_DUE_DATE_RATE = 0.15
+
+VERBS = ['Design', 'Implement', 'Review', 'Test', 'Document', 'Refactor', 'Deploy', 'Fix']
+NOUNS = ['login flow', 'dashboard', 'billing page', 'search', 'API client', 'onboarding',
+         'reports', 'notifications', 'settings', 'data export']
+
+
+class SyntheticDataGenerator:
+    def __init__(self, organizations, projects_per_org, tasks_per_project,
+                 comments_per_task, seed=0, batch_size=5000, prefix='scale', stdout=None):
+        self.organizations = organizations
+        self.projects_per_org = projects_per_org
+        self.tasks_per_project = tasks_per_project
+        self.comments_per_task = comments_per_task
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.stdout = stdout
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.use_copy = connection.vendor == 'postgresql'
+        self.counts = {'organizations': 0, 'projects': 0, 'tasks': 0, 'comments': 0}
+
+    def run(self):
+        for index in range(self.organizations):
+            with transaction.atomic():
+                self._generate_organization(index)
+            self._log(
+                f"Organization {index + 1}/{self.organizations}: "
+                f"{self.counts['tasks']} tasks, {self.counts['comments']} comments so far"
+            )
+        return self.counts
+
+    def _log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def _weighted(self, weights):
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _generate_organization(self, index):
+        slug = f'{self.prefix}-org-{index + 1}'
+        organization = Organization.objects.create(
+            name=f'{self.prefix.title()} Organization {index + 1}',
+            slug=slug,
+            contact_email=f'contact@{slug}.example.com',
+        )
+        self.counts['organizations'] += 1
+
+        # Zipf-like skew: a few assignees own most of the work
+        assignees = [f'user{rank}@{slug}.example.com' for rank in range(ASSIGNEES_PER_ORGANIZATION)]
+        assignee_weights = [1 / (rank + 1) for rank in range(ASSIGNEES_PER_ORGANIZATION)]
+
+        projects = Project.objects.bulk_create([
+            Project(
+                organization=organization,
+                name=f'Project {number + 1}',
+                description=f'Synthetic project {number + 1} for {organization.name}',
+                status=self._weighted(PROJECT_STATUS_WEIGHTS),
+                due_date=(self.now + timedelta(days=self.random.randint(-90, 180))).date(),
+            )
+            for number in range(self.projects_per_org)
+        ], batch_size=self.batch_size)
+        self.counts['projects'] += len(projects)
+
+        tasks = self._tasks(projects, assignees, assignee_weights)
+        for batch in batched(tasks, self.batch_size):
+            task_ids = self._write_tasks(batch)
+            self.counts['tasks'] += len(task_ids)
+            comments = self._comments(organization, task_ids, assignees)
+            for comment_batch in batched(comments, self.batch_size):
+                self._write_comments(comment_batch)
+                self.counts['comments'] += len(comment_batch)
+        counters.rebuild_counters(Project.objects.filter(organization=organization))
+        history.record_status_changes([], projects=[project.pk for project in projects])
+        search.rebuild_index(organization)
+
+    def _tasks(self, projects, assignees, assignee_weights):
+        for project in projects:
+            weights = TASK_STATUS_WEIGHTS[project.status]
+            for number in range(self.tasks_per_project):
+                assignee = ''
+                if self.random.random() >= UNASSIGNED_RATE:
+                    assignee = self.random.choices(assignees, weights=assignee_weights)[0]
+                due_date = None
+                if self.random.random() >= NO_DUE_DATE_RATE:
+                    # Centred two weeks out with a long tail of overdue work
+                    due_date = self.now + timedelta(days=self.random.gauss(14, 30))
+                # Only COPY can backdate rows; bulk_create applies auto_now_add
+                created_at = self.now - timedelta(minutes=self.random.randint(0, 365 * 24 * 60))
+                yield {
+                    'organization_id': project.organization_id,
+                    'project_id': project.pk,
+                    'title': f'{self.random.choice(VERBS)} {self.random.choice(NOUNS)} #{number + 1}',
+                    'description': '',
+                    'status': self._weighted(weights),
+                    'assignee_email': assignee,
+                    'due_date': due_date,
+                    'created_at': created_at,
+                }
+
+    def _comments(self, organization, task_ids, assignees):
+        for task_id in task_ids:
+            # Geometric spread around the configured mean
+            count = 0
+            if self.comments_per_task:
+                while self.random.random() < self.comments_per_task / (self.comments_per_task + 1):
+                    count += 1
+            for number in range(count):
+                yield {
+                    'organization_id': organization.pk,
+                    'task_id': task_id,
+                    'content': f'Synthetic comment {number + 1}',
+                    'author_email': self.random.choice(assignees),
+                    'created_at': self.now - timedelta(minutes=self.random.randint(0, 30 * 24 * 60)),
+                }
+
+    def _write_tasks(self, rows):
+        if self.use_copy:
+            ids = reserve_ids(Task, len(rows))
+            copy_rows(Task, ['id', *rows[0], 'updated_at'], (
+                [task_id, *row.values(), row['created_at']] for task_id, row in zip(ids, rows)
+            ))
+            return ids
+        tasks = Task.objects.bulk_create(
+            [Task(**row) for row in rows], batch_size=self.batch_size
+        )
+        return [task.pk for task in tasks]
+
+    def _write_comments(self, rows):
+        if self.use_copy:
+            copy_rows(TaskComment, [*rows[0], 'updated_at'], (
+                [*row.values(), row['created_at']] for row in rows
+            ))
+            return
+        TaskComment.objects.bulk_create(
+            [TaskComment(**row) for row in rows], batch_size=self.batch_size
+        )
@@ -0,0 +1,1285 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.admin.sites import site
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.db.migrations.executor import MigrationExecutor
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from graphql import parse
+
+from . import (
+    admin, archive, benchmarks, bulk, changefeed, cost, counters, documents, export, history, importer, jobs, metrics,
+    organizations, routing, search, statistics, sync
+)
+from .models import (
+    ArchivedTask, ArchivedTaskComment, ImportedRow, Job, Organization, OrganizationDailyStatistics, Project,
+    ProjectDailyStatistics, SearchEntry, Task, TaskComment, Tombstone
+)
+from .lru import MISSING, LRUCache
+from .schema import schema
+
+
+def analyze(query, variables=None):
+    return cost.analyze(schema.graphql_schema, parse(query), variables=variables)
+
+
+def create_organization(slug='acme'):
+    return Organization.objects.create(name=slug.title(), slug=slug, contact_email=f'ops@{slug}.test')
+
+
+def execute(client, query, variables=None, **headers):
+    response = client.post(
+        '/graphql/', {'query': query, 'variables': variables or {}}, content_type='application/json', **headers
+    )
+    return response.json()
+
+
+class PageSizeCostTests(SimpleTestCase):
+    QUERY = '{ projectsConnection(organizationSlug: "a", first: %s) { edges { node { id } } } }'
+    VARIABLE_QUERY = 'query($f: Int) { projectsConnection(organizationSlug: "a", first: $f) { edges { node { id } } } }'
+
+    def test_page_size_multiplies_cost(self):
+        self.assertEqual(analyze(self.QUERY % 10).cost, 2 * analyze(self.QUERY % 5).cost)
+
+    def test_negative_page_size_cannot_lower_cost(self):
+        expensive = '{ projects(organizationSlug: "a") { id tasks { id comments { id } } } }'
+        negative = '{ projectsConnection(organizationSlug: "a", first: -100000) { edges { node { id } } } %s }'
+        self.assertEqual(analyze(self.QUERY % -100000).cost, 0)
+        self.assertGreaterEqual(analyze(negative % expensive[1:-1]).cost, analyze(expensive).cost)
+
+    def test_page_size_is_capped(self):
+        self.assertEqual(analyze(self.QUERY % 1000000).cost, analyze(self.QUERY % cost.MAX_PAGE_SIZE).cost)
+
+    def test_integer_variable(self):
+        self.assertEqual(analyze(self.VARIABLE_QUERY, {'f': 5}).cost, analyze(self.QUERY % 5).cost)
+
+    def test_non_integer_variable_uses_default(self):
+        default = analyze(self.VARIABLE_QUERY).cost
+        for value in ['5', 5.5, True, [5], {'f': 5}]:
+            with self.subTest(value=value):
+                self.assertEqual(analyze(self.VARIABLE_QUERY, {'f': value}).cost, default)
+
+    def test_non_object_variables(self):
+        self.assertEqual(analyze(self.VARIABLE_QUERY, ['f']).cost, analyze(self.VARIABLE_QUERY).cost)
+
+
+@override_settings(GRAPHQL_METRICS_SAMPLE_RATE=1, GRAPHQL_METRICS_OPERATIONS=['GetProjects'])
+class MetricsLabelTests(SimpleTestCase):
+    def setUp(self):
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+    def test_unknown_operation_names_share_one_series(self):
+        for name in ['GetProjects', 'Probe1', 'Probe2', None]:
+            with metrics.record_operation(name):
+                pass
+        self.assertEqual(dict(metrics.registry.operations), {'GetProjects': 1, metrics.OTHER_OPERATION: 3})
+
+
+@override_settings(PROJECT_STATISTICS_ROLLUP=True)
+class StatisticsRollupTests(TestCase):
+    """Edits made outside the mutations, e.g. in the admin, move the rollup too"""
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme', contact_email='ops@acme.test')
+        self.other = Organization.objects.create(name='Other', slug='other', contact_email='ops@other.test')
+        for organization in (self.organization, self.other):
+            statistics.get_statistics(organization)  # Builds the rollup rows
+
+    def assertRollupCurrent(self):
+        for organization in (self.organization, self.other):
+            self.assertEqual(statistics.get_statistics(organization), statistics.compute_statistics(organization))
+
+    def test_orm_saves_and_deletes(self):
+        project = Project.objects.create(organization=self.organization, name='Launch')
+        second = Project.objects.create(organization=self.organization, name='Docs', status='ON_HOLD')
+        tasks = [Task.objects.create(project=project, title=f'Task {index}') for index in range(3)]
+        self.assertRollupCurrent()
+
+        tasks[0].status = 'DONE'
+        tasks[0].save()
+        tasks[1].project = second
+        tasks[1].save()
+        project = Project.objects.get(pk=project.pk)
+        project.status = 'COMPLETED'
+        project.save()
+        self.assertRollupCurrent()
+
+        Task.objects.get(pk=tasks[2].pk).delete()
+        self.assertRollupCurrent()
+        Project.objects.get(pk=project.pk).delete()
+        self.assertRollupCurrent()
+
+    def test_moves_between_organizations(self):
+        project = Project.objects.create(organization=self.organization, name='Launch')
+        target = Project.objects.create(organization=self.other, name='Intake')
+        task = Task.objects.create(project=project, title='Move me', status='DONE')
+        Task.objects.create(project=project, title='Stay')
+
+        task.project = target
+        task.save()
+        self.assertRollupCurrent()
+        project = Project.objects.get(pk=project.pk)
+        project.organization = self.other
+        project.save()
+        self.assertRollupCurrent()
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme', contact_email='ops@acme.test')
+        self.project = Project.objects.create(organization=self.organization, name='Launch', status='COMPLETED')
+        self.task = Task.objects.create(project=self.project, title='Ship', status='DONE')
+        self.comment = TaskComment.objects.create(task=self.task, content='Done', author_email='a@acme.test')
+        long_ago = timezone.now() - archive.archive_after() - timedelta(days=1)
+        Project.objects.filter(pk=self.project.pk).update(updated_at=long_ago)
+        Task.objects.filter(pk=self.task.pk).update(updated_at=long_ago)
+        TaskComment.objects.filter(pk=self.comment.pk).update(updated_at=long_ago)
+
+    def tombstones(self):
+        return set(Tombstone.objects.filter(organization=self.organization).values_list('kind', 'object_id'))
+
+    def test_archived_rows_leave_tombstones(self):
+        self.assertEqual(archive.archive_project(self.project), 1)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+        self.assertTrue(ArchivedTask.objects.filter(pk=self.task.pk).exists())
+        self.assertTrue(ArchivedTaskComment.objects.filter(pk=self.comment.pk).exists())
+        self.assertEqual(self.tombstones(), {('task', self.task.pk), ('comment', self.comment.pk)})
+
+    def test_restore_removes_tombstones(self):
+        archive.archive_project(self.project)
+        self.assertEqual(archive.restore_project(self.project), 1)
+        self.assertTrue(TaskComment.objects.filter(pk=self.comment.pk, task=self.task).exists())
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertFalse(ArchivedTaskComment.objects.exists())
+        self.assertEqual(self.tombstones(), set())
+
+
+class OrganizationMoveTests(TestCase):
+    TASK_QUERY = 'query($id: ID!, $slug: String!) { task(id: $id, organizationSlug: $slug) { id title } }'
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme', contact_email='ops@acme.test')
+        self.other = Organization.objects.create(name='Other', slug='other', contact_email='ops@other.test')
+        self.project = Project.objects.create(organization=self.organization, name='Launch')
+        self.task = Task.objects.create(project=self.project, title='Ship')
+        self.comment = TaskComment.objects.create(task=self.task, content='Soon', author_email='a@acme.test')
+
+    def test_project_move_carries_its_rows(self):
+        project = Project.objects.get(pk=self.project.pk)
+        project.organization = self.other
+        project.save()
+
+        for model in (Task, TaskComment):
+            self.assertEqual(set(model.objects.values_list('organization_id', flat=True)), {self.other.pk})
+        self.assertEqual(set(SearchEntry.objects.values_list('organization_id', flat=True)), {self.other.pk})
+        self.assertEqual(
+            list(Tombstone.objects.values_list('organization_id', 'kind', 'object_id')),
+            [(self.organization.pk, 'project', self.project.pk)]
+        )
+        moved = execute(self.client, self.TASK_QUERY, {'id': self.task.pk, 'slug': 'other'})
+        self.assertEqual(moved['data']['task']['title'], 'Ship')
+        stale = execute(self.client, self.TASK_QUERY, {'id': self.task.pk, 'slug': 'acme'})
+        self.assertIn('not found', stale['errors'][0]['message'])
+
+    def test_project_move_carries_archived_rows(self):
+        long_ago = timezone.now() - archive.archive_after() - timedelta(days=1)
+        Task.objects.update(status='DONE', updated_at=long_ago)
+        TaskComment.objects.update(updated_at=long_ago)
+        Project.objects.filter(pk=self.project.pk).update(
+            status='COMPLETED', todo_task_count=0, done_task_count=1, updated_at=long_ago
+        )
+        archive.archive_project(self.project)
+
+        project = Project.objects.get(pk=self.project.pk)
+        project.organization = self.other
+        project.save(update_fields=['organization'])
+        for model in (ArchivedTask, ArchivedTaskComment):
+            self.assertEqual(set(model.objects.values_list('organization_id', flat=True)), {self.other.pk})
+
+    def test_new_rows_copy_the_organization(self):
+        self.assertEqual((self.task.organization_id, self.comment.organization_id), (self.organization.pk,) * 2)
+        bulk.bulk_create_tasks(self.organization, [{'project_id': self.project.pk, 'title': 'Fuel'}])
+        self.assertEqual(list(Task.objects.values_list('organization_id', flat=True)), [self.organization.pk] * 2)
+
+    def test_task_move_carries_its_comments(self):
+        task = Task.objects.get(pk=self.task.pk)
+        task.project = Project.objects.create(organization=self.other, name='Docs')
+        task.save()
+        self.assertEqual(TaskComment.objects.get().organization_id, self.other.pk)
+
+    def test_columns_stay_out_of_the_schema(self):
+        for type_name in ['TaskType', 'TaskCommentType']:
+            with self.subTest(type=type_name):
+                self.assertNotIn('organization', schema.graphql_schema.get_type(type_name).fields)
+
+
+@override_settings(ROOT_URLCONF='project_manager.asgi_urls')
+class ConcurrentRootFieldTests(TransactionTestCase):
+    """Root fields run on their own threads, so the data is committed for them to see"""
+
+    def setUp(self):
+        organization = Organization.objects.create(name='Acme', slug='acme', contact_email='ops@acme.test')
+        Project.objects.create(organization=organization, name='Launch')
+
+    async def execute(self, query, variables=None):
+        response = await AsyncClient().post(
+            '/graphql/', {'query': query, 'variables': variables or {}}, content_type='application/json'
+        )
+        return response.json()
+
+    async def test_root_fields_are_merged(self):
+        result = await self.execute(
+            '{ projects(organizationSlug: "acme") { name } organization(slug: "acme") { slug } }'
+        )
+        self.assertEqual(result['data'], {'projects': [{'name': 'Launch'}], 'organization': {'slug': 'acme'}})
+
+    async def test_skipped_root_field_is_left_out(self):
+        result = await self.execute(
+            'query($skip: Boolean!) { projects(organizationSlug: "acme") { name } '
+            'organization(slug: "acme") @skip(if: $skip) { slug } }',
+            {'skip': True},
+        )
+        self.assertEqual(result['data'], {'projects': [{'name': 'Launch'}]})
+
+    async def test_shared_response_keys_are_merged(self):
+        result = await self.execute(
+            '{ projects(organizationSlug: "acme") { id } projects(organizationSlug: "acme") { name } }'
+        )
+        self.assertEqual(list(result['data']['projects'][0]), ['id', 'name'])
+
+    async def test_failing_root_field_keeps_the_others(self):
+        result = await self.execute(
+            '{ projects(organizationSlug: "acme") { name } organization(slug: "missing") { slug } }'
+        )
+        self.assertEqual(result['data'], {'projects': [{'name': 'Launch'}], 'organization': None})
+        self.assertEqual(result['errors'][0]['path'], ['organization'])
+
+    async def test_mutation_fields_run_in_order(self):
+        result = await self.execute(
+            'mutation { first: createProject(organizationSlug: "acme", name: "One") { project { id } } '
+            'second: createProject(organizationSlug: "acme", name: "Two") { project { id } } }'
+        )
+        first, second = (int(result['data'][key]['project']['id']) for key in ('first', 'second'))
+        self.assertLess(first, second)
+
+
+class PersistedQueryTests(TestCase):
+    def setUp(self):
+        caches[settings.GRAPHQL_PERSISTED_QUERY_CACHE].clear()
+
+    def persisted(self, query, sha256_hash=None):
+        extensions = {'persistedQuery': {'version': 1, 'sha256Hash': sha256_hash or documents.query_hash(query)}}
+        response = self.client.post(
+            '/graphql/', {'query': query, 'extensions': extensions}, content_type='application/json'
+        )
+        return response.json()
+
+    def test_invalid_documents_are_not_registered(self):
+        for query in ['{ nope }', '{ organizations {']:
+            with self.subTest(query=query):
+                self.assertIn('errors', self.persisted(query))
+                result = self.persisted('', documents.query_hash(query))
+                self.assertEqual(result['errors'][0]['message'], documents.PERSISTED_QUERY_NOT_FOUND)
+
+    def test_registered_hash_is_served_without_text(self):
+        create_organization()
+        query = '{ organizations { slug } }'
+        miss = self.persisted('', documents.query_hash(query))
+        self.assertEqual(miss['errors'][0]['extensions']['code'], 'PERSISTED_QUERY_NOT_FOUND')
+        self.assertEqual(self.persisted(query)['data'], {'organizations': [{'slug': 'acme'}]})
+        self.assertEqual(self.persisted('', documents.query_hash(query))['data'], {'organizations': [{'slug': 'acme'}]})
+
+    def test_hash_must_match_text(self):
+        result = self.persisted('{ organizations { slug } }', documents.query_hash('{ organizations { id } }'))
+        self.assertEqual(result['errors'][0]['message'], 'Provided sha256Hash does not match query.')
+
+
+class DocumentCacheTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(documents, '_documents', LRUCache(maxsize=2))
+        self.cache = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def validate(self, query):
+        return documents.get_validated_document(schema.graphql_schema, query)
+
+    def test_validated_documents_are_reused(self):
+        document, errors = self.validate('{ organizations { id } }')
+        self.assertEqual(errors, [])
+        self.assertIs(self.validate('{ organizations { id } }')[0], document)
+
+    def test_least_recently_used_document_is_evicted(self):
+        first = self.validate('{ organizations { id } }')[0]
+        self.validate('{ organizations { slug } }')
+        self.validate('{ organizations { name } }')
+        self.assertEqual(self.cache.stats()['size'], 2)
+        self.assertIsNot(self.validate('{ organizations { id } }')[0], first)
+
+    def test_invalid_documents_are_not_cached(self):
+        for query in ['{ nope }', '{ organizations {']:
+            with self.subTest(query=query):
+                document, errors = self.validate(query)
+                self.assertIsNone(document)
+                self.assertTrue(errors)
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+
+class SearchTests(TestCase):
+    QUERY = """
+        query($q: String!, $kind: SearchKindEnum) {
+            search(organizationSlug: "acme", query: $q, kind: $kind) {
+                edges { node { kind snippet task { title } } }
+            }
+        }
+    """
+
+    def setUp(self):
+        self.organization = create_organization()
+        self.project = Project.objects.create(organization=self.organization, name='Launch rocket')
+        self.task = Task.objects.create(project=self.project, title='Fuel the rocket')
+
+    def test_saved_rows_are_found(self):
+        hits = search.search('rocket', 10, organization=self.organization)
+        self.assertEqual(
+            {(hit.kind, hit.object_id) for hit in hits}, {('project', self.project.pk), ('task', self.task.pk)}
+        )
+
+    def test_results_are_scoped_to_the_organization(self):
+        other = Project.objects.create(organization=create_organization('beta'), name='Rocket science')
+        scoped = search.search('rocket', 10, organization=self.organization, kind='project')
+        self.assertEqual([hit.object_id for hit in scoped], [self.project.pk])
+        self.assertEqual(len(search.search('rocket', 10, kind='project')), 2)
+
+    def test_title_matches_rank_first(self):
+        body = Task.objects.create(project=self.project, title='Fuel the tank', description='rocket')
+        self.assertEqual([hit.object_id for hit in search.search('rocket', 10, kind='task')], [self.task.pk, body.pk])
+
+    def test_input_is_not_parsed_as_query_syntax(self):
+        TaskComment.objects.create(task=self.task, content='<b>rocket</b> "NEAR" OR', author_email='a@acme.test')
+        hits = search.search('rocket" OR NEAR(', 10, kind='comment')
+        self.assertEqual(len(hits), 1)
+        self.assertIn('&lt;b&gt;<mark>rocket</mark>&lt;/b&gt;', hits[0].snippet)
+
+    def test_deleted_rows_leave_the_index(self):
+        TaskComment.objects.create(task=self.task, content='rocket fuel', author_email='a@acme.test')
+        self.task.delete()
+        self.assertEqual([hit.kind for hit in search.search('rocket', 10)], ['project'])
+        self.project.delete()
+        self.assertFalse(SearchEntry.objects.exists())
+
+    def test_rebuild_matches_the_signals(self):
+        TaskComment.objects.create(task=self.task, content='rocket fuel', author_email='a@acme.test')
+        before = sorted(SearchEntry.objects.values_list('kind', 'object_id', 'title', 'body'))
+        search.rebuild_index(self.organization)
+        self.assertEqual(sorted(SearchEntry.objects.values_list('kind', 'object_id', 'title', 'body')), before)
+        self.assertEqual(len(search.search('rocket', 10)), 3)
+
+    def test_query_filters_by_kind_and_attaches_rows(self):
+        result = execute(self.client, self.QUERY, {'q': 'rocket', 'kind': 'TASK'})
+        self.assertEqual(result['data']['search']['edges'], [
+            {'node': {'kind': 'TASK', 'snippet': 'Fuel the <mark>rocket</mark>', 'task': {'title': 'Fuel the rocket'}}},
+        ])
+
+
+class AdminSearchTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name='Acme', slug='acme', contact_email='ops@acme.test')
+        for name in ['Launch rocket', 'Launch site', 'Launch party', 'Docs']:
+            Project.objects.create(organization=organization, name=name)
+        self.model_admin = admin.ProjectAdmin(Project, site)
+
+    def search(self, term):
+        request = RequestFactory().get('/admin/core/project/', {'q': term})
+        queryset, _ = self.model_admin.get_search_results(request, Project.objects.all(), term)
+        return sorted(queryset.values_list('name', flat=True))
+
+    def test_uses_the_index(self):
+        self.assertEqual(self.search('rocket'), ['Launch rocket'])
+
+    def test_falls_back_when_the_index_hits_the_limit(self):
+        with mock.patch.object(admin, 'ADMIN_SEARCH_LIMIT', 2):
+            self.assertEqual(self.search('launch'), ['Launch party', 'Launch rocket', 'Launch site'])
+
+
+class JobTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme', contact_email='ops@acme.test')
+
+    def run_next(self):
+        return jobs.run(jobs.claim('test'))
+
+    def test_delete_project(self):
+        project = Project.objects.create(organization=self.organization, name='Launch')
+        kept = Project.objects.create(organization=self.organization, name='Docs')
+        for index in range(3):
+            task = Task.objects.create(project=project, title=f'Task {index}')
+            TaskComment.objects.create(task=task, content='Soon', author_email='a@acme.test')
+        Task.objects.create(project=kept, title='Keep me')
+
+        jobs.enqueue('delete_project', self.organization, {'project_id': project.pk})
+        job = self.run_next()
+        self.assertEqual(job.status, 'SUCCEEDED')
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Keep me'])
+        self.assertFalse(TaskComment.objects.exists())
+        self.assertEqual(set(SearchEntry.objects.values_list('kind', flat=True)), {'project', 'task'})
+        self.assertEqual(list(Tombstone.objects.values_list('kind', 'object_id')), [('project', project.pk)])
+
+    def register(self, function):
+        jobs.handler('test')(function)
+        self.addCleanup(jobs.HANDLERS.pop, 'test')
+
+    def test_claims_due_jobs_by_priority(self):
+        self.register(lambda job: job.payload['n'])
+        jobs.enqueue('test', self.organization, {'n': 1})
+        jobs.enqueue('test', self.organization, {'n': 2}, priority=5)
+        jobs.enqueue('test', self.organization, {'n': 3}, delay=60)
+        self.assertEqual([self.run_next().result for _ in range(2)], [2, 1])
+        self.assertIsNone(jobs.claim('test'))
+        with self.assertRaisesMessage(Exception, "Unknown job kind 'nope'"):
+            jobs.enqueue('nope')
+
+    @override_settings(JOB_MAX_ATTEMPTS=3, JOB_RETRY_DELAY=30)
+    def test_failures_back_off_until_out_of_attempts(self):
+        def fail(job):
+            raise ValueError('Disk full')
+        self.register(fail)
+        job = jobs.enqueue('test', self.organization)
+
+        for delay in [30, 60]:
+            before = timezone.now()
+            job = self.run_next()
+            self.assertEqual(job.status, 'QUEUED')
+            self.assertGreaterEqual(job.run_at, before + timedelta(seconds=delay))
+            self.assertLess(job.run_at, timezone.now() + timedelta(seconds=delay))
+            self.assertIsNone(jobs.claim('test'))
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+
+        job = self.run_next()
+        self.assertEqual((job.status, job.attempts), ('FAILED', 3))
+        self.assertIn('ValueError: Disk full', Job.objects.get(pk=job.pk).last_error)
+
+    def test_stale_claims_are_recovered(self):
+        self.register(lambda job: 'late')
+        jobs.enqueue('test', self.organization)
+        stale = jobs.claim('dead-worker')
+        Job.objects.filter(pk=stale.pk).update(locked_at=timezone.now() - jobs.lock_timeout() - timedelta(seconds=1))
+        self.assertEqual(jobs.recover_stale_jobs(), 1)
+        self.assertIn("Worker 'dead-worker' stopped responding", Job.objects.get(pk=stale.pk).last_error)
+
+        # The worker that lost its claim cannot overwrite the retry
+        jobs.run(stale)
+        self.assertEqual(Job.objects.get(pk=stale.pk).status, 'QUEUED')
+        Job.objects.filter(pk=stale.pk).update(run_at=timezone.now())
+        job = self.run_next()
+        self.assertEqual((job.status, job.attempts, job.result), ('SUCCEEDED', 2, 'late'))
+
+
+class OrganizationBackfillTests(TransactionTestCase):
+    """Migrations 0009 and 0010 copy the project's organization onto tasks and comments"""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('core', target)])
+        return executor.loader.project_state([('core', target)]).apps
+
+    def setUp(self):
+        self.latest = MigrationExecutor(connection).loader.graph.leaf_nodes('core')[0][1]
+        self.addCleanup(self.migrate, self.latest)
+
+    def create_rows(self, apps, **organization):
+        Organization = apps.get_model('core', 'Organization')
+        Project = apps.get_model('core', 'Project')
+        acme = Organization.objects.create(name='Acme', slug='acme', contact_email='ops@acme.test')
+        project = Project.objects.create(organization=acme, name='Launch')
+        task = apps.get_model('core', 'Task').objects.create(project=project, title='Ship', **organization)
+        apps.get_model('core', 'TaskComment').objects.create(
+            task=task, content='Soon', author_email='a@acme.test', **organization
+        )
+        now = timezone.now()
+        archived = apps.get_model('core', 'ArchivedTask').objects.create(
+            id=task.pk + 1, project=project, title='Shipped', status='DONE',
+            created_at=now, updated_at=now, **organization
+        )
+        apps.get_model('core', 'ArchivedTaskComment').objects.create(
+            id=1, task=archived, content='Done', author_email='a@acme.test',
+            created_at=now, updated_at=now, **organization
+        )
+        return acme.pk
+
+    def assertBackfilled(self, organization_id):
+        apps = self.migrate(self.latest)
+        for name in ['Task', 'TaskComment', 'ArchivedTask', 'ArchivedTaskComment']:
+            with self.subTest(model=name):
+                values = apps.get_model('core', name).objects.values_list('organization_id', flat=True)
+                self.assertEqual(list(values), [organization_id])
+
+    def test_existing_rows_are_backfilled(self):
+        self.assertBackfilled(self.create_rows(self.migrate('0008_archive')))
+
+    def test_rows_written_during_the_backfill_are_filled(self):
+        self.assertBackfilled(self.create_rows(self.migrate('0009_task_organization'), organization=None))
+
+
+class KeysetPaginationTests(TestCase):
+    QUERY = """
+        query($first: Int, $after: String, $last: Int, $before: String) {
+            projectsConnection(organizationSlug: "acme", first: $first, after: $after, last: $last, before: $before) {
+                edges { node { name } }
+                pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+            }
+        }
+    """
+
+    def setUp(self):
+        self.organization = create_organization()
+        created_at = timezone.now() - timedelta(days=1)
+        # Ties on created_at are broken by id
+        for index in range(5):
+            project = Project.objects.create(organization=self.organization, name=f'Project {index}')
+            Project.objects.filter(pk=project.pk).update(created_at=created_at + timedelta(hours=index // 2))
+
+    def page(self, **arguments):
+        connection = execute(self.client, self.QUERY, arguments)['data']['projectsConnection']
+        return [edge['node']['name'] for edge in connection['edges']], connection['pageInfo']
+
+    def test_pages_forwards_newest_first(self):
+        names, page_info = self.page(first=2)
+        self.assertEqual(names, ['Project 4', 'Project 3'])
+        self.assertEqual((page_info['hasNextPage'], page_info['hasPreviousPage']), (True, False))
+        names, page_info = self.page(first=2, after=page_info['endCursor'])
+        self.assertEqual(names, ['Project 2', 'Project 1'])
+        names, page_info = self.page(first=2, after=page_info['endCursor'])
+        self.assertEqual(names, ['Project 0'])
+        self.assertEqual((page_info['hasNextPage'], page_info['hasPreviousPage']), (False, True))
+
+    def test_pages_backwards(self):
+        names, page_info = self.page(last=2)
+        self.assertEqual(names, ['Project 1', 'Project 0'])
+        self.assertTrue(page_info['hasPreviousPage'])
+        names, _ = self.page(last=2, before=page_info['startCursor'])
+        self.assertEqual(names, ['Project 3', 'Project 2'])
+
+    def test_pages_are_stable_across_inserts(self):
+        names, page_info = self.page(first=2)
+        Project.objects.create(organization=self.organization, name='Newer')
+        rest, _ = self.page(first=10, after=page_info['endCursor'])
+        self.assertEqual(names + rest, [f'Project {index}' for index in range(4, -1, -1)])
+
+    def test_rejects_bad_arguments(self):
+        for arguments, message in [
+            ({'first': -1}, "'first' must be a non-negative integer"),
+            ({'first': 101}, "'first' cannot exceed 100"),
+            ({'after': 'garbage'}, "Invalid cursor 'garbage'"),
+        ]:
+            with self.subTest(arguments=arguments):
+                result = execute(self.client, self.QUERY, arguments)
+                self.assertEqual(result['errors'][0]['message'], message)
+
+
+@override_settings(GRAPHQL_MAX_QUERY_COST=1000000)  # Nested lists are priced at their worst case
+class QueryOptimizerTests(TestCase):
+    QUERY = """{
+        projects(organizationSlug: "acme") {
+            name organization { slug }
+            tasks { title comments { content } }
+        }
+    }"""
+
+    def setUp(self):
+        self.organization = create_organization()
+        execute(self.client, '{ organization(slug: "acme") { id } }')  # Caches the slug lookup
+
+    def add_projects(self, count):
+        for index in range(count):
+            project = Project.objects.create(organization=self.organization, name=f'Project {index}')
+            for title in ['Plan', 'Build']:
+                task = Task.objects.create(project=project, title=title)
+                TaskComment.objects.create(task=task, content='Soon', author_email='a@acme.test')
+
+    def test_query_count_does_not_grow_with_rows(self):
+        # Projects joined with their organization, then one prefetch each for tasks and comments
+        self.add_projects(1)
+        with self.assertNumQueries(3):
+            small = execute(self.client, self.QUERY)
+        self.add_projects(5)
+        with self.assertNumQueries(3):
+            large = execute(self.client, self.QUERY)
+        self.assertEqual(len(small['data']['projects']), 1)
+        self.assertEqual(len(large['data']['projects']), 6)
+        self.assertEqual(large['data']['projects'][0]['tasks'][0]['comments'], [{'content': 'Soon'}])
+
+    def test_only_selected_columns_are_loaded(self):
+        self.add_projects(1)
+        with CaptureQueriesContext(connection) as queries:
+            execute(self.client, '{ projects(organizationSlug: "acme") { name } }')
+        sql = queries[0]['sql']
+        self.assertIn('"core_project"."name"', sql)
+        self.assertNotIn('"core_project"."description"', sql)
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual([cache.get(key) for key in 'abc'], [1, MISSING, 3])
+        self.assertEqual(cache.stats(), {'hits': 3, 'misses': 1, 'size': 2, 'maxsize': 2})
+
+    def test_expires_entries(self):
+        cache = LRUCache(ttl=10)
+        with mock.patch('core.lru.time.monotonic', return_value=100):
+            cache.set('a', 1)
+        with mock.patch('core.lru.time.monotonic', return_value=109):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('core.lru.time.monotonic', return_value=110):
+            self.assertIs(cache.get('a'), MISSING)
+
+
+class OrganizationLookupTests(TestCase):
+    QUERY = '{ a: organization(slug: "acme") { name } b: projects(organizationSlug: "acme") { id } }'
+
+    def setUp(self):
+        organizations._cache.clear()
+        self.organization = create_organization()
+
+    def organization_queries(self, query):
+        with CaptureQueriesContext(connection) as queries:
+            result = execute(self.client, query)
+        return result, sum('FROM "core_organization"' in query['sql'] for query in queries)
+
+    def test_slug_is_looked_up_once_per_process(self):
+        self.assertEqual(self.organization_queries(self.QUERY)[1], 1)
+        self.assertEqual(self.organization_queries(self.QUERY)[1], 0)
+
+    def test_saving_the_organization_invalidates_its_slug(self):
+        self.organization_queries(self.QUERY)
+        self.organization.slug = 'acme-corp'
+        self.organization.save()
+        result, queries = self.organization_queries('{ organization(slug: "acme") { name } }')
+        self.assertEqual(queries, 1)
+        self.assertIn("'acme' not found", result['errors'][0]['message'])
+        self.assertEqual(self.organization_queries('{ organization(slug: "acme-corp") { name } }')[1], 1)
+
+
+class BulkMutationTests(TestCase):
+    CREATE = """
+        mutation($tasks: [TaskInput!]!) {
+            bulkCreateTasks(organizationSlug: "acme", tasks: $tasks) { results { index ok errors task { title } } }
+        }
+    """
+    MOVE = """
+        mutation($ids: [ID!]!) {
+            bulkMoveTasks(organizationSlug: "acme", ids: $ids, status: "DONE") { results { ok errors } }
+        }
+    """
+
+    def setUp(self):
+        self.organization = create_organization()
+        self.project = Project.objects.create(organization=self.organization, name='Launch')
+        other = Project.objects.create(organization=create_organization('other'), name='Elsewhere')
+        self.other_task = Task.objects.create(project=other, title='Not yours')
+
+    def test_invalid_items_are_reported_and_valid_ones_written(self):
+        tasks = [
+            {'projectId': self.project.pk, 'title': 'Plan'},
+            {'projectId': self.project.pk, 'title': ' '},
+            {'projectId': self.other_task.project_id, 'title': 'Sneak in'},
+            {'projectId': self.project.pk, 'title': 'Build', 'status': 'DONE', 'assigneeEmail': 'nope'},
+            {'projectId': self.project.pk, 'title': 'Ship', 'status': 'DONE'},
+        ]
+        results = execute(self.client, self.CREATE, {'tasks': tasks})['data']['bulkCreateTasks']['results']
+        self.assertEqual([result['ok'] for result in results], [True, False, False, False, True])
+        self.assertEqual([result['index'] for result in results], list(range(5)))
+        self.assertEqual(results[1]['errors'], ['Title cannot be blank'])
+        self.assertIn('not found', results[2]['errors'][0])
+        self.assertEqual(results[3]['errors'], ["Invalid assignee email 'nope'"])
+
+        self.assertEqual(sorted(self.project.tasks.values_list('title', flat=True)), ['Plan', 'Ship'])
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual((project.task_count, project.todo_task_count, project.done_task_count), (2, 1, 1))
+
+    def test_move_reports_unknown_ids(self):
+        task = Task.objects.create(project=self.project, title='Plan')
+        ids = [task.pk, self.other_task.pk, 'x']
+        results = execute(self.client, self.MOVE, {'ids': ids})['data']['bulkMoveTasks']['results']
+        self.assertEqual([result['ok'] for result in results], [True, False, False])
+        self.assertEqual(Task.objects.get(pk=task.pk).status, 'DONE')
+        self.assertEqual(Task.objects.get(pk=self.other_task.pk).status, 'TODO')
+        self.assertEqual(Project.objects.get(pk=self.project.pk).done_task_count, 1)
+
+    def test_failed_write_rolls_back_the_batch(self):
+        items = [{'project_id': self.project.pk, 'title': title} for title in ['Plan', 'Build']]
+        with mock.patch.object(bulk.history, 'record_status_changes', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                bulk.bulk_create_tasks(self.organization, items)
+        self.assertFalse(self.project.tasks.exists())
+        self.assertEqual(Project.objects.get(pk=self.project.pk).task_count, 0)
+
+    def test_batch_size_is_capped(self):
+        items = [{'project_id': self.project.pk, 'title': 'Plan'}] * (bulk.MAX_BATCH_SIZE + 1)
+        with self.assertRaisesMessage(Exception, f'more than {bulk.MAX_BATCH_SIZE} tasks'):
+            bulk.bulk_create_tasks(self.organization, items)
+
+
+class SyntheticDataTests(TestCase):
+    def load(self, prefix, seed=7):
+        call_command(
+            'load_sample_data', scale=True, organizations=2, projects_per_org=3, tasks_per_project=10,
+            comments_per_task=1, seed=seed, prefix=prefix, stdout=io.StringIO()
+        )
+        tasks = Task.objects.filter(organization__slug__startswith=f'{prefix}-').order_by('pk')
+        return list(tasks.values_list('project__name', 'project__status', 'title', 'status', 'assignee_email'))
+
+    def test_same_seed_same_dataset(self):
+        first = self.load('a')
+        self.assertEqual(len(first), 60)
+        second = self.load('b')
+        self.assertEqual([row[:4] for row in first], [row[:4] for row in second])
+        self.assertNotEqual([row[:4] for row in first], [row[:4] for row in self.load('c', seed=8)])
+
+    def test_totals_are_consistent(self):
+        self.load('a')
+        self.assertEqual(TaskComment.objects.filter(organization__slug__startswith='a-').count(),
+                         TaskComment.objects.filter(task__project__organization__slug__startswith='a-').count())
+        for project in Project.objects.all():
+            self.assertEqual(project.task_count, project.tasks.count())
+            self.assertEqual(project.done_task_count, project.tasks.filter(status='DONE').count())
+        self.assertEqual(SearchEntry.objects.filter(kind='task').count(), 60)
+
+    def test_existing_prefix_is_refused(self):
+        self.load('a')
+        with self.assertRaisesMessage(CommandError, "Organizations with prefix 'a' already exist"):
+            self.load('a')
+
+
+class BenchmarkTests(TestCase):
+    def result(self, p95_ms, queries):
+        return {'p50_ms': p95_ms, 'p95_ms': p95_ms, 'p99_ms': p95_ms, 'queries': queries, 'peak_alloc_kb': 1.0}
+
+    def test_compare_flags_query_growth_and_slow_p95(self):
+        baseline = {'small': {'GET_TASKS': self.result(10.0, 3), 'GET_TASK': self.result(10.0, 2)}}
+        results = {'small': {
+            'GET_TASKS': self.result(12.0, 4),
+            'GET_TASK': self.result(12.6, 2),
+            'GET_PROJECT': self.result(99.0, 9),
+        }}
+        self.assertEqual(benchmarks.compare(results, baseline), [
+            '[small] GET_TASKS: SQL queries 3 -> 4',
+            '[small] GET_TASK: p95 10.0ms -> 12.6ms (limit 12.500ms)',
+        ])
+        self.assertEqual(benchmarks.compare(results, baseline, latency_threshold=0.5)[1:], [])
+
+    def test_percentile(self):
+        samples = list(range(1, 21))
+        self.assertEqual(benchmarks._percentile(samples, 50), 10)
+        self.assertEqual(benchmarks._percentile(samples, 95), 19)
+        self.assertEqual(benchmarks._percentile(samples, 99), 20)
+
+    def test_frontend_documents_have_variables(self):
+        documents = benchmarks.load_documents()
+        self.assertIn('GET_TASKS', documents)
+        fixture = benchmarks.build_fixture('small')
+        self.assertEqual([name for name in documents if benchmarks._variables(name, fixture, 0) is None], [])
+        result = benchmarks.benchmark_operation(
+            schema, 'GET_TASKS', documents['GET_TASKS'], fixture, iterations=2, warmup=1
+        )
+        self.assertGreater(result.queries, 0)
+        self.assertLessEqual(result.p50_ms, result.p99_ms)
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE=True)
+class ResponseCacheTests(TestCase):
+    QUERY = 'query($slug: String!) { projects(organizationSlug: $slug) { name description } }'
+    UPDATE = """
+        mutation($id: ID!, $slug: String!, $description: String) {
+            updateProject(id: $id, organizationSlug: $slug, description: $description) { project { id } }
+        }
+    """
+
+    def setUp(self):
+        caches[settings.GRAPHQL_RESPONSE_CACHE_ALIAS].clear()
+        self.project = Project.objects.create(organization=create_organization(), name='Roadmap')
+        Project.objects.create(organization=create_organization('beta'), name='Launch')
+
+    def get(self, slug='acme', **headers):
+        return self.client.post(
+            '/graphql/', {'query': self.QUERY, 'variables': {'slug': slug}}, content_type='application/json', **headers
+        )
+
+    def update(self, description):
+        with self.captureOnCommitCallbacks(execute=True):
+            execute(self.client, self.UPDATE, {'id': str(self.project.pk), 'slug': 'acme', 'description': description})
+
+    def test_unchanged_response_is_not_modified(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+            cached = self.get()
+        self.assertEqual(cached.json(), first.json())
+        self.assertEqual(cached['ETag'], first['ETag'])
+
+    def test_mutation_replaces_the_organization_version(self):
+        acme, beta = self.get(), self.get('beta')
+        self.update('Q3 goals')
+        response = self.get(HTTP_IF_NONE_MATCH=acme['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], acme['ETag'])
+        self.assertEqual(response.json()['data']['projects'][0]['description'], 'Q3 goals')
+        # Other organizations keep their cached responses
+        self.assertEqual(self.get('beta', HTTP_IF_NONE_MATCH=beta['ETag']).status_code, 304)
+
+    def test_error_responses_are_not_cached(self):
+        response = self.get('missing')
+        self.assertIn('errors', response.json())
+        self.assertFalse(response.has_header('ETag'))
+
+
+class ChangeFeedTests(TestCase):
+    UPDATE = """
+        mutation($id: ID!, $slug: String!, $status: String) {
+            updateTask(id: $id, organizationSlug: $slug, status: $status) { task { id } }
+        }
+    """
+
+    def setUp(self):
+        project = Project.objects.create(organization=create_organization(), name='Launch')
+        self.task = Task.objects.create(project=project, title='Ship it')
+
+    def subscribe(self, slug='acme', last_event_id=None):
+        subscription, replay = changefeed.broker.subscribe(slug, last_event_id)
+        self.addCleanup(subscription.close)
+        return subscription, replay
+
+    def update(self, status, slug='acme'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return execute(self.client, self.UPDATE, {'id': str(self.task.pk), 'slug': slug, 'status': status})
+
+    def test_mutation_publishes_the_row(self):
+        subscription, _ = self.subscribe()
+        other, _ = self.subscribe('beta')
+        self.update('IN_PROGRESS')
+        event = subscription.get(timeout=0)
+        self.assertEqual(event['type'], 'task.updated')
+        self.assertEqual(event['data']['id'], str(self.task.pk))
+        self.assertEqual(event['data']['status'], 'IN_PROGRESS')
+        self.assertIsNone(subscription.get(timeout=0))
+        self.assertIsNone(other.get(timeout=0))
+
+    def test_failed_mutation_publishes_nothing(self):
+        subscription, _ = self.subscribe()
+        self.assertIn('errors', self.update('IN_PROGRESS', slug='missing'))
+        self.assertIsNone(subscription.get(timeout=0))
+
+    def test_reconnect_replays_missed_events(self):
+        subscription, _ = self.subscribe()
+        self.update('IN_PROGRESS')
+        seen = subscription.get(timeout=0)
+        self.update('DONE')
+        _, replay = self.subscribe(last_event_id=seen['id'])
+        self.assertEqual([event['data']['status'] for event in replay], ['DONE'])
+        _, replay = self.subscribe(last_event_id='expired')
+        self.assertIsNone(replay)
+        self.assertEqual(list(changefeed._opening(replay)), [f'retry: {changefeed.RETRY_MS}\n\n', changefeed.RESET])
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        organization = create_organization()
+        self.project = Project.objects.create(organization=organization, name='Launch')
+        self.other = Project.objects.create(organization=organization, name='Docs')
+
+    def counters(self, project):
+        return list(Project.objects.values_list(*Project.COUNTER_FIELDS).get(pk=project.pk))
+
+    def test_task_writes_move_the_counters(self):
+        task = Task.objects.create(project=self.project, title='Fuel', status='TODO')
+        Task.objects.create(project=self.project, title='Count down', status='DONE')
+        self.assertEqual(self.counters(self.project), [2, 1, 0, 1])
+        task.status = 'IN_PROGRESS'
+        task.save()
+        self.assertEqual(self.counters(self.project), [2, 0, 1, 1])
+        task.project = self.other
+        task.status = 'DONE'
+        task.save()
+        self.assertEqual(self.counters(self.project), [1, 0, 0, 1])
+        self.assertEqual(self.counters(self.other), [1, 0, 0, 1])
+        task.delete()
+        self.assertEqual(self.counters(self.other), [0, 0, 0, 0])
+
+    def test_stale_project_save_keeps_the_counters(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        Task.objects.create(project=self.project, title='Fuel')
+        stale.description = 'Edited'
+        stale.save()
+        self.assertEqual(self.counters(self.project), [1, 1, 0, 0])
+
+    def test_shared_deltas_use_one_update(self):
+        changes = [(self.project.pk, None, 'TODO'), (self.other.pk, None, 'TODO'), (self.project.pk, 'DONE', 'DONE')]
+        with self.assertNumQueries(1):
+            counters.record_task_changes(changes, projects=[self.project])
+        self.assertEqual(self.project.todo_task_count, 1)
+        self.assertEqual(self.counters(self.other), [1, 1, 0, 0])
+
+    def test_verify_reports_and_repairs_drift(self):
+        Task.objects.create(project=self.project, title='Fuel')
+        Task.objects.filter(project=self.project).update(status='DONE')
+        with self.assertRaisesMessage(CommandError, '1 of 2 project(s) have drifted counters'):
+            call_command('verify_counters', stdout=io.StringIO())
+        output = io.StringIO()
+        call_command('verify_counters', repair=True, stdout=output)
+        self.assertIn('todo_task_count 1 != 0', output.getvalue())
+        self.assertEqual(self.counters(self.project), [1, 0, 0, 1])
+        call_command('verify_counters', stdout=output)
+        self.assertIn('Counters of 2 project(s) are exact.', output.getvalue())
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRoutingTests(TestCase):
+    """The replica connections are stubbed; only routing decisions are checked"""
+
+    def setUp(self):
+        self.connections = {alias: mock.Mock() for alias in ['replica_1', 'replica_2']}
+        for patcher in [
+            mock.patch.object(routing, 'connections', self.connections),
+            mock.patch.object(routing, 'pool', routing.ReplicaPool()),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.organization = create_organization()
+
+    def test_reads_inside_replica_reads_use_one_replica(self):
+        with routing.replica_reads() as alias:
+            self.assertIn(alias, ['replica_1', 'replica_2'])
+            self.assertEqual(Task.objects.all().db, alias)
+            self.assertEqual(Project.objects.all().db, alias)
+        self.assertEqual(Task.objects.all().db, DEFAULT_DB_ALIAS)
+
+    def test_writes_use_the_primary(self):
+        with routing.replica_reads():
+            self.assertEqual(routing.ReplicaRouter().db_for_write(Task), DEFAULT_DB_ALIAS)
+            self.assertEqual(Project.objects.select_for_update().db, DEFAULT_DB_ALIAS)
+
+    def test_failed_replica_is_skipped_until_retry(self):
+        self.connections['replica_1'].ensure_connection.side_effect = DatabaseError
+        for _ in range(5):
+            self.assertEqual(routing.read_alias(), 'replica_2')
+        self.assertEqual(routing.pool.available(), ['replica_2'])
+        self.connections['replica_2'].ensure_connection.side_effect = DatabaseError
+        self.assertEqual(routing.read_alias(), DEFAULT_DB_ALIAS)
+        stats = routing.pool.stats()
+        self.assertEqual(stats['replica_1'], {'reads': 0, 'failures': 1, 'available': False})
+        self.assertEqual(stats['replica_2']['reads'], 5)
+        self.assertEqual(stats[DEFAULT_DB_ALIAS]['reads'], 1)
+
+    def test_mutation_makes_reads_sticky(self):
+        mutation = 'mutation { createProject(organizationSlug: "acme", name: "Launch") { project { id } } }'
+        response = self.client.post('/graphql/', {'query': mutation}, content_type='application/json')
+        cookie = response.cookies[routing.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.DATABASE_STICKY_SECONDS)
+        self.assertTrue(cookie['httponly'])
+
+        query = '{ projects(organizationSlug: "acme") { name } }'
+        with mock.patch.object(routing, 'replica_reads', return_value=mock.MagicMock()) as replica_reads:
+            self.assertEqual(execute(self.client, query)['data'], {'projects': [{'name': 'Launch'}]})
+            replica_reads.assert_not_called()
+            self.client.cookies.pop(routing.STICKY_COOKIE)
+            execute(self.client, query)
+            replica_reads.assert_called_once()
+        self.assertNotIn(routing.STICKY_COOKIE, self.client.post(
+            '/graphql/', {'query': query}, content_type='application/json'
+        ).cookies)
+
+
+@override_settings(CHANGES_SINCE_OVERLAP=0)
+class ChangesSinceTests(TestCase):
+    def setUp(self):
+        self.organization = create_organization()
+        self.project = Project.objects.create(organization=self.organization, name='Launch')
+        self.tasks = [Task.objects.create(project=self.project, title=f'Task {n}') for n in range(3)]
+        self.comment = TaskComment.objects.create(task=self.tasks[0], content='Go', author_email='a@acme.test')
+        Project.objects.create(organization=create_organization('beta'), name='Other')
+
+    def changes(self, cursor=None, limit=None):
+        return sync.changes_since(self.organization, cursor, limit)
+
+    def test_cursor_returns_only_later_changes(self):
+        first = self.changes()
+        self.assertEqual([project.name for project in first.projects], ['Launch'])
+        self.assertEqual(len(first.tasks), 3)
+        self.assertEqual(self.changes(first.cursor).tasks, [])
+
+        self.tasks[1].title = 'Renamed'
+        self.tasks[1].save()
+        later = self.changes(first.cursor)
+        self.assertEqual([task.title for task in later.tasks], ['Renamed'])
+        self.assertEqual(later.comments, [])
+
+    def test_deletions_leave_tombstones(self):
+        cursor = self.changes().cursor
+        task_id = self.tasks[0].pk
+        self.tasks[0].delete()
+        changes = self.changes(cursor)
+        # The comment went with its task, so only the task is reported
+        self.assertEqual([(tombstone.kind, tombstone.object_id) for tombstone in changes.deleted], [('task', task_id)])
+        self.assertEqual(Tombstone.objects.filter(kind='comment').count(), 0)
+
+    def test_pages_follow_the_cursor(self):
+        seen, cursor, has_more = [], None, True
+        while has_more:
+            page = self.changes(cursor, limit=2)
+            seen.extend(task.pk for task in page.tasks)
+            cursor, has_more = page.cursor, page.has_more
+        self.assertEqual(seen, [task.pk for task in self.tasks])
+
+    def test_recent_rows_are_sent_again(self):
+        with override_settings(CHANGES_SINCE_OVERLAP=60):
+            first = self.changes()
+            self.assertEqual(len(self.changes(first.cursor).tasks), 3)
+
+    def test_expired_or_invalid_cursor(self):
+        cursor = self.changes().cursor
+        with override_settings(CHANGES_SINCE_TOMBSTONE_DAYS=-1):
+            self.assertTrue(self.changes(cursor).full_resync)
+        with self.assertRaisesMessage(Exception, "Invalid cursor 'nope'"):
+            self.changes('nope')
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.organization = create_organization()
+        project = Project.objects.create(organization=self.organization, name='Launch, "v2"')
+        task = Task.objects.create(project=project, title='Fuel', description='Line one\nline two')
+        TaskComment.objects.create(task=task, content='Go', author_email='a@acme.test')
+        Project.objects.create(organization=create_organization('beta'), name='Other')
+
+    def download(self, **params):
+        response = self.client.get('/export/', {'organization': 'acme', **params})
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson_lists_parents_before_children(self):
+        response, body = self.download()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([record['kind'] for record in records], ['organization', 'project', 'task', 'comment'])
+        self.assertEqual(records[1]['name'], 'Launch, "v2"')
+        self.assertEqual(records[2]['project_id'], records[1]['id'])
+        self.assertEqual(records[2]['description'], 'Line one\nline two')
+
+    def test_csv_matches_ndjson(self):
+        _, body = self.download(format='csv')
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual(list(rows[0]), export.CSV_COLUMNS)
+        self.assertEqual([row['kind'] for row in rows], ['organization', 'project', 'task', 'comment'])
+        self.assertEqual(rows[2]['description'], 'Line one\nline two')
+        self.assertEqual(rows[2]['name'], '')
+
+    def test_gzip_decompresses_to_the_plain_export(self):
+        response, body = self.download(gzip='1')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="acme.ndjson.gz"')
+        self.assertEqual(gzip.decompress(body), self.download()[1])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get('/export/', {'organization': 'missing'}).status_code, 404)
+        self.assertEqual(self.client.get('/export/', {'organization': 'acme', 'format': 'xml'}).status_code, 400)
+
+    def test_small_buffer_streams_many_chunks(self):
+        with mock.patch.object(export, 'BUFFER_SIZE', 1):
+            chunks = list(export.render(self.organization))
+        self.assertEqual(len(chunks), 4)
+
+
+class ImportTests(TestCase):
+    LINES = [
+        {'kind': 'organization', 'id': 9, 'name': 'Elsewhere'},
+        {'kind': 'project', 'id': 'p1', 'name': 'Launch'},
+        {'kind': 'task', 'id': 't1', 'project_id': 'p1', 'title': 'Fuel', 'status': 'DONE'},
+        {'kind': 'task', 'id': 't2', 'project_id': 'p1', 'title': 'Count down'},
+        {'kind': 'comment', 'task_id': 't1', 'content': 'Done', 'author_email': 'a@acme.test'},
+        {'kind': 'project', 'id': 'p2', 'name': 'Docs'},
+        {'kind': 'task', 'id': 't3', 'project_id': 'p2', 'title': 'Write'},
+    ]
+
+    def setUp(self):
+        self.organization = create_organization()
+
+    def records(self, lines=None):
+        return importer.read_records([json.dumps(line).encode() + b'\n' for line in lines or self.LINES], 'ndjson')
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        lines = [
+            *self.LINES,
+            {'kind': 'task', 'id': 't4', 'project_id': 'nope', 'title': 'Orphan'},
+            {'kind': 'project', 'id': 'p3', 'name': 'Bad', 'status': 'LOST'},
+            {'kind': 'task', 'id': 't1', 'project_id': 'p1', 'title': 'Again'},
+            {'kind': 'widget'},
+        ]
+        run = importer.import_records(self.organization, self.records(lines), 'ndjson')
+        self.assertEqual(run.status, 'COMPLETED')
+        self.assertEqual((run.projects_created, run.tasks_created, run.comments_created), (2, 3, 1))
+        self.assertEqual(run.errors, [
+            {'row': 8, 'errors': ["Unknown project 'nope'"]},
+            {'row': 9, 'errors': ["Invalid status 'LOST'"]},
+            {'row': 10, 'errors': ["Duplicate task id 't1'"]},
+            {'row': 11, 'errors': ["Unknown kind 'widget'"]},
+        ])
+        launch = Project.objects.get(name='Launch')
+        self.assertEqual((launch.task_count, launch.done_task_count), (2, 1))
+        self.assertEqual(TaskComment.objects.get().task.title, 'Fuel')
+
+    def test_failed_import_resumes_after_the_last_chunk(self):
+        def failing():
+            for number, record in enumerate(self.records(), start=1):
+                if number == 5:
+                    raise RuntimeError('Connection lost')
+                yield record
+
+        with self.assertRaisesMessage(RuntimeError, 'Connection lost'):
+            importer.import_records(self.organization, failing(), 'ndjson', chunk_size=2)
+        run = self.organization.import_runs.get()
+        self.assertEqual((run.status, run.rows_processed), ('FAILED', 4))
+        self.assertEqual(Task.objects.count(), 2)
+
+        run = importer.import_records(self.organization, self.records(), 'ndjson', run=run, chunk_size=2)
+        self.assertEqual((run.status, run.rows_processed), ('COMPLETED', 7))
+        self.assertEqual(sorted(Task.objects.values_list('project__name', 'title')),
+                         [('Docs', 'Write'), ('Launch', 'Count down'), ('Launch', 'Fuel')])
+        self.assertEqual(TaskComment.objects.get().task.title, 'Fuel')
+        self.assertFalse(ImportedRow.objects.exists())
+        with self.assertRaisesMessage(Exception, f'Import {run.pk} has already completed'):
+            importer.import_records(self.organization, self.records(), 'ndjson', run=run)
+
+    def test_export_imports_into_another_organization(self):
+        other = create_organization('beta')
+        importer.import_records(other, self.records(), 'ndjson')
+        exported = b''.join(export.render(other, 'csv')).splitlines(keepends=True)
+        run = importer.import_records(self.organization, importer.read_records(exported, 'csv'), 'csv')
+        self.assertEqual((run.projects_created, run.tasks_created, run.comments_created, run.error_count), (2, 3, 1, 0))
+        self.assertEqual(search.search('fuel', 10, organization=self.organization)[0].kind, 'task')
+
+
+class HistoryTests(TestCase):
+    def setUp(self):
+        self.organization = create_organization()
+        self.project = Project.objects.create(organization=self.organization, name='Launch')
+        self.tasks = [Task.objects.create(project=self.project, title=f'Task {n}') for n in range(3)]
+        self.today = timezone.localdate()
+        # The tasks were created three days ago
+        ProjectDailyStatistics.objects.update(date=self.today - timedelta(days=3))
+        OrganizationDailyStatistics.objects.update(date=self.today - timedelta(days=3))
+
+    def complete(self, task, hours_old):
+        Task.objects.filter(pk=task.pk).update(created_at=timezone.now() - timedelta(hours=hours_old))
+        task = Task.objects.get(pk=task.pk)
+        task.status = 'DONE'
+        task.save()
+
+    def test_burndown_carries_totals_over_quiet_days(self):
+        self.complete(self.tasks[0], 1)
+        points = history.project_burndown(self.project, self.today - timedelta(days=5), self.today)
+        self.assertEqual(
+            [(point.date, point.remaining, point.done, point.created, point.completed) for point in points],
+            [
+                (self.today - timedelta(days=3), 3, 0, 3, 0),
+                (self.today - timedelta(days=2), 3, 0, 0, 0),
+                (self.today - timedelta(days=1), 3, 0, 0, 0),
+                (self.today, 2, 1, 0, 1),
+            ]
+        )
+        # A window opening after the last change starts from the totals in force
+        window = history.project_burndown(self.project, self.today - timedelta(days=2), self.today - timedelta(days=1))
+        self.assertEqual([point.remaining for point in window], [3, 3])
+
+    def test_throughput_includes_quiet_days(self):
+        self.complete(self.tasks[0], 2)
+        self.complete(self.tasks[1], 4)
+        task = Task.objects.get(pk=self.tasks[0].pk)
+        task.status = 'TODO'
+        task.save()
+        self.tasks[2].delete()
+        points = history.organization_throughput(self.organization, self.today - timedelta(days=3), self.today)
+        self.assertEqual([point.created for point in points], [3, 0, 0, 0])
+        today = points[-1]
+        self.assertEqual((today.completed, today.reopened, today.deleted), (2, 1, 1))
+        self.assertAlmostEqual(today.average_cycle_time_hours, 3, places=1)
+        self.assertIsNone(points[1].average_cycle_time_hours)
+
+    def test_date_range_is_bounded(self):
+        with self.assertRaisesMessage(Exception, "'since' cannot be after 'until'"):
+            history.date_range(self.today, self.today - timedelta(days=1))
+        with self.assertRaisesMessage(Exception, f'Date ranges cannot exceed {history.MAX_DAYS} days'):
+            history.date_range(self.today - timedelta(days=history.MAX_DAYS), self.today)
+        self.assertEqual(history.date_range(), (self.today - timedelta(days=history.DEFAULT_DAYS - 1), self.today))
+
+
+class DeadlineTests(TestCase):
+    OVERDUE = """
+        query($first: Int, $after: String) {
+            overdueTasks(organizationSlug: "acme", first: $first, after: $after) {
+                edges { node { title } }
+                pageInfo { hasNextPage endCursor }
+            }
+        }
+    """
+
+    def setUp(self):
+        organization = create_organization()
+        launch = Project.objects.create(organization=organization, name='Launch')
+        docs = Project.objects.create(organization=organization, name='Docs')
+        now = timezone.now()
+        for project, title, days, status in [
+            (docs, 'Late docs', -1, 'TODO'),
+            (launch, 'Oldest', -3, 'IN_PROGRESS'),
+            (launch, 'Late launch', -1, 'TODO'),
+            (launch, 'Finished', -5, 'DONE'),
+            (launch, 'Tomorrow', 1, 'TODO'),
+            (launch, 'Next month', 30, 'TODO'),
+        ]:
+            Task.objects.create(project=project, title=title, status=status, due_date=now + timedelta(days=days))
+        Task.objects.create(project=launch, title='Someday')
+        other = Project.objects.create(organization=create_organization('beta'), name='Other')
+        Task.objects.create(project=other, title='Not ours', due_date=now - timedelta(days=9))
+
+    def titles(self, connection):
+        return [edge['node']['title'] for edge in connection['edges']]
+
+    def test_overdue_pages_by_due_date(self):
+        first = execute(self.client, self.OVERDUE, {'first': 2})['data']['overdueTasks']
+        self.assertEqual(self.titles(first), ['Oldest', 'Late docs'])
+        self.assertTrue(first['pageInfo']['hasNextPage'])
+        # 'Late docs' and 'Late launch' are due at the same moment, so the id breaks the tie
+        rest = execute(self.client, self.OVERDUE, {'after': first['pageInfo']['endCursor']})['data']['overdueTasks']
+        self.assertEqual(self.titles(rest), ['Late launch'])
+        self.assertFalse(rest['pageInfo']['hasNextPage'])
+
+    def test_due_soon_window(self):
+        query = """
+            query($days: Int) { dueSoon(organizationSlug: "acme", withinDays: $days) { edges { node { title } } } }
+        """
+        self.assertEqual(self.titles(execute(self.client, query)['data']['dueSoon']), ['Tomorrow'])
+        self.assertEqual(
+            self.titles(execute(self.client, query, {'days': 31})['data']['dueSoon']), ['Tomorrow', 'Next month']
+        )
+        result = execute(self.client, query, {'days': 0})
+        self.assertEqual(result['errors'][0]['message'], "'withinDays' must be between 1 and 90")
+
+    def test_overdue_counts_per_project(self):
+        result = execute(
+            self.client, '{ overdueTaskCounts(organizationSlug: "acme") { project { name } overdueTaskCount } }'
+        )
+        self.assertEqual(result['data']['overdueTaskCounts'], [
+            {'project': {'name': 'Launch'}, 'overdueTaskCount': 2},
+            {'project': {'name': 'Docs'}, 'overdueTaskCount': 1},
+        ])
@@ -0,0 +1,460 @@
+import contextvars
+import copy
+import functools
+import gzip
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connection, transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotAllowed,
+    HttpResponseNotFound,
+    HttpResponseNotModified,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.http.response import HttpResponseBadRequest
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET, require_POST
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    GraphQLError,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    execute,
+    get_operation_ast,
+)
+from graphql.execution import ExecutionResult
+
+from . import changefeed, cost, export, importer, jobs, metrics, response_cache, routing
+from .documents import (
+    document_cache_stats, get_validated_document, register_persisted_query, resolve_persisted_query
+)
+from .models import ImportRun, Organization
+from .organizations import organization_cache_stats
+
+
+class GraphQLView(BaseGraphQLView):
+    """
+    GraphQL endpoint that reuses validated documents and accepts persisted queries.
+
+    Mirrors ``graphene_django.views.GraphQLView`` but skips parsing and
+    validation for documents already in the cache, rejects operations over
+    the cost and depth budgets, and returns result extensions. Queries are
+    served from the versioned response cache when it is enabled, with an
+    ``ETag`` so unchanged results can be revalidated with a 304. Queries read
+    from a replica unless the client wrote recently (see ``routing``).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if getattr(request, 'graphql_wrote', False):
+            routing.stick_to_primary(response)
+        etag = getattr(request, 'graphql_etag', None)
+        if etag and response.status_code == 200:
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return HttpResponseNotModified(headers={'ETag': etag})
+            response['ETag'] = etag
+            # Clients may store the response but must revalidate before reuse
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                set_rollback()
+                response["errors"] = [
+                    self.format_error(e) for e in execution_result.errors
+                ]
+
+            if execution_result.errors and any(
+                not getattr(e, "path", None) for e in execution_result.errors
+            ):
+                status_code = 400
+            else:
+                response["data"] = execution_result.data
+
+            if execution_result.extensions:
+                response["extensions"] = execution_result.extensions
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        try:
+            query, persisted_query_hash = resolve_persisted_query(request, data, query)
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e])
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        document, errors = get_validated_document(self.schema.graphql_schema, query)
+        if errors:
+            return ExecutionResult(errors=errors)
+        if persisted_query_hash:
+            register_persisted_query(persisted_query_hash, query)
+
+        operation_cost = cost.analyze(
+            self.schema.graphql_schema, document, operation_name, variables
+        )
+        extensions = {"cost": operation_cost.as_extension()}
+        over_budget = cost.check_budget(operation_cost)
+        if over_budget:
+            return ExecutionResult(errors=[GraphQLError(over_budget)], extensions=extensions)
+
+        operation_ast = get_operation_ast(document, operation_name)
+        if request.method.lower() == "get":
+            if operation_ast and operation_ast.operation != OperationType.QUERY:
+                if show_graphiql:
+                    return None
+
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["POST"],
+                        "Can only perform a {} operation from a POST request.".format(
+                            operation_ast.operation.value
+                        ),
+                    )
+                )
+
+        cached_response = None
+        if (
+            response_cache.enabled()
+            and not self.batch
+            and operation_ast
+            and operation_ast.operation == OperationType.QUERY
+        ):
+            cached_response = response_cache.CachedResponse(
+                query, operation_ast, operation_name, variables
+            )
+            request.graphql_etag = cached_response.etag
+            if cached_response.etag in parse_etags(request.headers.get('If-None-Match', '')):
+                # dispatch() answers with 304 Not Modified; nothing to execute
+                return None
+            cached = cached_response.get()
+            if cached is not None:
+                data, cached_extensions = cached
+                return ExecutionResult(data=data, extensions=cached_extensions)
+
+        try:
+            options = {
+                "root_value": self.get_root_value(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "context_value": self.get_context(request),
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                options["execution_context_class"] = self.execution_context_class
+
+            if operation_ast and operation_ast.name:
+                operation_name = operation_ast.name.value
+
+            is_mutation = operation_ast and operation_ast.operation == OperationType.MUTATION
+            if is_mutation:
+                request.graphql_wrote = True
+            replica = None
+            with metrics.record_operation(operation_name):
+                if is_mutation and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                ):
+                    with transaction.atomic():
+                        result = execute(self.schema.graphql_schema, document, **options)
+                        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                            transaction.set_rollback(True)
+                else:
+                    reads = nullcontext()
+                    if operation_ast and not is_mutation and not routing.is_sticky(request):
+                        reads = routing.replica_reads()
+                    with reads as replica:
+                        result = self.execute_operation(document, operation_ast, options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+        result.extensions = {**(result.extensions or {}), **extensions}
+        if cached_response is not None:
+            # A replica may not have applied a just-committed write yet
+            lagging = replica and cached_response.changed_within(routing.sticky_seconds())
+            if result.errors or lagging:
+                request.graphql_etag = None
+            else:
+                cached_response.set(result.data, result.extensions)
+        return result
+
+    def execute_operation(self, document, operation_ast, options):
+        return execute(self.schema.graphql_schema, document, **options)
+
+
+class AsyncGraphQLView(GraphQLView):
+    """
+    GraphQL endpoint for the ASGI application.
+
+    Requests run on a worker thread instead of the event loop, so a slow
+    operation no longer holds up other requests. Queries selecting several
+    root fields execute each field concurrently on its own thread, with its
+    own database connection and request-scoped loaders. Mutations, and
+    queries whose root fields carry directives or share a response key, run
+    whole.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        dispatch = sync_to_async(
+            _closing_connections(super().dispatch),
+            thread_sensitive=False,
+            executor=_executor("GRAPHQL_ASYNC_WORKERS", 32),
+        )
+        return await dispatch(request, *args, **kwargs)
+
+    def execute_operation(self, document, operation_ast, options):
+        if operation_ast is None:
+            return super().execute_operation(document, operation_ast, options)
+        fields = operation_ast.selection_set.selections
+        if (
+            operation_ast.operation != OperationType.QUERY
+            or len(fields) < 2
+            or not all(isinstance(field, FieldNode) and not field.directives for field in fields)
+            # Fields sharing a response key are merged by the executor
+            or len({(field.alias or field.name).value for field in fields}) < len(fields)
+        ):
+            return super().execute_operation(document, operation_ast, options)
+
+        fragments = [
+            definition for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        ]
+        futures = []
+        for field in fields:
+            field_document = DocumentNode(definitions=[
+                OperationDefinitionNode(
+                    operation=operation_ast.operation,
+                    name=operation_ast.name,
+                    variable_definitions=operation_ast.variable_definitions,
+                    directives=operation_ast.directives,
+                    selection_set=SelectionSetNode(selections=[field]),
+                ),
+                *fragments,
+            ])
+            field_options = {**options, "context_value": _isolated_context(options["context_value"])}
+            futures.append(_executor("GRAPHQL_ROOT_FIELD_WORKERS", 8).submit(
+                contextvars.copy_context().run,
+                self._execute_root_field, field_document, field_options,
+            ))
+
+        data = {}
+        errors = []
+        for future in futures:
+            result = future.result()
+            if result.data is None:
+                # A non-null root field failed, which nulls the whole response
+                data = None
+            elif data is not None:
+                data.update(result.data)
+            errors.extend(result.errors or ())
+        return ExecutionResult(data=data, errors=errors or None)
+
+    def _execute_root_field(self, document, options):
+        with metrics.instrument_connections():
+            return _closing_connections(execute)(self.schema.graphql_schema, document, **options)
+
+
+# Request attributes holding per-request memos (see organizations)
+REQUEST_MEMOS = ("_organizations",)
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _executor(setting, default):
+    """Process-wide thread pool sized by ``setting``"""
+    with _executors_lock:
+        if setting not in _executors:
+            _executors[setting] = ThreadPoolExecutor(
+                max_workers=getattr(settings, setting, default),
+                thread_name_prefix=setting.lower(),
+            )
+        return _executors[setting]
+
+
+def _isolated_context(context):
+    """Copy of the request whose memos are not shared with other threads"""
+    clone = copy.copy(context)
+    for attribute in REQUEST_MEMOS:
+        clone.__dict__.pop(attribute, None)
+    return clone
+
+
+def _closing_connections(func):
+    """
+    Release this thread's expired database connections after ``func``.
+
+    Django only does this for the thread that handles the request signals,
+    so connections opened on worker threads would otherwise stay open.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint for GraphQL resolver, SQL and cache metrics"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponseForbidden()
+
+    body = metrics.registry.render() + metrics.render_cache_stats({
+        'organization': organization_cache_stats(),
+        'graphql_document': document_cache_stats(),
+    }) + metrics.render_database_stats(routing.pool.stats())
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_GET
+def change_feed_view(request):
+    """
+    Server-Sent Events stream of project, task and comment changes for one organization.
+
+    Under WSGI the stream holds a worker thread until it ends; serve this over ASGI in production.
+    """
+    slug = request.GET.get('organization', '')
+    if not Organization.objects.filter(slug=slug).exists():
+        return HttpResponseNotFound(f"Organization with slug '{slug}' not found")
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('lastEventId')
+    if isinstance(request, ASGIRequest):
+        events = changefeed.astream(slug, last_event_id)
+    else:
+        events = changefeed.stream(slug, last_event_id)
+
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+def export_view(request):
+    """Download an organization's projects, tasks and comments as NDJSON or CSV"""
+    slug = request.GET.get('organization', '')
+    organization = Organization.objects.filter(slug=slug).first()
+    if organization is None:
+        return HttpResponseNotFound(f"Organization with slug '{slug}' not found")
+    format = request.GET.get('format', 'ndjson')
+    if format not in export.FORMATS:
+        return HttpResponseBadRequest(f"Unknown export format '{format}'")
+    compress = request.GET.get('gzip') in ('1', 'true')
+
+    using = DEFAULT_DB_ALIAS if routing.is_sticky(request) else routing.read_alias()
+    render = export.arender if isinstance(request, ASGIRequest) else export.render
+    chunks = render(organization, format, compress, using=using)
+
+    filename = f'{slug}.{format}' + ('.gz' if compress else '')
+    response = StreamingHttpResponse(
+        chunks, content_type='application/gzip' if compress else export.FORMATS[format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-store'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _import_summary(run):
+    return {
+        'run': run.pk,
+        'status': run.status,
+        'rowsProcessed': run.rows_processed,
+        'projectsCreated': run.projects_created,
+        'tasksCreated': run.tasks_created,
+        'commentsCreated': run.comments_created,
+        'errorCount': run.error_count,
+        'errors': run.errors,
+    }
+
+
+@require_POST
+def import_view(request):
+    """
+    Import the NDJSON or CSV request body into an organization.
+
+    The body is read as a stream. After a failure, send the same body again
+    with ``run=<id>`` to resume after the last committed chunk. With
+    ``background=1`` the body is spooled to disk and imported by a job worker;
+    the response (202) names the job to poll.
+    """
+    slug = request.GET.get('organization', '')
+    organization = Organization.objects.filter(slug=slug).first()
+    if organization is None:
+        return HttpResponseNotFound(f"Organization with slug '{slug}' not found")
+    format = request.GET.get('format', 'ndjson')
+    if format not in importer.FORMATS:
+        return HttpResponseBadRequest(f"Unknown import format '{format}'")
+
+    run = None
+    if request.GET.get('run'):
+        run = ImportRun.objects.filter(pk=request.GET['run'], organization=organization).first()
+        if run is None:
+            return HttpResponseNotFound(f"Import {request.GET['run']} not found for '{slug}'")
+        if run.status == 'COMPLETED':
+            return JsonResponse(_import_summary(run))
+    else:
+        run = ImportRun.objects.create(organization=organization, source='upload', format=format)
+
+    compressed = request.GET.get('gzip') in ('1', 'true') or request.headers.get('Content-Encoding') == 'gzip'
+    if request.GET.get('background') in ('1', 'true'):
+        name = jobs.spool_upload(request, '.gz' if compressed else '')
+        job = jobs.enqueue('import_file', organization, {'run_id': run.pk, 'file': name})
+        return JsonResponse({**_import_summary(run), 'job': job.pk}, status=202)
+
+    lines = request
+    if compressed:
+        lines = gzip.GzipFile(fileobj=request, mode='rb')
+    try:
+        importer.import_records(organization, importer.read_records(lines, format), format, run=run)
+    except Exception as e:
+        run.refresh_from_db()
+        return JsonResponse({**_import_summary(run), 'error': str(e)}, status=500)
+    return JsonResponse(_import_summary(run))
@@ -0,0 +1,20 @@
+"""
+ASGI config for project_manager project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+GraphQL is served by ``core.views.AsyncGraphQLView`` (see asgi_urls.py).
+
+Run with: uvicorn project_manager.asgi:application --workers 4
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_manager.settings')
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'project_manager.asgi_urls')
+
+application = get_asgi_application()
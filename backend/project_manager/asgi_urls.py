@@ -0,0 +1,15 @@
+"""
+URL configuration for the ASGI application.
+
+Same routes as urls.py, with GraphQL served by the async view.
+"""
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from core.views import AsyncGraphQLView
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('graphql/', csrf_exempt(AsyncGraphQLView.as_view(graphiql=True))),
+    *[pattern for pattern in wsgi_urlpatterns if str(pattern.pattern) != 'graphql/'],
+]
@@ -50,7 +50,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'project_manager.urls'
+# asgi.py switches to project_manager.asgi_urls, which serves the async GraphQL view
+ROOT_URLCONF = os.getenv('DJANGO_ROOT_URLCONF', 'project_manager.urls')
 
 TEMPLATES = [
     {
@@ -82,9 +83,32 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Persistent connections, checked before each request reuses them
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas
+# DB_REPLICA_HOSTS is a comma-separated list of host[:port]; each becomes a
+# replica_<n> alias with the primary's credentials. GraphQL queries read from
+# a replica; a client that just ran a mutation reads from the primary for
+# DATABASE_STICKY_SECONDS. Replicas that fail to connect are skipped for
+# DATABASE_REPLICA_RETRY seconds.
+for index, replica in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.routing.ReplicaRouter']
+DATABASE_STICKY_SECONDS = int(os.getenv('DATABASE_STICKY_SECONDS', '5'))
+DATABASE_REPLICA_RETRY = int(os.getenv('DATABASE_REPLICA_RETRY', '30'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -130,6 +154,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # GraphQL Configuration
 GRAPHENE = {
     'SCHEMA': 'project_manager.schema.schema',
+    'MIDDLEWARE': [
+        'core.metrics.MetricsMiddleware',
+    ],
 }
 
 # CORS Configuration
@@ -140,3 +167,115 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+
+# Statistics rollup
+# Serve projectStatistics from the per-organization rollup table instead of
+# aggregating live rows. Rebuild it with: python manage.py rebuild_statistics
+PROJECT_STATISTICS_ROLLUP = os.getenv('PROJECT_STATISTICS_ROLLUP', 'False').lower() == 'true'
+
+# Organization slug cache
+# Process-wide LRU of slug -> Organization. Entries are invalidated when an
+# organization is saved or deleted; the TTL bounds staleness across processes.
+ORGANIZATION_CACHE_SIZE = int(os.getenv('ORGANIZATION_CACHE_SIZE', '1024'))
+ORGANIZATION_CACHE_TTL = int(os.getenv('ORGANIZATION_CACHE_TTL', '300'))
+
+# GraphQL document cache and persisted queries
+# Validated documents are cached per process. Persisted query text is kept in
+# the named Django cache. The default LocMemCache is per process too, so each
+# worker asks clients for the text once (PersistedQueryNotFound); use a shared
+# backend (file, Redis, Memcached) to register every query only once.
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.getenv('GRAPHQL_DOCUMENT_CACHE_SIZE', '512'))
+GRAPHQL_PERSISTED_QUERY_CACHE = 'graphql_persisted_queries'
+
+# GraphQL response cache
+# Whole query responses keyed by document, variables and per-organization data
+# version; mutations bump the version. Use a shared backend (file, Redis,
+# Memcached) when running several workers so every worker sees the bumps.
+GRAPHQL_RESPONSE_CACHE = os.getenv('GRAPHQL_RESPONSE_CACHE', 'False').lower() == 'true'
+GRAPHQL_RESPONSE_CACHE_ALIAS = 'graphql_responses'
+GRAPHQL_RESPONSE_CACHE_TTL = int(os.getenv('GRAPHQL_RESPONSE_CACHE_TTL', '300'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'graphql_responses': {
+        'BACKEND': os.getenv(
+            'GRAPHQL_RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('GRAPHQL_RESPONSE_CACHE_LOCATION', 'graphql-responses'),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'graphql_persisted_queries': {
+        'BACKEND': os.getenv(
+            'GRAPHQL_PERSISTED_QUERY_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('GRAPHQL_PERSISTED_QUERY_CACHE_LOCATION', 'graphql-persisted-queries'),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
+# Async GraphQL view (ASGI only)
+# Requests run on a pool of GRAPHQL_ASYNC_WORKERS threads, and the root fields
+# of a query run concurrently on a pool of GRAPHQL_ROOT_FIELD_WORKERS threads.
+# Each thread holds its own database connection.
+GRAPHQL_ASYNC_WORKERS = int(os.getenv('GRAPHQL_ASYNC_WORKERS', '32'))
+GRAPHQL_ROOT_FIELD_WORKERS = int(os.getenv('GRAPHQL_ROOT_FIELD_WORKERS', '8'))
+
+# Change feed
+# Server-Sent Events at /events/?organization=<slug>. The 'local' backend fans
+# out within one process; use 'channels' (requires the channels package and
+# CHANNEL_LAYERS) when clients may connect to different workers.
+# Serve /events/ over ASGI (see asgi.py): under WSGI every open stream holds a
+# worker thread for up to CHANGE_FEED_MAX_DURATION seconds, so a few open tabs
+# exhaust a sync worker pool. runserver is fine for development.
+CHANGE_FEED_BACKEND = os.getenv('CHANGE_FEED_BACKEND', 'local')
+CHANGE_FEED_HISTORY = int(os.getenv('CHANGE_FEED_HISTORY', '500'))
+CHANGE_FEED_HEARTBEAT = int(os.getenv('CHANGE_FEED_HEARTBEAT', '15'))
+CHANGE_FEED_MAX_DURATION = int(os.getenv('CHANGE_FEED_MAX_DURATION', '300'))
+
+# Delta sync (changesSince)
+# Cursors stop CHANGES_SINCE_OVERLAP seconds short of now so rows committed late
+# are not skipped. Tombstones of deleted rows are kept for
+# CHANGES_SINCE_TOMBSTONE_DAYS; older cursors get a full resync.
+CHANGES_SINCE_OVERLAP = int(os.getenv('CHANGES_SINCE_OVERLAP', '10'))
+CHANGES_SINCE_TOMBSTONE_DAYS = int(os.getenv('CHANGES_SINCE_TOMBSTONE_DAYS', '30'))
+
+# Archival
+# COMPLETED projects whose tasks are all DONE and that saw no change for
+# ARCHIVE_AFTER_DAYS are moved to the archive tables by archive_finished_work.
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '90'))
+
+# Background jobs
+# Run by: python manage.py run_jobs. Failed jobs are retried up to
+# JOB_MAX_ATTEMPTS times, JOB_RETRY_DELAY seconds apart (doubling each time).
+# Jobs still running after JOB_LOCK_TIMEOUT seconds are assumed lost and
+# retried. Finished jobs are kept JOB_RETENTION_DAYS. Uploads imported in the
+# background are spooled to JOB_SPOOL_DIR, which every worker must be able to read.
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_DELAY = int(os.getenv('JOB_RETRY_DELAY', '30'))
+JOB_LOCK_TIMEOUT = int(os.getenv('JOB_LOCK_TIMEOUT', '3600'))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1'))
+JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '7'))
+JOB_SPOOL_DIR = os.getenv('JOB_SPOOL_DIR', str(BASE_DIR / 'spool'))
+
+# GraphQL query budgets
+# Operations are costed before execution: each object costs 1, list fields
+# multiply by their page size (or GRAPHQL_DEFAULT_LIST_SIZE) and computed
+# fields add their weight. Anything over budget is rejected.
+GRAPHQL_MAX_QUERY_COST = int(os.getenv('GRAPHQL_MAX_QUERY_COST', '10000'))
+GRAPHQL_MAX_QUERY_DEPTH = int(os.getenv('GRAPHQL_MAX_QUERY_DEPTH', '10'))
+GRAPHQL_DEFAULT_LIST_SIZE = int(os.getenv('GRAPHQL_DEFAULT_LIST_SIZE', '50'))
+
+# GraphQL metrics
+# Fraction of operations instrumented for /metrics/ (0 disables, 1 records all).
+# Set METRICS_TOKEN to require "Authorization: Bearer <token>" on scrapes.
+GRAPHQL_METRICS_SAMPLE_RATE = float(os.getenv('GRAPHQL_METRICS_SAMPLE_RATE', '0.01'))
+# Operation names reported as their own series (comma-separated; defaults to
+# the frontend's operations). Any other name is counted as "other", so clients
+# cannot create unbounded series.
+GRAPHQL_METRICS_OPERATIONS = [name for name in os.getenv('GRAPHQL_METRICS_OPERATIONS', ','.join([
+    'GetOrganizations', 'GetProjects', 'GetProject', 'GetProjectStatistics', 'GetTasks', 'GetTask',
+    'CreateOrganization', 'CreateProject', 'UpdateProject', 'CreateTask', 'UpdateTask', 'CreateTaskComment',
+])).split(',') if name]
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
@@ -3,11 +3,15 @@ URL configuration for project_manager project.
 """
 from django.contrib import admin
 from django.urls import path
-from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
+from core.views import GraphQLView, change_feed_view, export_view, import_view, metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path('metrics/', metrics_view),
+    path('events/', change_feed_view),
+    path('export/', export_view),
+    path('import/', csrf_exempt(import_view)),
 ]
 
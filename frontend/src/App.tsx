@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { ApolloProvider } from '@apollo/client';
 import { client } from './apollo/client';
+import { useChangeFeed } from './apollo/changeFeed';
 import ProjectDashboard from './components/ProjectDashboard';
 import TaskBoard from './components/TaskBoard';
 import OrganizationSelector from './components/OrganizationSelector';
@@ -10,6 +11,8 @@ function App() {
   const [selectedProject, setSelectedProject] = useState<string | null>(null);
   const [view, setView] = useState<'dashboard' | 'tasks'>('dashboard');
 
+  useChangeFeed(selectedOrganization);
+
   return (
     <ApolloProvider client={client}>
       <div className="min-h-screen bg-gray-50">
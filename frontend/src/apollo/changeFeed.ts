@@ -0,0 +1,186 @@
+import { useEffect } from 'react';
+import { ApolloCache, Reference, gql } from '@apollo/client';
+import { client } from './client';
+
+const FEED_URL = 'http://localhost:8000/events/';
+
+interface ChangeEvent {
+  id: string;
+  type: string;
+  organization: string;
+  data: any;
+}
+
+const PROJECT_FIELDS = gql`
+  fragment ChangedProject on ProjectType {
+    id
+    name
+    description
+    status
+    dueDate
+    createdAt
+    organization {
+      id
+      slug
+    }
+  }
+`;
+
+// A new project has no tasks yet, so its computed fields are known
+const NEW_PROJECT_FIELDS = gql`
+  fragment NewProject on ProjectType {
+    ...ChangedProject
+    taskCount
+    completedTasks
+    completionRate
+  }
+  ${PROJECT_FIELDS}
+`;
+
+const TASK_FIELDS = gql`
+  fragment ChangedTask on TaskType {
+    id
+    title
+    description
+    status
+    assigneeEmail
+    dueDate
+    createdAt
+    project {
+      id
+    }
+  }
+`;
+
+const COMMENT_FIELDS = gql`
+  fragment ChangedComment on TaskCommentType {
+    id
+    content
+    authorEmail
+    createdAt
+    task {
+      id
+    }
+  }
+`;
+
+// Arguments of a cached root field, e.g. projects({"organizationSlug":"acme-corp","status":null})
+const fieldArgs = (storeFieldName: string, fieldName: string): Record<string, any> => {
+  try {
+    return JSON.parse(storeFieldName.slice(fieldName.length + 1, -1));
+  } catch {
+    return {};
+  }
+};
+
+const prepend = (
+  existing: readonly Reference[],
+  ref: Reference,
+  id: string,
+  readField: (fieldName: string, from: Reference) => any
+) => (existing.some((item) => readField('id', item) === id) ? existing : [ref, ...existing]);
+
+const evictProjectTotals = (cache: ApolloCache<any>, projectId: string) => {
+  const id = cache.identify({ __typename: 'ProjectType', id: projectId });
+  ['taskCount', 'completedTasks', 'completionRate'].forEach((fieldName) =>
+    cache.evict({ id, fieldName })
+  );
+};
+
+// Apply one changed row to the cache; only views showing affected totals refetch
+export const applyChange = (cache: ApolloCache<any>, event: ChangeEvent) => {
+  const [kind, action] = event.type.split('.');
+  const row = event.data;
+
+  if (action === 'deleted') {
+    // Lists drop the dangling reference; gc() removes what only the row reached
+    cache.evict({ id: cache.identify(row) });
+    if (kind === 'task') {
+      evictProjectTotals(cache, row.project.id);
+    }
+    if (kind !== 'comment') {
+      cache.evict({ id: 'ROOT_QUERY', fieldName: 'projectStatistics' });
+    }
+    cache.gc();
+    return;
+  }
+
+  if (kind === 'project') {
+    const ref = cache.writeFragment(
+      action === 'created'
+        ? {
+            fragment: NEW_PROJECT_FIELDS,
+            fragmentName: 'NewProject',
+            data: { taskCount: 0, completedTasks: 0, completionRate: 0, ...row },
+          }
+        : { fragment: PROJECT_FIELDS, data: row }
+    );
+    if (action === 'created' && ref) {
+      cache.modify({
+        fields: {
+          projects(existing: readonly Reference[] = [], { storeFieldName, fieldName, readField }) {
+            const args = fieldArgs(storeFieldName, fieldName);
+            if (args.organizationSlug !== event.organization || (args.status && args.status !== row.status)) {
+              return existing;
+            }
+            return prepend(existing, ref, row.id, readField);
+          },
+        },
+      });
+    }
+  } else if (kind === 'task') {
+    const ref = cache.writeFragment({ fragment: TASK_FIELDS, data: row });
+    if (action === 'created' && ref) {
+      cache.modify({
+        fields: {
+          tasks(existing: readonly Reference[] = [], { storeFieldName, fieldName, readField }) {
+            const args = fieldArgs(storeFieldName, fieldName);
+            if (
+              args.organizationSlug !== event.organization ||
+              String(args.projectId) !== row.project.id ||
+              (args.status && args.status !== row.status)
+            ) {
+              return existing;
+            }
+            return prepend(existing, ref, row.id, readField);
+          },
+        },
+      });
+    }
+    evictProjectTotals(cache, row.project.id);
+  } else if (kind === 'comment') {
+    const ref = cache.writeFragment({ fragment: COMMENT_FIELDS, data: row });
+    if (ref) {
+      cache.modify({
+        id: cache.identify(row.task),
+        fields: {
+          comments(existing: readonly Reference[] = [], { readField }) {
+            return prepend(existing, ref, row.id, readField);
+          },
+        },
+      });
+    }
+    return;
+  }
+
+  cache.evict({ id: 'ROOT_QUERY', fieldName: 'projectStatistics' });
+  cache.gc();
+};
+
+// Keep the cache in sync with every client's edits to the organization
+export const useChangeFeed = (organizationSlug: string | null) => {
+  useEffect(() => {
+    if (!organizationSlug) {
+      return;
+    }
+    const source = new EventSource(`${FEED_URL}?organization=${encodeURIComponent(organizationSlug)}`);
+    source.addEventListener('change', (message) => {
+      applyChange(client.cache, JSON.parse((message as MessageEvent).data));
+    });
+    // The server could not replay what we missed; reload what is on screen
+    source.addEventListener('reset', () => {
+      client.refetchQueries({ include: 'active' });
+    });
+    return () => source.close();
+  }, [organizationSlug]);
+};
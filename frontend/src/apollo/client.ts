@@ -1,11 +1,24 @@
 import { ApolloClient, InMemoryCache, createHttpLink } from '@apollo/client';
+import { createPersistedQueryLink } from '@apollo/client/link/persisted-queries';
 
 const httpLink = createHttpLink({
   uri: 'http://localhost:8000/graphql/',
+  // Send the cookie that keeps reads on the primary database right after a mutation
+  credentials: 'include',
 });
 
+// Hash documents with Web Crypto so the server can serve them by sha256 alone
+const sha256 = async (query: string): Promise<string> => {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(query));
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => byte.toString(16).padStart(2, '0'))
+    .join('');
+};
+
+const persistedQueryLink = createPersistedQueryLink({ sha256 });
+
 export const client = new ApolloClient({
-  link: httpLink,
+  link: persistedQueryLink.concat(httpLink),
   cache: new InMemoryCache({
     typePolicies: {
       Project: {
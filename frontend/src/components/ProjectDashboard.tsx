@@ -58,7 +58,6 @@ const ProjectDashboard: React.FC<ProjectDashboardProps> = ({
   const handleFormClose = () => {
     setShowForm(false);
     setEditingProject(null);
-    refetch();
   };
 
   const handleEdit = (project: Project) => {
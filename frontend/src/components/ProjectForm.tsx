@@ -1,7 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useMutation } from '@apollo/client';
 import { CREATE_PROJECT, UPDATE_PROJECT } from '../graphql/mutations';
-import { GET_PROJECTS } from '../graphql/queries';
 import { Project } from '../types';
 import ErrorMessage from './ErrorMessage';
 
@@ -28,7 +27,6 @@ const ProjectForm: React.FC<ProjectFormProps> = ({ organizationSlug, project, on
   }, [project]);
 
   const [createProject, { loading: creating }] = useMutation(CREATE_PROJECT, {
-    refetchQueries: [{ query: GET_PROJECTS, variables: { organizationSlug } }],
     onCompleted: () => {
       onClose();
     },
@@ -38,7 +36,6 @@ const ProjectForm: React.FC<ProjectFormProps> = ({ organizationSlug, project, on
   });
 
   const [updateProject, { loading: updating }] = useMutation(UPDATE_PROJECT, {
-    refetchQueries: [{ query: GET_PROJECTS, variables: { organizationSlug } }],
     onCompleted: () => {
       onClose();
     },
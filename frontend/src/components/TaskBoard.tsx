@@ -19,7 +19,7 @@ const TaskBoard: React.FC<TaskBoardProps> = ({ projectId, organizationSlug, onBa
   const [editingTask, setEditingTask] = useState<Task | null>(null);
   const [selectedTask, setSelectedTask] = useState<Task | null>(null);
 
-  const { loading, error, data, refetch } = useQuery(GET_TASKS, {
+  const { loading, error, data } = useQuery(GET_TASKS, {
     variables: {
       projectId,
       organizationSlug,
@@ -39,7 +39,6 @@ const TaskBoard: React.FC<TaskBoardProps> = ({ projectId, organizationSlug, onBa
   const handleFormClose = () => {
     setShowForm(false);
     setEditingTask(null);
-    refetch();
   };
 
   const handleEdit = (task: Task) => {
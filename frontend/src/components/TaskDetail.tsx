@@ -31,9 +31,6 @@ const TaskDetail: React.FC<TaskDetailProps> = ({
   });
 
   const [createComment, { loading: creating }] = useMutation(CREATE_TASK_COMMENT, {
-    refetchQueries: [
-      { query: GET_TASK, variables: { id: task.id, organizationSlug } },
-    ],
     onCompleted: () => {
       setCommentContent('');
       setAuthorEmail('');
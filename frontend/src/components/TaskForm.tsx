@@ -1,7 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useMutation } from '@apollo/client';
 import { CREATE_TASK, UPDATE_TASK } from '../graphql/mutations';
-import { GET_TASKS } from '../graphql/queries';
 import { Task } from '../types';
 import ErrorMessage from './ErrorMessage';
 
@@ -36,9 +35,6 @@ const TaskForm: React.FC<TaskFormProps> = ({
   }, [task]);
 
   const [createTask, { loading: creating }] = useMutation(CREATE_TASK, {
-    refetchQueries: [
-      { query: GET_TASKS, variables: { projectId, organizationSlug } },
-    ],
     onCompleted: () => {
       onClose();
     },
@@ -48,9 +44,6 @@ const TaskForm: React.FC<TaskFormProps> = ({
   });
 
   const [updateTask, { loading: updating }] = useMutation(UPDATE_TASK, {
-    refetchQueries: [
-      { query: GET_TASKS, variables: { projectId, organizationSlug } },
-    ],
     onCompleted: () => {
       onClose();
     },